@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步客户端并发性能测试
+
+用法: python benchmarks/bench_async_fanout.py [--delay 0.1] [--groups 10]
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import GROUPS, start_server
+from hyperweibo.api.async_weibo_api import AsyncWeiboAPI
+from hyperweibo.api.weibo_api import WeiboAPI
+
+
+def make_api(base_url):
+    api = WeiboAPI(cookie_str="SUB=benchmark", use_store=False)
+    api.BASE_URL = base_url
+    return api
+
+
+def run_sync(base_url, gids):
+    api = make_api(base_url)
+    api.get_groups()
+    start = time.perf_counter()
+    results = [api.get_group_timeline(gid) for gid in gids]
+    return time.perf_counter() - start, results
+
+
+async def run_async(base_url, gids, concurrency):
+    async with AsyncWeiboAPI(make_api(base_url), concurrency=concurrency) as client:
+        await client.get_groups()
+        start = time.perf_counter()
+        results = await client.get_group_timelines(gids)
+        return time.perf_counter() - start, [results[gid] for gid in gids]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="异步客户端并发性能测试")
+    parser.add_argument("--delay", type=float, default=0.1, help="替身服务器每个请求的延迟（秒）")
+    parser.add_argument("--groups", type=int, default=10, help="并发获取的分组数量")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    server, base_url = start_server(args.delay)
+    gids = [group["gid"] for group in GROUPS[:args.groups]]
+
+    baseline, expected = run_sync(base_url, gids)
+    print(f"同步客户端: {baseline * 1000:.0f} ms ({len(gids)}个分组)")
+
+    for concurrency in (1, 2, 4, 8, 16):
+        elapsed, results = asyncio.run(run_async(base_url, gids, concurrency))
+        same = "一致" if results == expected else "不一致"
+        print(f"并发{concurrency:>2}: {elapsed * 1000:6.0f} ms  加速比 {baseline / elapsed:4.1f}x  结果{same}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+WeiboFormatter.clean_text性能测试
+
+先用data/clean_text_corpus.json中的标准输出校验结果与逐条替换的旧实现一致，
+再比较两者在长微博上的单条耗时。
+
+用法: python benchmarks/bench_clean_text.py [--repeat 2000]
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import make_status
+from hyperweibo.utils.formatter import WeiboFormatter
+
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "clean_text_corpus.json")
+
+
+def legacy_clean_text(text: str) -> str:
+    """逐条re.sub的旧实现，仅用于对比"""
+    if not text:
+        return ""
+    text = re.sub(r'<span class="url-icon"><img alt=\[([^\]]*)\][^>]*?/></span>', r'[\1]', text)
+    text = re.sub(r'<span class="url-icon"><img alt="?\[?([^\]"]*)\]?"?[^>]*?/></span>', r'[\1]', text)
+    text = re.sub(r'<span class="url-icon"><img[^>]*></span>', r'[表情]', text)
+    text = re.sub(r'<a href=\'\/n\/([^\']+)\'>@([^<]+)</a>', r'@\2', text)
+    text = re.sub(r'<a[^>]*?><span class="surl-text">#([^#]+)#</span></a>', r'#\1#', text)
+    text = re.sub(r'<a[^>]*?href="([^"]+)"[^>]*?><span class="surl-text">([^<]+)</span></a>', r'\2', text)
+    text = re.sub(r'<a[^>]*?href="([^"]+)"[^>]*?><span class=\'url-icon\'><img[^>]*?></span><span class="surl-text">([^<]+)</span></a>', r'\2', text)
+    text = re.sub(r'<a[^>]*?href="[^"]*?video[^"]*?"[^>]*?>.*?</a>', r'[视频链接]', text)
+    text = re.sub(r'<a href="\/status\/\d+">全文</a>', r'[全文]', text)
+    text = re.sub(r'<br\s*/?>', '\n', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'\[([^\]]+)\]', r'[\1]', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r' +', ' ', text)
+    text = re.sub(r'%[0-9A-Fa-f]{2}', '', text)
+    return text.strip()
+
+
+def check_corpus() -> bool:
+    with open(CORPUS_FILE, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    failures = 0
+    for case in corpus:
+        actual = WeiboFormatter.clean_text(case["input"])
+        if actual != case["expected"]:
+            failures += 1
+            print(f"结果不一致: {case['input']!r}")
+            print(f"  期望: {case['expected']!r}")
+            print(f"  实际: {actual!r}")
+    print(f"标准输出校验: {len(corpus) - failures}/{len(corpus)} 一致")
+    return failures == 0
+
+
+def long_status_text(index: int) -> str:
+    """把多条微博的正文拼成一条长微博"""
+    return "<br />".join(make_status(index * 10 + i)["text"] for i in range(10))
+
+
+def measure(func, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="clean_text性能测试")
+    parser.add_argument("--repeat", type=int, default=200, help="重复次数")
+    args = parser.parse_args()
+
+    if not check_corpus():
+        sys.exit(1)
+
+    samples = {
+        "普通微博": [make_status(i)["text"] for i in range(50)],
+        "长微博": [long_status_text(i) for i in range(20)],
+    }
+    for name, texts in samples.items():
+        average = sum(len(text) for text in texts) / len(texts)
+        old = measure(legacy_clean_text, texts, args.repeat)
+        new = measure(WeiboFormatter.clean_text, texts, args.repeat)
+        print(f"{name}(平均{average:.0f}字符): 逐条替换 {old * 1e6:7.1f} us  一次扫描 {new * 1e6:7.1f} us  加速比 {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
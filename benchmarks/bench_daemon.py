@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+后台服务测试：每次打开时直接获取与通过后台服务获取的耗时，以及多个终端共用的请求数
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import start_server
+from hyperweibo.api.daemon import TimelineDaemon
+from hyperweibo.api.daemon_client import DaemonClient
+from hyperweibo.api.weibo_api import WeiboAPI
+
+
+def open_standalone(data_dir: str):
+    """不使用后台服务时每次启动的工作：创建WeiboAPI（验证cookie）、获取分组和第1页"""
+    api = WeiboAPI(cookie_str="SUB=benchmark", data_dir=data_dir, use_store=False, use_credential_cache=False)
+    api.get_group_registry()
+    api.get_home_timeline(page=1)
+    api.close()
+
+
+def open_client(data_dir: str):
+    """使用后台服务时每次启动的工作：连接、获取分组和第1页"""
+    client = DaemonClient.connect(data_dir)
+    client.get_group_registry()
+    client.get_home_timeline(page=1)
+    client.close()
+
+
+def timed(func, repeat: int):
+    """返回每次调用耗时（毫秒）的中位数"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="后台服务测试")
+    parser.add_argument("--delay", type=float, default=0.1, help="替身服务器每个请求的延迟（秒）")
+    parser.add_argument("--repeat", type=int, default=10, help="每种打开方式的重复次数")
+    parser.add_argument("--clients", type=int, default=4, help="同时浏览的终端数")
+    parser.add_argument("--pages", type=int, default=5, help="每个终端浏览的页数")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    server, base_url = start_server(args.delay)
+    WeiboAPI.BASE_URL = base_url
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        standalone = timed(lambda: open_standalone(data_dir), args.repeat)
+        print(f"替身服务器延迟 {args.delay * 1000:.0f} ms")
+        print(f"  不使用后台服务: 每次打开 {standalone:7.1f} ms")
+
+        api = WeiboAPI(cookie_str="SUB=benchmark", data_dir=data_dir, use_store=False, use_credential_cache=False)
+        daemon = TimelineDaemon(api, data_dir)
+        daemon.bind()
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+
+        open_client(data_dir)
+        warm = timed(lambda: open_client(data_dir), args.repeat)
+        client = DaemonClient.connect(data_dir)
+        call = timed(lambda: client.get_home_timeline(page=1), args.repeat * 10)
+        client.close()
+        print(f"  使用后台服务:   每次打开 {warm:7.1f} ms，单次获取第1页 {call:.2f} ms")
+
+        # 多个终端同时浏览相同的页面，后台服务只请求一次
+        before = server.request_count
+
+        def browse():
+            terminal = DaemonClient.connect(data_dir)
+            for page in range(2, args.pages + 2):
+                terminal.get_home_timeline(page=page)
+            terminal.close()
+
+        threads = [threading.Thread(target=browse) for _ in range(args.clients)]
+        for terminal in threads:
+            terminal.start()
+        for terminal in threads:
+            terminal.join()
+        print(f"  {args.clients}个终端各浏览{args.pages}页: 替身服务器收到 {server.request_count - before} 个请求")
+
+        daemon.shutdown()
+        thread.join(timeout=5)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
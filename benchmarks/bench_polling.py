@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+自适应轮询模拟测试：在模拟时钟下比较固定间隔刷新和AdaptivePoller的请求数与延迟
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import argparse
+import bisect
+import logging
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hyperweibo.api.poller import AdaptivePoller
+
+PAGE_SIZE = 20
+# 模拟的分组及平均每条新微博的间隔（秒）
+FEEDS = {
+    "繁忙分组": 30,
+    "普通分组": 600,
+    "安静分组": 3 * 3600,
+}
+
+
+class SimulatedAPI:
+    """按泊松过程生成各分组的微博，poll_timeline返回模拟时钟下的第1页，并记录每条微博第一次被获取的时间"""
+
+    def __init__(self, duration: float, seed: int = 42):
+        rng = random.Random(seed)
+        self.now = 0.0
+        self.requests = 0
+        self.timelines = {}
+        self.delivered = {}
+        for gid, mean_gap in FEEDS.items():
+            # 从模拟开始前一天生成，第1页一开始就是满的
+            times = []
+            t = -86400.0
+            while t < duration:
+                t += rng.expovariate(1.0 / mean_gap)
+                times.append(t)
+            self.timelines[gid] = times
+            self.delivered[gid] = {}
+
+    def poll_timeline(self, feed="group", gid=None):
+        self.requests += 1
+        return self.first_page(gid)
+
+    def first_page(self, gid):
+        times = self.timelines[gid]
+        end = bisect.bisect_right(times, self.now)
+        page = []
+        for index in range(end - 1, max(-1, end - 1 - PAGE_SIZE), -1):
+            self.delivered[gid].setdefault(index, self.now)
+            page.append({"id": index + 1, "created_ts": times[index]})
+        return page
+
+    def report(self, name: str, duration: float):
+        """输出请求数、获取到的新微博数、每条新微博的请求数和平均延迟"""
+        delivered = 0
+        print(f"{name}: {self.requests}次请求")
+        for gid, times in self.timelines.items():
+            arrived = [index for index, t in enumerate(times) if 0 <= t < duration]
+            delays = [self.delivered[gid][index] - times[index] for index in arrived if index in self.delivered[gid]]
+            delivered += len(delays)
+            mean_delay = sum(delays) / len(delays) if delays else 0.0
+            print(f"  {gid}: 新微博 {len(arrived):4d}条  获取到 {len(delays):4d}条  平均延迟 {mean_delay:7.1f} 秒")
+        print(f"  每条新微博的请求数: {self.requests / max(delivered, 1):.2f}")
+
+
+def run_fixed(duration: float, interval: float) -> SimulatedAPI:
+    """原来的固定间隔刷新：每个分组每interval秒请求一次"""
+    api = SimulatedAPI(duration)
+    for gid in FEEDS:
+        api.first_page(gid)
+    while api.now < duration:
+        api.now += interval
+        for gid in FEEDS:
+            api.poll_timeline("group", gid)
+    return api
+
+
+def run_adaptive(duration: float, min_interval: float, max_interval: float, budget: int) -> SimulatedAPI:
+    """使用AdaptivePoller，按模拟时钟调用poll_due"""
+    api = SimulatedAPI(duration)
+    poller = AdaptivePoller(api, min_interval=min_interval, max_interval=max_interval, budget=budget,
+                            clock=lambda: api.now, background=False)
+    # 与界面相同，以开始时显示的第1页为基准
+    for gid in FEEDS:
+        poller.watch("group", gid, statuses=api.first_page(gid))
+    while api.now < duration:
+        wait = poller.poll_due()
+        if wait is None:
+            break
+        api.now += wait
+    return api
+
+
+def main():
+    parser = argparse.ArgumentParser(description="自适应轮询模拟测试")
+    parser.add_argument("--hours", type=float, default=6, help="模拟的时长（小时）")
+    parser.add_argument("--refresh", type=float, default=60, help="固定刷新间隔，同时作为自适应轮询的最短间隔（秒）")
+    parser.add_argument("--refresh-max", type=float, default=900, help="自适应轮询的最长间隔（秒）")
+    parser.add_argument("--budget", type=int, default=12, help="每分钟最多的请求数")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    duration = args.hours * 3600
+    print(f"模拟{args.hours:g}小时，每页{PAGE_SIZE}条")
+    run_fixed(duration, args.refresh).report(f"固定间隔{args.refresh:g}秒", duration)
+    run_adaptive(duration, args.refresh, args.refresh_max, args.budget).report(
+        f"自适应 {args.refresh:g}-{args.refresh_max:g}秒", duration)
+
+
+if __name__ == "__main__":
+    main()
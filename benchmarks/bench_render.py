@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+时间线页面渲染性能测试
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import argparse
+import io
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rich.console import Console
+
+from stub_server import make_status
+from hyperweibo.utils.formatter import WeiboFormatter
+from hyperweibo.utils.timeparse import format_absolute, normalize_statuses
+import hyperweibo.main as main_module
+
+
+class CountingWriter(io.StringIO):
+    """记录写入次数和字节数的输出文件"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+        self.bytes = 0
+
+    def write(self, text):
+        self.writes += 1
+        self.bytes += len(text.encode("utf-8"))
+        return len(text)
+
+
+def legacy_print_page(console, title, data):
+    """改动前main.py的显示方式：每条微博的每一部分单独调用console.print"""
+    console.print(f"[bold]{title}[/bold]")
+    console.print(f"共 {len(data)} 条记录")
+    console.print()
+    for item in data:
+        user = item.get('user', {}).get('screen_name', '未知用户')
+        console.print(f"✓ [bold]{user}[/bold] {format_absolute(item.get('created_at', ''))}:")
+        console.print()
+        console.print(WeiboFormatter.clean_text(item.get('text', '')))
+        retweeted = item.get('retweeted_status', None)
+        if retweeted:
+            console.print(f"转发@{retweeted.get('user', {}).get('screen_name', '未知用户')}:")
+            console.print(WeiboFormatter.clean_text(retweeted.get('text', '无内容')))
+        pics = item.get("pics", [])
+        if pics or item.get("page_info"):
+            console.print()
+            if pics:
+                console.print(f"[附件: {len(pics)}个]")
+            elif item["page_info"].get("media_info"):
+                console.print("[多媒体]")
+        console.print()
+        console.print(f"转发: {item.get('reposts_count', 0)} | 评论: {item.get('comments_count', 0)} | "
+                      f"点赞: {item.get('attitudes_count', 0)}")
+        console.print("─" * 80)
+        console.print()
+
+
+def batched_print_page(console, title, data):
+    """当前main.py的显示方式：整页组合后一次写入"""
+    page_view = main_module.build_timeline_page(title, data, None, False)
+    with console:
+        console.print(page_view)
+
+
+def measure(func, data, repeat):
+    """返回(平均耗时, 每页写入次数, 每页字节数)"""
+    writer = CountingWriter()
+    console = Console(file=writer, width=100, force_terminal=True, color_system="truecolor")
+    main_module.console = console
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(console, "微博关注内容（第1页）", data)
+    elapsed = (time.perf_counter() - start) / repeat
+    return elapsed, writer.writes // repeat, writer.bytes // repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="时间线页面渲染性能测试")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[20, 200, 2000], help="每页微博数量")
+    parser.add_argument("--repeat", type=int, default=5, help="每种方式重复次数")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    WeiboFormatter.render_cache_size = max(args.sizes)
+
+    for size in args.sizes:
+        data = normalize_statuses([make_status(i) for i in range(size)])
+        repeat = max(1, args.repeat * 20 // size) if size > 20 else args.repeat
+
+        legacy = measure(legacy_print_page, data, repeat)
+        WeiboFormatter.clear_render_cache()
+        cold = measure(batched_print_page, data, 1)
+        warm = measure(batched_print_page, data, repeat)
+
+        print(f"{size}条微博")
+        for name, (elapsed, writes, size_bytes) in (("逐行输出", legacy), ("整页输出(首次)", cold), ("整页输出(缓存)", warm)):
+            print(f"  {name:<12} {elapsed * 1000:9.2f} ms  写入 {writes:6d} 次  {size_bytes / 1024:8.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+$render_data提取性能测试：快速路径与BeautifulSoup路径的耗时和峰值内存
+
+用法: python benchmarks/bench_render_data.py [--statuses 20] [--html 页面1.html 页面2.html ...]
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import make_status
+from hyperweibo.api.weibo_api import WeiboAPI
+from hyperweibo.utils.render_data import extract_statuses
+
+
+def build_page(count: int) -> str:
+    """构造与m.weibo.cn页面结构相近的HTML：若干脚本、样式和一段$render_data赋值"""
+    render_data = [{"status": [make_status(i) for i in range(count)], "call": "GetFeedList", "hideShare": False}]
+    filler = "x" * 200
+    filler_scripts = "".join(
+        f"<script>window.__chunk{i} = function() {{ return '{filler}' + [1, 2, 3].join(']'); }};</script>"
+        for i in range(30)
+    )
+    styles = "".join(f"<style>.c{i} {{ color: #{i:06x}; }}</style>" for i in range(50))
+    body = "".join(f"<div class=\"card\"><span>占位内容{i}</span></div>" for i in range(200))
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">" + styles + filler_scripts + "</head><body>" + body
+        + "<script>var $render_data = " + json.dumps(render_data, ensure_ascii=False) + "[0] || {};</script>"
+        + "</body></html>"
+    )
+
+
+def measure(func, html, repeat):
+    tracemalloc.start()
+    result = func(html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(html)
+    return (time.perf_counter() - start) / repeat, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="$render_data提取性能测试")
+    parser.add_argument("--statuses", type=int, default=20, help="构造页面中的微博数量")
+    parser.add_argument("--repeat", type=int, default=20, help="每种方式重复次数")
+    parser.add_argument("--html", nargs="*", help="使用保存下来的页面HTML文件代替构造页面")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    api = WeiboAPI(use_mock=True)
+
+    if args.html:
+        pages = []
+        for path in args.html:
+            with open(path, "r", encoding="utf-8") as f:
+                pages.append((os.path.basename(path), f.read()))
+    else:
+        pages = [(f"构造页面({count}条)", build_page(count)) for count in (args.statuses, args.statuses * 5)]
+
+    for name, html in pages:
+        fast_time, fast_peak, fast_result = measure(extract_statuses, html, args.repeat)
+        soup_time, soup_peak, soup_result = measure(api._parse_html_with_soup, html, max(1, args.repeat // 4))
+        same = "一致" if fast_result == soup_result else "不一致"
+        print(f"{name}  大小 {len(html) / 1024:.0f} KB  结果{same}")
+        print(f"  快速路径:      {fast_time * 1000:8.2f} ms  峰值内存 {fast_peak / 1024:8.0f} KB")
+        print(f"  BeautifulSoup: {soup_time * 1000:8.2f} ms  峰值内存 {soup_peak / 1024:8.0f} KB")
+        print(f"  加速比 {soup_time / fast_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
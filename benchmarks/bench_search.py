@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地全文检索性能测试
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hyperweibo.utils.search_index import SearchIndex
+
+# 合成正文的词表：少量高频虚词，之后是按Zipf分布出现的实词，查询使用其中不同频率的词
+FUNCTION_WORDS = ["的", "了", "是", "我", "在", "也", "就", "都", "和", "有", "不", "很", "这个", "今天", "还是"]
+QUERY_WORDS = {
+    50: "咖啡", 120: "上海", 300: "周末", 800: "演唱会", 1500: "sqlite", 3000: "发布会",
+}
+TAGS = ["周末去哪儿", "今日份快乐", "打工人", "读书打卡", "城市漫步", "新品发布"]
+BATCH_SIZE = 500
+
+
+def build_vocabulary(rng: random.Random, size: int = 20000):
+    """生成词表和对应的Zipf权重"""
+    chars = [chr(code) for code in range(0x4e00, 0x4e00 + 3000)]
+    words = list(FUNCTION_WORDS)
+    while len(words) < size:
+        rank = len(words)
+        words.append(QUERY_WORDS.get(rank) or "".join(rng.choices(chars, k=rng.choice((1, 2, 2, 2, 3)))))
+    weights = [1.0 / (rank + 1) for rank in range(size)]
+    return words, list(itertools.accumulate(weights))
+
+
+def make_status(index: int, rng: random.Random, vocabulary, now: float) -> dict:
+    """生成一条带正文、作者、话题和发布时间的微博，index越大越旧"""
+    words, cum_weights = vocabulary
+    text = "".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(10, 60)))
+    if rng.random() < 0.1:
+        text += f" #{rng.choice(TAGS)}#"
+    return {
+        "id": 5_000_000_000_000_000 - index,
+        "created_ts": int(now - index * 30),
+        "text": text,
+        "user": {"id": index % 2000, "screen_name": f"作者{index % 2000}"},
+    }
+
+
+def timed(func, repeat: int = 5):
+    """返回func的结果和最快一次的耗时（毫秒）"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地全文检索测试")
+    parser.add_argument("--statuses", type=int, default=200000, help="索引的微博数量")
+    parser.add_argument("--limit", type=int, default=20, help="每次查询返回的条数")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = random.Random(42)
+    now = time.time()
+    vocabulary = build_vocabulary(rng)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        index = SearchIndex(data_dir, background=False)
+
+        start = time.perf_counter()
+        for offset in range(0, args.statuses, BATCH_SIZE):
+            batch = [make_status(i, rng, vocabulary, now) for i in range(offset, min(offset + BATCH_SIZE, args.statuses))]
+            index.add(batch)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(index.path) + os.path.getsize(index.path + "-wal")
+        print(f"索引{args.statuses}条微博: {elapsed:.1f} s ({args.statuses / elapsed:.0f} 条/s)，"
+              f"数据库 {size / 1024 / 1024:.0f} MB")
+
+        day_ago = now - 86400
+        queries = [
+            ("高频词", dict(query="咖啡")),
+            ("中频词", dict(query="演唱会")),
+            ("低频英文词", dict(query="sqlite")),
+            ("两个词", dict(query="上海 周末")),
+            ("话题", dict(query="#读书打卡#")),
+            ("关键词+按时间", dict(query="咖啡", sort="time")),
+            ("作者", dict(author="作者42")),
+            ("作者+关键词", dict(query="咖啡", author="作者42")),
+            ("时间范围", dict(since=day_ago, until=day_ago + 3600)),
+            ("关键词+时间范围", dict(query="咖啡", since=day_ago, until=day_ago + 3600)),
+        ]
+        for name, kwargs in queries:
+            results, best = timed(lambda: index.search(limit=args.limit, **kwargs))
+            print(f"  {name:<12} {best:8.2f} ms  {len(results):3d} 条")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
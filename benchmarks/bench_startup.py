@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动耗时测试：测量hyperweibo.py从启动到第一次等待输入的时间，超出预算时以非零状态退出
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hyperweibo.utils.startup import STARTUP_REPORT_ENV, parse_report
+
+# 模拟数据模式下启动时不应导入的模块
+DEFAULT_FORBIDDEN = ["bs4", "lxml", "browser_cookie3", "pycookiecheat", "webbrowser", "rich.table", "rich.panel"]
+
+
+def run_once(argv, importtime=False):
+    """运行一次hyperweibo.py直到第一次等待输入，返回(到达第一次等待输入的毫秒数, 标准错误输出)"""
+    env = dict(os.environ)
+    env[STARTUP_REPORT_ENV] = repr(time.time())
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + [os.path.join(ROOT, "hyperweibo.py")] + argv
+    proc = subprocess.run(command, env=env, cwd=ROOT, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE, text=True)
+    phases, _ = parse_report(proc.stderr)
+    first_prompt = dict(phases).get("first_prompt")
+    if proc.returncode != 0 or first_prompt is None:
+        raise RuntimeError(f"hyperweibo.py没有到达第一次等待输入，退出码 {proc.returncode}\n{proc.stderr[-2000:]}")
+    return first_prompt, proc.stderr
+
+
+def interpreter_baseline(runs):
+    """空解释器启动耗时，用于扣除与本项目无关的开销"""
+    times = []
+    for _ in range(runs):
+        start = time.time()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append((time.time() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="hyperweibo.py启动耗时测试")
+    parser.add_argument("--runs", type=int, default=7, help="测量次数，取中位数")
+    parser.add_argument("--budget", type=float, default=400,
+                        help="扣除空解释器启动后到第一次等待输入的预算（毫秒），超出时以非零状态退出")
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN, help="启动时不允许导入的模块")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="hyperweibo-bench-")
+    argv = ["--mock", "--no-store", "-d", data_dir, "-l", "zh"]
+
+    # 预热一次，避免首次运行时编译字节码的开销计入结果
+    run_once(argv)
+    times = [run_once(argv)[0] for _ in range(args.runs)]
+    baseline = interpreter_baseline(args.runs)
+    median = statistics.median(times)
+    overhead = median - baseline
+
+    _, stderr = run_once(argv, importtime=True)
+    _, imports = parse_report(stderr)
+    imported = {name.strip() for _, _, name in imports}
+    forbidden = [name for name in args.forbid if name in imported]
+
+    print(f"到达第一次等待输入: 中位数 {median:.1f} ms  (最快 {min(times):.1f} ms, 最慢 {max(times):.1f} ms)")
+    print(f"空解释器启动: {baseline:.1f} ms")
+    print(f"本项目启动开销: {overhead:.1f} ms  预算 {args.budget:.0f} ms")
+
+    failed = False
+    if overhead > args.budget:
+        print("启动耗时超出预算")
+        failed = True
+    if forbidden:
+        print(f"启动时导入了不应导入的模块: {', '.join(forbidden)}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
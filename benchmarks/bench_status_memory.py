@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+微博模型内存测试：缓存原始JSON与Status模型时每条微博占用的字节数
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import make_status
+from hyperweibo.api.models import project_statuses
+from hyperweibo.utils.cache import estimate_size
+from hyperweibo.utils.timeparse import normalize_statuses
+
+
+def load_raw(payload: str):
+    """与WeiboAPI相同：解析接口JSON并补充created_ts"""
+    return normalize_statuses(json.loads(payload)["data"]["statuses"])
+
+
+def measure(build, payload):
+    """返回build(payload)的结果在解析完成后仍占用的内存"""
+    gc.collect()
+    tracemalloc.start()
+    result = build(payload)
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="微博模型内存测试")
+    parser.add_argument("--statuses", type=int, default=3000, help="微博数量")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    statuses = [make_status(i) for i in range(args.statuses)]
+    payload = json.dumps({"ok": 1, "data": {"statuses": statuses}}, ensure_ascii=False)
+    del statuses
+
+    cases = [
+        ("原始JSON", load_raw),
+        ("Status", lambda data: project_statuses(load_raw(data))),
+        ("Status+raw", lambda data: project_statuses(load_raw(data), keep_raw=True)),
+    ]
+    baseline = None
+    print(f"{args.statuses}条微博")
+    for name, build in cases:
+        result, current = measure(build, payload)
+        per_status = current / args.statuses
+        baseline = baseline or per_status
+        cache_bytes = estimate_size(result) / args.statuses
+        print(f"  {name:<10} 每条 {per_status:8.0f} B  缓存计量 {cache_bytes:6.0f} B  相对原始 {per_status / baseline:5.2f}x")
+        del result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+微博接口的本地替身服务器，供性能测试使用
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGE_SIZE = 20
+BASE_ID = 5000000000000000
+# 固定的参考时间，保证同一进程内多次请求返回完全相同的数据
+REFERENCE_TIME = time.time()
+GROUPS = [{"gid": str(4000000000000000 + i), "name": "特别关注" if i == 0 else f"分组{i}"} for i in range(10)]
+
+
+def make_status(index: int, feed: str = "home") -> dict:
+    """生成一条与真实接口字段结构相近的微博，index越大越旧"""
+    created = REFERENCE_TIME - index * 90
+    user = {
+        "id": 1000 + index % 50,
+        "screen_name": f"用户{index % 50}",
+        "verified": index % 3 == 0,
+        "verified_type": index % 4 - 1,
+        "profile_image_url": "https://tvax1.sinaimg.cn/crop.0.0.1080.1080.180/" + "x" * 40 + ".jpg",
+        "avatar_hd": "https://tvax1.sinaimg.cn/crop.0.0.1080.1080.1024/" + "x" * 40 + ".jpg",
+        "description": "这是一段个人简介" * 3,
+        "followers_count": index * 13,
+        "follow_count": index * 7,
+        "gender": "f" if index % 2 else "m",
+        "mbtype": 12,
+        "urank": 30,
+        "mbrank": 5,
+    }
+    text = (
+        f"第{index}条微博，来自{feed} "
+        f"<a href='/n/用户{index % 7}'>@用户{index % 7}</a> "
+        '<a href="https://m.weibo.cn/search?containerid=231522"><span class="surl-text">#话题标签#</span></a>'
+        '<span class="url-icon"><img alt=[笑cry] src="https://h5.sinaimg.cn/m/emoticon/icon/default/d_xiaoku-f2bd11b506.png" style="width:1em; height:1em;" /></span>'
+        "<br />第二行内容" + "，内容较长" * (index % 10)
+    )
+    status = {
+        "id": BASE_ID - index,
+        "idstr": str(BASE_ID - index),
+        "mid": str(BASE_ID - index),
+        "created_at": time.strftime("%a %b %d %H:%M:%S +0800 %Y", time.localtime(created)),
+        "text": text,
+        "source": "iPhone客户端",
+        "user": user,
+        "reposts_count": index % 97,
+        "comments_count": index % 53,
+        "attitudes_count": index % 211,
+        "pics": [{"pid": f"pic{j}", "url": f"https://wx1.sinaimg.cn/orj360/pic{j}.jpg"} for j in range(index % 4)],
+        "page_info": {},
+        "visible": {"type": 0, "list_id": 0},
+        "mblog_vip_type": 0,
+        "mblogtype": 0,
+        "isLongText": False,
+        "pending_approval_count": 0,
+    }
+    if index % 5 == 0:
+        status["retweeted_status"] = {
+            "id": BASE_ID - index - 500000,
+            "created_at": status["created_at"],
+            "text": "被转发的内容<br />第二行",
+            "user": dict(user, screen_name="原博主"),
+            "reposts_count": 1,
+            "comments_count": 2,
+            "attitudes_count": 3,
+        }
+    return status
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """按路径返回模拟数据，每个请求固定延迟server.delay秒"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.request_count += 1
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        page = int(params.get("page", 1))
+
+        if url.path == "/api/config/list":
+            body = {"ok": 1, "data": {"groups": GROUPS}}
+        elif url.path == "/api/config":
+            body = {"ok": 1, "data": {"login": True, "uid": "", "nick": "benchmark"}}
+        elif url.path in ("/feed/friends", "/feed/group"):
+            feed = params.get("gid", "home")
+            start = (page - 1) * PAGE_SIZE
+            statuses = [make_status(start + i, feed) for i in range(PAGE_SIZE)]
+            body = {"ok": 1, "data": {"statuses": statuses}}
+        else:
+            body = {"ok": 0}
+
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_server(delay: float = 0.0):
+    """在后台线程启动替身服务器，返回(server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.request_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -33,6 +33,9 @@ import argparse
 # 添加当前目录到模块搜索路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# 非交互式子命令，名称与hyperweibo.commands.COMMANDS一致；这里不导入该模块，以免拖慢交互模式的启动
+SUBCOMMANDS = ("export", "search", "daemon")
+
 def parse_args():
     """解析命令行参数"""
     parser = argparse.ArgumentParser(description="微博命令行工具")
@@ -47,7 +50,11 @@ def parse_args():
     parser.add_argument("-b", "--browser", default="chrome", choices=["chrome", "firefox", "edge", "safari"],
                         help="指定浏览器 (默认: chrome)")
     parser.add_argument("-r", "--refresh", type=int, default=0,
-                        help="自动刷新间隔（秒），0表示不自动刷新")
+                        help="自动刷新的最短间隔（秒），在后台按各时间线的活跃程度轮询，0表示不自动刷新")
+    parser.add_argument("--refresh-max", type=int, default=900,
+                        help="自动刷新时安静的时间线最长的轮询间隔（秒） (默认: 900)")
+    parser.add_argument("--refresh-budget", type=int, default=12,
+                        help="自动刷新时每分钟最多的请求数 (默认: 12)")
     parser.add_argument("-m", "--mock", action="store_true",
                         help="使用模拟数据")
     parser.add_argument("-c", "--cookie", type=str,
@@ -58,6 +65,24 @@ def parse_args():
                         help="指定分组ID")
     parser.add_argument("-S", "--special", action="store_true",
                         help="查看特别关注内容")
+    parser.add_argument("-d", "--data-dir", type=str,
+                        help="本地数据目录，用于持久化缓存 (默认: ~/.hyperweibo)")
+    parser.add_argument("--no-store", action="store_true",
+                        help="不使用本地持久化缓存")
+    parser.add_argument("--prefetch", type=int, default=1,
+                        help="在后台预取后续页数，0表示不预取 (默认: 1)")
+    parser.add_argument("--prefetch-prev", action="store_true",
+                        help="同时在后台预取上一页")
+    parser.add_argument("--no-swr", action="store_true",
+                        help="缓存过期时等待网络请求，而不是先显示旧数据")
+    parser.add_argument("--no-credential-cache", action="store_true",
+                        help="不缓存浏览器登录凭据，每次启动都从浏览器读取并验证cookie")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="输出启动各阶段耗时和最慢的导入后退出")
+    parser.add_argument("--hide-seen", action="store_true",
+                        help="隐藏之前看过的微博（包括在其他时间线和之前运行时看过的）")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="后台服务（hyperweibo.py daemon）正在运行时也不使用，由本进程获取数据")
     
     args, unknown = parser.parse_known_args()
     
@@ -69,8 +94,20 @@ def parse_args():
     return args
 
 if __name__ == "__main__":
+    # 非交互式子命令由hyperweibo.commands处理
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        from hyperweibo.commands import COMMANDS
+        sys.exit(COMMANDS[sys.argv[1]](sys.argv[2:]))
+    
+    from hyperweibo.utils import startup
+    
     # 解析语言和风格参数
     args = parse_args()
+    startup.mark("args_parsed")
+    
+    # 在子进程中重新运行并统计启动耗时
+    if args.startup_report:
+        sys.exit(startup.run_report(os.path.abspath(__file__), [arg for arg in sys.argv[1:] if arg != "--startup-report"]))
     
     # 设置环境变量，传递给main模块
     os.environ["HYPERWEIBO_LANGUAGE"] = args.language
@@ -78,5 +115,6 @@ if __name__ == "__main__":
     
     # 导入主程序
     from hyperweibo.main import main
+    startup.mark("modules_imported")
     
     sys.exit(main()) 
\ No newline at end of file
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+微博API异步客户端
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+from hyperweibo.api.weibo_api import WeiboAPI
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWeiboAPI:
+    """
+    WeiboAPI的asyncio版本
+
+    每个请求都交给同一个WeiboAPI实例完成，因此JSON/HTML解析、内存缓存和本地数据库
+    与同步客户端完全一致；并发数由信号量限制，所有请求共享一个按并发数扩容的连接池。
+    """
+
+    def __init__(self, api: Optional[WeiboAPI] = None, concurrency: int = 8, **kwargs):
+        """
+        初始化异步客户端
+
+        Args:
+            api: 已有的WeiboAPI实例，为None时使用kwargs创建
+            concurrency: 最大并发请求数
+            **kwargs: 创建WeiboAPI时的参数，如browser、use_mock、cookie_str
+        """
+        self.api = api or WeiboAPI(**kwargs)
+        self.concurrency = max(1, concurrency)
+        self._semaphore = None
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="hyperweibo-async")
+
+        # 扩大连接池，避免并发请求时连接被反复创建和丢弃
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=self.concurrency)
+        self.api.session.mount("https://", adapter)
+        self.api.session.mount("http://", adapter)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _call(self, func, *args, **kwargs):
+        """在线程池中执行同步方法，同时运行的数量不超过concurrency"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        # 在等待信号量时被取消的任务不会发出请求
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def get_home_timeline(self, page=1) -> List[Dict[str, Any]]:
+        """获取首页微博，参数和返回值同WeiboAPI.get_home_timeline"""
+        return await self._call(self.api.get_home_timeline, page)
+
+    async def get_special_focus(self, page=1) -> List[Dict[str, Any]]:
+        """获取特别关注的微博，参数和返回值同WeiboAPI.get_special_focus"""
+        return await self._call(self.api.get_special_focus, page)
+
+    async def get_group_timeline(self, gid: str, page=1) -> List[Dict[str, Any]]:
+        """获取指定分组的微博，参数和返回值同WeiboAPI.get_group_timeline"""
+        return await self._call(self.api.get_group_timeline, gid, page)
+
+    async def get_groups(self) -> List[Dict[str, Any]]:
+        """获取用户的分组列表，返回值同WeiboAPI.get_groups"""
+        return await self._call(self.api.get_groups)
+
+    async def get_group_registry(self):
+        """获取分组索引，返回值同WeiboAPI.get_group_registry"""
+        return await self._call(self.api.get_group_registry)
+
+    async def get_user_info(self) -> Optional[Dict[str, Any]]:
+        """获取当前登录用户信息，返回值同WeiboAPI.get_user_info"""
+        return await self._call(self.api.get_user_info)
+
+    async def get_group_timelines(self, gids: Iterable[str], page=1) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        并发获取多个分组的同一页微博
+
+        Args:
+            gids: 分组ID列表
+            page: 页码，从1开始
+
+        Returns:
+            {gid: 微博列表}
+        """
+        gids = list(gids)
+        # 先建立一次分组索引，避免每个分组请求都去获取
+        await self.get_group_registry()
+        results = await asyncio.gather(*(self.get_group_timeline(gid, page) for gid in gids))
+        return dict(zip(gids, results))
+
+    async def get_home_pages(self, pages: Iterable[int]) -> List[List[Dict[str, Any]]]:
+        """并发获取首页的多个页面，结果按pages的顺序返回"""
+        return list(await asyncio.gather(*(self.get_home_timeline(page) for page in pages)))
+
+    async def get_group_pages(self, gid: str, pages: Iterable[int]) -> List[List[Dict[str, Any]]]:
+        """并发获取指定分组的多个页面，结果按pages的顺序返回"""
+        await self.get_group_registry()
+        return list(await asyncio.gather(*(self.get_group_timeline(gid, page) for page in pages)))
+
+    async def close(self):
+        """关闭线程池，不等待已发出的请求"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+常驻后台的时间线服务
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import hmac
+import json
+import logging
+import os
+import secrets
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from hyperweibo.api.daemon_client import DaemonClient, PORT_FILE, TOKEN_FILE, daemon_address, format_address
+from hyperweibo.api.models import to_jsonable
+from hyperweibo.api.poller import AdaptivePoller
+from hyperweibo.utils.store import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message, ensure_ascii=False, default=to_jsonable) + "\n").encode("utf-8")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """一个客户端连接：逐行读取JSON请求，按顺序写回JSON响应"""
+
+    def handle(self):
+        daemon = self.server.timeline_daemon
+        daemon.count('connections')
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                daemon.authorize(request.get("token"))
+                result = daemon.dispatch(request.get("method"), request.get("params") or {})
+                reply = {"ok": True, "result": result}
+            except Exception as e:
+                logger.warning(f"处理后台服务请求失败: {str(e)}")
+                reply = {"ok": False, "error": str(e)}
+            try:
+                self.wfile.write(_encode(reply))
+            except OSError:
+                return
+
+
+class _ServerMixin:
+    daemon_threads = True
+    timeline_daemon = None
+
+    def service_actions(self):
+        # serve_forever每轮（约0.5秒）调用一次，清理已经没有终端关注的时间线
+        self.timeline_daemon.expire_leases()
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(_ServerMixin, socketserver.ThreadingUnixStreamServer):
+        pass
+
+
+class _TCPServer(_ServerMixin, socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+
+
+class TimelineDaemon:
+    """
+    常驻后台的时间线服务
+
+    持有一个WeiboAPI（会话、连接池、内存缓存）和一个AdaptivePoller，通过数据目录下的Unix套接字
+    （不支持时为本机TCP端口）提供时间线。协议为每行一个JSON：请求{"method": 方法名, "params": {...}}，
+    响应{"ok": true, "result": ...}或{"ok": false, "error": 错误信息}，一个连接上可以连续发送多个请求。
+    使用TCP端口时本机的其他用户也能连接，请求中还必须有"token"，其值为数据目录下令牌文件中的随机令牌。
+
+    方法: ping、timeline(feed, page, gid, wait_fresh)、groups、user_info、watch(feed, gid)、
+    wait_update(feeds, timeout)、stats、stop。
+    """
+
+    # 终端超过此时间（秒）没有watch或wait_update时，停止轮询该时间线
+    LEASE = 120
+    # wait_update最长的等待时间（秒）
+    MAX_WAIT = 60
+
+    METHODS = ("ping", "timeline", "groups", "user_info", "watch", "wait_update", "stats", "stop")
+
+    def __init__(self, api, data_dir: Optional[str] = None, min_interval: float = 60, max_interval: float = 900,
+                 budget: int = 12):
+        """
+        Args:
+            api: WeiboAPI实例
+            data_dir: 数据目录，套接字或端口号文件保存在其中
+            min_interval: 轮询的最短间隔（秒），见AdaptivePoller
+            max_interval: 轮询的最长间隔（秒）
+            budget: 每分钟最多的轮询请求数
+        """
+        self.api = api
+        self.data_dir = get_data_dir(data_dir)
+        self.address = None
+        self.poller = AdaptivePoller(api, min_interval=min_interval, max_interval=max_interval, budget=budget,
+                                     on_update=self._on_update)
+        self.started_at = time.time()
+        self._server = None
+        self._token = None
+        self._closed = False
+        self._counts = {}
+        self._counts_lock = threading.Lock()
+        # 时间线标识 -> 后台轮询发现的新微博累计数，以及终端最后一次关注的时间
+        self._versions = {}
+        self._leases = {}
+        self._updates = threading.Condition()
+        # WeiboAPI在后台更新得到新数据的次数，timeline(wait_fresh)据此等待旧数据被替换
+        self._revalidations = 0
+        api.on_revalidated = self._on_revalidated
+
+    def bind(self) -> Tuple[int, Any]:
+        """
+        开始监听，已有后台服务在运行时抛出RuntimeError
+
+        Returns:
+            监听的地址
+        """
+        client = DaemonClient.connect(self.data_dir)
+        if client is not None:
+            client.close()
+            raise RuntimeError(f"后台服务已在运行: {format_address(client.address)}")
+
+        address = daemon_address(self.data_dir)
+        if address is not None and address[0] == getattr(socket, "AF_UNIX", None):
+            path = address[1]
+            # 上次异常退出留下的套接字文件
+            if os.path.exists(path):
+                os.unlink(path)
+            # 套接字只允许当前用户连接
+            old_umask = os.umask(0o177)
+            try:
+                self._server = _UnixServer(path, _RequestHandler)
+            finally:
+                os.umask(old_umask)
+        else:
+            self._server = _TCPServer(("127.0.0.1", 0), _RequestHandler)
+            address = (socket.AF_INET, self._server.server_address[:2])
+            # 令牌在端口号之前写入，客户端看到端口号时令牌已经可用
+            self._token = secrets.token_hex(32)
+            self._write_private(TOKEN_FILE, self._token)
+            self._write_private(PORT_FILE, str(address[1][1]))
+        self._server.timeline_daemon = self
+        self.address = address
+        logger.info(f"后台服务开始监听: {format_address(address)}")
+        return address
+
+    def _write_private(self, name: str, content: str):
+        """在数据目录中写入仅当前用户可读写的文件"""
+        path = os.path.join(self.data_dir, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def authorize(self, token: Optional[str]):
+        """检查请求中的令牌，使用TCP端口且令牌不符时抛出PermissionError"""
+        if self._token is not None and not (isinstance(token, str) and hmac.compare_digest(token, self._token)):
+            raise PermissionError("访问令牌无效")
+
+    def serve_forever(self):
+        """处理请求直到stop或中断，退出时删除套接字并关闭WeiboAPI"""
+        if self._server is None:
+            self.bind()
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        """让serve_forever返回，可在任意线程调用"""
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def close(self):
+        """停止轮询，唤醒正在等待更新的请求，删除套接字并关闭WeiboAPI"""
+        self.poller.shutdown()
+        with self._updates:
+            self._closed = True
+            self._updates.notify_all()
+        if self._server is not None:
+            self._server.server_close()
+            family, addr = self.address
+            if family == getattr(socket, "AF_UNIX", None):
+                paths = [addr]
+            else:
+                paths = [os.path.join(self.data_dir, PORT_FILE), os.path.join(self.data_dir, TOKEN_FILE)]
+            for path in paths:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            self._server = None
+        self.api.close()
+
+    def dispatch(self, method: str, params: Dict[str, Any]) -> Any:
+        """执行一个请求，未知方法抛出ValueError"""
+        if method not in self.METHODS:
+            raise ValueError(f"未知的方法: {method}")
+        self.count('requests')
+        return getattr(self, f"_do_{method}")(**params)
+
+    def count(self, name: str):
+        with self._counts_lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def expire_leases(self, now: Optional[float] = None):
+        """停止轮询已经没有终端关注的时间线"""
+        now = now or time.time()
+        with self._updates:
+            expired = [key for key, seen_at in self._leases.items() if seen_at < now - self.LEASE]
+            if not expired:
+                return
+            for key in expired:
+                del self._leases[key]
+            keys = list(self._leases)
+        logger.info(f"停止轮询没有终端关注的时间线: {expired}")
+        self.poller.retain(keys)
+
+    def _on_update(self, key, count: int):
+        with self._updates:
+            self._versions[key] = self._versions.get(key, 0) + count
+            self._updates.notify_all()
+
+    def _on_revalidated(self, key):
+        with self._updates:
+            self._revalidations += 1
+            self._updates.notify_all()
+
+    def _watch(self, feed: str, gid: Optional[str]) -> Tuple[str, Optional[str]]:
+        """续订终端对时间线的关注，尚未轮询时开始轮询"""
+        key = (feed, gid if feed == "group" else None)
+        with self._updates:
+            new = key not in self._leases
+            self._leases[key] = time.time()
+        if new:
+            self.poller.watch(*key)
+        return key
+
+    def _do_ping(self) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "mock": bool(self.api.use_mock), "uptime": time.time() - self.started_at}
+
+    def _read_timeline(self, feed: str, page: int, gid: Optional[str]) -> Tuple[str, List[Any]]:
+        """读取时间线的一页，返回(规范化的feed, 微博列表)"""
+        if feed == "special":
+            return feed, self.api.get_special_focus(page=page)
+        if feed == "group":
+            if not gid:
+                raise ValueError("缺少分组ID")
+            return feed, self.api.get_group_timeline(gid, page=page)
+        return "home", self.api.get_home_timeline(page=page)
+
+    def _do_timeline(self, feed: str = "home", page: int = 1, gid: Optional[str] = None,
+                     wait_fresh: float = 0) -> Dict[str, Any]:
+        """
+        获取时间线的一页
+
+        Args:
+            feed: "home"、"special"或"group"
+            page: 页码
+            gid: feed为"group"时的分组ID
+            wait_fresh: 得到过期的缓存数据时，最多等待后台更新的秒数，0表示立即返回
+
+        Returns:
+            {"statuses": 微博列表, "stale": 是否为旧数据, "version": 新微博累计数}
+        """
+        page = max(1, int(page))
+        with self._updates:
+            revalidations = self._revalidations
+        feed, statuses = self._read_timeline(feed, page, gid)
+
+        # 任一页后台更新完成后重新读取，直到不再是旧数据或超时
+        deadline = time.time() + min(max(0.0, float(wait_fresh)), self.MAX_WAIT)
+        while getattr(statuses, "stale", False):
+            with self._updates:
+                while self._revalidations == revalidations and not self._closed:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._updates.wait(remaining)
+                if self._revalidations == revalidations:
+                    break
+                revalidations = self._revalidations
+            feed, statuses = self._read_timeline(feed, page, gid)
+
+        key = (feed, gid if feed == "group" else None)
+        with self._updates:
+            watched = key in self._leases
+            version = self._versions.get(key, 0)
+        # 终端看到的第1页作为判断新微博的基准
+        if page == 1 and watched:
+            self.poller.watch(*key, statuses=statuses)
+        return {"statuses": list(statuses), "stale": bool(getattr(statuses, "stale", False)), "version": version}
+
+    def _do_groups(self) -> Dict[str, Any]:
+        registry = self.api.get_group_registry()
+        return {"groups": registry.groups, "version": registry.version}
+
+    def _do_user_info(self) -> Optional[Dict[str, Any]]:
+        return self.api.get_user_info()
+
+    def _do_watch(self, feed: str = "home", gid: Optional[str] = None) -> Dict[str, Any]:
+        key = self._watch(feed, gid)
+        with self._updates:
+            return {"version": self._versions.get(key, 0)}
+
+    def _do_wait_update(self, feeds: List[List[Any]], timeout: float = 15) -> Dict[str, Any]:
+        """
+        等待任一时间线的新微博累计数超过终端已知的值
+
+        Args:
+            feeds: [[feed, gid, 已知的累计数], ...]
+            timeout: 最多等待的秒数
+
+        Returns:
+            {"feeds": [[feed, gid, 当前累计数], ...]}
+        """
+        known = {self._watch(feed, gid): version for feed, gid, version in feeds}
+        deadline = time.time() + min(max(0.0, float(timeout)), self.MAX_WAIT)
+        with self._updates:
+            while not self._closed:
+                if any(self._versions.get(key, 0) > version for key, version in known.items()):
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._updates.wait(remaining)
+            return {"feeds": [[feed, gid, self._versions.get((feed, gid), 0)] for feed, gid in known]}
+
+    def _do_stats(self) -> Dict[str, Any]:
+        with self._counts_lock:
+            counts = dict(self._counts)
+        return {
+            "pid": os.getpid(),
+            "address": format_address(self.address) if self.address else None,
+            "uptime": time.time() - self.started_at,
+            "counts": counts,
+            "poller": self.poller.stats(),
+            "requests": self.api.request_stats(),
+            "cache": self.api.cache_stats(),
+        }
+
+    def _do_stop(self) -> Dict[str, Any]:
+        logger.info("收到停止请求，后台服务即将退出")
+        self.shutdown()
+        return {}
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+后台服务的客户端
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from hyperweibo.api.groups import GroupRegistry
+from hyperweibo.api.models import TimelineResult, project_statuses
+from hyperweibo.utils.store import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+# 数据目录下的Unix套接字；不支持Unix套接字的系统改用本机TCP端口，端口号记录在PORT_FILE中
+SOCKET_NAME = "daemon.sock"
+PORT_FILE = "daemon.port"
+# 使用TCP端口时本机的任何用户都能连接，每个请求都必须带上TOKEN_FILE（仅当前用户可读）中的令牌
+TOKEN_FILE = "daemon.token"
+
+
+class DaemonError(RuntimeError):
+    """后台服务返回的错误"""
+
+
+def daemon_address(data_dir: Optional[str] = None) -> Optional[Tuple[int, Any]]:
+    """
+    获取数据目录对应的后台服务地址
+
+    Args:
+        data_dir: 数据目录，默认见get_data_dir
+
+    Returns:
+        (地址族, 地址)，使用TCP且没有记录端口号时返回None
+    """
+    data_dir = get_data_dir(data_dir)
+    if hasattr(socket, "AF_UNIX"):
+        return socket.AF_UNIX, os.path.join(data_dir, SOCKET_NAME)
+    try:
+        with open(os.path.join(data_dir, PORT_FILE), encoding="utf-8") as f:
+            return socket.AF_INET, ("127.0.0.1", int(f.read().strip()))
+    except (OSError, ValueError):
+        return None
+
+
+def daemon_token(data_dir: Optional[str] = None) -> Optional[str]:
+    """
+    读取后台服务的访问令牌
+
+    Args:
+        data_dir: 数据目录，默认见get_data_dir
+
+    Returns:
+        令牌，使用Unix套接字或没有令牌文件时返回None
+    """
+    if hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        with open(os.path.join(get_data_dir(data_dir), TOKEN_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def format_address(address: Tuple[int, Any]) -> str:
+    """地址的可读形式"""
+    family, addr = address
+    return addr if family == getattr(socket, "AF_UNIX", None) else f"{addr[0]}:{addr[1]}"
+
+
+class _Connection:
+    """到后台服务的一个连接，请求和响应都是一行JSON"""
+
+    def __init__(self, address: Tuple[int, Any], timeout: float):
+        family, addr = address
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(addr)
+        except OSError:
+            self.sock.close()
+            raise
+        self.rfile = self.sock.makefile("rb")
+
+    def request(self, payload: bytes, timeout: float) -> bytes:
+        self.sock.settimeout(timeout)
+        self.sock.sendall(payload)
+        return self.rfile.readline()
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+
+class DaemonClient:
+    """
+    后台服务（hyperweibo.py daemon）的客户端
+
+    提供界面用到的WeiboAPI方法，请求由后台服务中常驻的WeiboAPI完成，多个终端共用其连接、缓存和轮询。
+    每个线程使用自己的连接，预取和合并时间线的并发请求互不阻塞。
+    """
+
+    # 得到旧数据时等待后台服务更新该页的最长时间（秒），后台服务的上限为TimelineDaemon.MAX_WAIT
+    FRESH_WAIT = 60
+
+    def __init__(self, address: Tuple[int, Any], timeout: float = 60, token: Optional[str] = None):
+        """
+        Args:
+            address: daemon_address返回的地址
+            timeout: 等待响应的默认超时（秒）
+            token: daemon_token返回的访问令牌，使用TCP端口时每个请求都会带上
+        """
+        self.address = address
+        self.timeout = timeout
+        self.token = token
+        self.use_mock = False
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._group_registry = None
+        # 得到旧数据的页面在后台更新完成后调用，参数为(feed, gid, page)，同WeiboAPI.on_revalidated
+        self.on_revalidated = None
+        self._revalidate_executor = None
+
+    @classmethod
+    def connect(cls, data_dir: Optional[str] = None, timeout: float = 60) -> Optional["DaemonClient"]:
+        """
+        连接数据目录对应的后台服务
+
+        Returns:
+            DaemonClient，后台服务没有运行时返回None
+        """
+        address = daemon_address(data_dir)
+        if address is None:
+            return None
+        client = cls(address, timeout, daemon_token(data_dir))
+        try:
+            info = client.call("ping", timeout=2)
+        except (OSError, ValueError, DaemonError):
+            client.close()
+            return None
+        client.use_mock = bool(info.get("mock"))
+        return client
+
+    def call(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        """
+        调用后台服务的方法
+
+        Args:
+            method: 方法名，见TimelineDaemon
+            params: 参数
+            timeout: 等待响应的超时（秒），默认为self.timeout
+
+        Returns:
+            方法的返回值，后台服务返回错误时抛出DaemonError，连接断开时抛出ConnectionError
+        """
+        request = {"method": method, "params": params or {}}
+        if self.token is not None:
+            request["token"] = self.token
+        payload = (json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8")
+        connection = self._connection()
+        try:
+            line = connection.request(payload, timeout or self.timeout)
+        except OSError:
+            self._discard(connection)
+            raise
+        if not line:
+            self._discard(connection)
+            raise ConnectionError("后台服务已断开连接")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise DaemonError(reply.get("error") or "未知错误")
+        return reply.get("result")
+
+    def get_home_timeline(self, page=1) -> List[Any]:
+        """获取首页微博，参数和返回值同WeiboAPI.get_home_timeline"""
+        return self._timeline("home", page)
+
+    def get_special_focus(self, page=1) -> List[Any]:
+        """获取特别关注的微博，参数和返回值同WeiboAPI.get_special_focus"""
+        return self._timeline("special", page)
+
+    def get_group_timeline(self, gid: str, page=1) -> List[Any]:
+        """获取指定分组的微博，参数和返回值同WeiboAPI.get_group_timeline"""
+        return self._timeline("group", page, gid)
+
+    def get_groups(self) -> List[Dict[str, Any]]:
+        """获取用户的分组列表，返回值同WeiboAPI.get_groups"""
+        return self.get_group_registry().groups
+
+    def get_group_registry(self) -> GroupRegistry:
+        """获取分组索引，后台服务中的分组版本没有变化时复用上次的索引"""
+        result = self.call("groups")
+        registry = self._group_registry
+        if registry is None or registry.version != result["version"]:
+            registry = self._group_registry = GroupRegistry(result["groups"], result["version"])
+        return registry
+
+    def get_user_info(self) -> Optional[Dict[str, Any]]:
+        """获取当前登录用户信息，返回值同WeiboAPI.get_user_info"""
+        return self.call("user_info")
+
+    def stats(self) -> Dict[str, Any]:
+        """后台服务的运行时间、请求数、缓存和轮询统计"""
+        return self.call("stats")
+
+    def stop(self):
+        """停止后台服务"""
+        self.call("stop")
+
+    def close(self):
+        """关闭所有连接"""
+        if self._revalidate_executor is not None:
+            self._revalidate_executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def _timeline(self, feed: str, page, gid: Optional[str] = None) -> List[Any]:
+        result = self.call("timeline", {"feed": feed, "page": page, "gid": gid})
+        if result["stale"] and self.on_revalidated is not None:
+            with self._lock:
+                if self._revalidate_executor is None:
+                    self._revalidate_executor = ThreadPoolExecutor(max_workers=2,
+                                                                   thread_name_prefix="hyperweibo-revalidate")
+            self._revalidate_executor.submit(self._wait_fresh, feed, page, gid)
+        return TimelineResult(project_statuses(result["statuses"]), result["stale"])
+
+    def _wait_fresh(self, feed: str, page, gid: Optional[str]):
+        """等待后台服务更新过期的页面，得到新数据后调用on_revalidated"""
+        try:
+            result = self.call("timeline", {"feed": feed, "page": page, "gid": gid, "wait_fresh": self.FRESH_WAIT},
+                               timeout=self.FRESH_WAIT + 30)
+        except (OSError, ValueError, DaemonError) as e:
+            logger.warning(f"等待后台服务更新页面失败: {str(e)}")
+            return
+        if not result["stale"] and self.on_revalidated is not None:
+            self.on_revalidated((feed, gid, page))
+
+    def _connection(self) -> _Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = _Connection(self.address, self.timeout)
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _discard(self, connection: _Connection):
+        """丢弃出错的连接，下次调用时重新连接"""
+        self._local.connection = None
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+        connection.close()
+
+
+class RemotePoller:
+    """
+    接口与AdaptivePoller相同的轮询器，轮询由后台服务完成
+
+    watch让后台服务开始轮询时间线；后台线程以长轮询等待这些时间线出现新微博，
+    然后调用on_update。多个终端显示同一时间线时共用后台服务的一次轮询。
+    """
+
+    def __init__(self, client: DaemonClient, on_update: Optional[Callable[[Tuple[str, Optional[str]], int], None]] = None,
+                 wait_timeout: float = 15):
+        """
+        Args:
+            client: DaemonClient
+            on_update: 发现新微博时在轮询线程中调用，参数为(时间线标识, 新微博数)
+            wait_timeout: 每次长轮询最多等待的秒数
+        """
+        self.client = client
+        self.on_update = on_update
+        self.wait_timeout = wait_timeout
+        # 时间线标识 -> 已知的新微博累计数
+        self._versions = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def watch(self, feed: str, gid: Optional[str] = None, statuses: Optional[Iterable[Any]] = None):
+        """让后台服务轮询时间线；statuses不需要，后台服务以它返回的第1页为基准"""
+        key = (feed, gid)
+        with self._cond:
+            if key in self._versions:
+                return
+        version = self.client.call("watch", {"feed": feed, "gid": gid})["version"]
+        with self._cond:
+            self._versions.setdefault(key, version)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="hyperweibo-remote-poller", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def retain(self, keys: Iterable[Tuple[str, Optional[str]]]):
+        """不再关注不在keys中的时间线，后台服务在没有终端关注后停止轮询"""
+        keys = set(keys)
+        with self._cond:
+            for key in [key for key in self._versions if key not in keys]:
+                del self._versions[key]
+
+    def is_watching(self, key: Tuple[str, Optional[str]]) -> bool:
+        with self._cond:
+            return key in self._versions
+
+    def shutdown(self):
+        """停止轮询线程"""
+        with self._cond:
+            self._stopped = True
+            self._versions.clear()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and not self._versions:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                feeds = [[feed, gid, version] for (feed, gid), version in self._versions.items()]
+
+            try:
+                result = self.client.call("wait_update", {"feeds": feeds, "timeout": self.wait_timeout},
+                                          timeout=self.wait_timeout + 30)
+            except (OSError, ValueError, DaemonError) as e:
+                logger.warning(f"等待后台服务的更新失败: {str(e)}")
+                with self._cond:
+                    self._cond.wait(5)
+                continue
+
+            for feed, gid, version in result["feeds"]:
+                key = (feed, gid)
+                with self._cond:
+                    known = self._versions.get(key)
+                    if known is None or version <= known:
+                        continue
+                    self._versions[key] = version
+                if self.on_update is not None:
+                    self.on_update(key, version - known)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+时间线批量导出
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import datetime
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from hyperweibo.api.models import to_jsonable
+from hyperweibo.api.sync import status_id
+
+logger = logging.getLogger(__name__)
+
+# 相对时间的单位，如"7d"表示7天前
+_RELATIVE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+_RELATIVE_RE = re.compile(r'^(\d+(?:\.\d+)?)([smhdw])$')
+
+
+def parse_cutoff(value: str, now: Optional[float] = None) -> float:
+    """
+    解析导出的截止时间
+
+    Args:
+        value: Unix时间戳、ISO格式日期时间（如2024-01-31或2024-01-31T12:00:00+08:00）、
+               或相对时间（如30m、12h、7d、2w）
+        now: 当前时间，默认为time.time()
+
+    Returns:
+        截止时间的Unix时间戳，无法解析时抛出ValueError
+    """
+    value = value.strip()
+    match = _RELATIVE_RE.match(value)
+    if match:
+        return (now or time.time()) - float(match.group(1)) * _RELATIVE_UNITS[match.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    # 没有时区的日期时间按本地时间处理
+    return datetime.datetime.fromisoformat(value).timestamp()
+
+
+class ExportCheckpoint:
+    """导出进度文件，每写完一页更新一次，用于中断后从下一页继续"""
+
+    # 用于跨页去重的最近微博ID数量
+    RECENT_IDS = 200
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """读取进度，不存在或已损坏时返回None"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"导出进度文件无法读取，将重新开始: {str(e)}")
+            return None
+
+    def save(self, state: Dict[str, Any]):
+        """原子地写入进度"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def delete(self):
+        """删除进度文件"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class TimelineExporter:
+    """
+    把时间线流式导出为NDJSON文件（每行一条微博的JSON），可选gzip压缩
+
+    多个页面并发获取，但按页码顺序写出；同时进行的请求数固定，已写出的页面立即释放，
+    因此内存占用与导出的页数无关。每写完一页都会记录文件长度和下一页的页码，
+    中断后再次运行时截掉最后一次记录之后写入的不完整内容，从下一页继续。
+    gzip文件每页是一个独立的gzip成员，连接后仍是合法的gzip文件。
+    """
+
+    def __init__(self, api, output: str, feed: str = "home", gid: Optional[str] = None,
+                 start_page: int = 1, end_page: Optional[int] = None, older_than: Optional[float] = None,
+                 concurrency: int = 4, compress: Optional[bool] = None,
+                 progress: Optional[Callable[[int, int, int], None]] = None, seen_index=None):
+        """
+        初始化导出任务
+
+        Args:
+            api: WeiboAPI实例
+            output: 输出文件路径，进度文件为同目录下的"<output>.checkpoint"
+            feed: "home"、"special"或"group"
+            gid: feed为"group"时的分组ID
+            start_page: 起始页码
+            end_page: 结束页码（包含），为None时导出到older_than或时间线末尾
+            older_than: 截止时间戳，遇到比它更早的微博时停止
+            concurrency: 同时获取的页数
+            compress: 是否gzip压缩，为None时按文件名是否以.gz结尾判断
+            progress: 每写完一页调用一次，参数为(页码, 本页写出条数, 累计条数)
+            seen_index: 已导出微博的SeenIndex，跳过其中的微博并记录新导出的微博，为None时不跳过
+        """
+        if end_page is None and older_than is None:
+            raise ValueError("必须指定结束页码或截止时间")
+        self.api = api
+        self.output = output
+        self.feed = feed
+        self.gid = gid
+        self.start_page = max(1, start_page)
+        self.end_page = end_page
+        self.older_than = older_than
+        self.concurrency = max(1, concurrency)
+        self.compress = output.endswith('.gz') if compress is None else compress
+        self.progress = progress
+        self.seen_index = seen_index
+        self.checkpoint = ExportCheckpoint(f"{output}.checkpoint")
+        self.stats = {'pages': 0, 'exported': 0, 'duplicates': 0, 'skipped_seen': 0, 'resumed_from': None}
+
+    def _job(self) -> Dict[str, Any]:
+        """描述导出任务的参数，只有参数相同的进度才能继续"""
+        return {
+            'feed': self.feed,
+            'gid': self.gid,
+            'start_page': self.start_page,
+            'end_page': self.end_page,
+            'older_than': self.older_than,
+            'compress': self.compress,
+        }
+
+    def _output_covers(self, offset: int) -> bool:
+        """输出文件是否存在且至少有进度记录的长度，被删除、移走或截短时无法继续"""
+        try:
+            return os.path.getsize(self.output) >= offset
+        except OSError:
+            return False
+
+    def run(self, restart: bool = False) -> Dict[str, Any]:
+        """
+        执行导出
+
+        Args:
+            restart: 忽略已有的进度，重新导出
+
+        Returns:
+            统计信息：导出的页数、条数、跨页重复被跳过的条数和继续的起始页
+        """
+        job = self._job()
+        state = None if restart else self.checkpoint.load()
+        if state is not None and state.get('job') != job:
+            logger.warning("导出进度与当前参数不一致，将重新开始")
+            state = None
+        if state is not None and not self._output_covers(state.get('offset', 0)):
+            logger.warning(f"输出文件不存在或比进度记录的长度短，将重新开始: {self.output}")
+            state = None
+
+        if state is None:
+            state = {'job': job, 'next_page': self.start_page, 'offset': 0, 'exported': 0, 'recent_ids': []}
+            with open(self.output, 'wb'):
+                pass
+        else:
+            self.stats['resumed_from'] = state['next_page']
+            logger.info(f"从第{state['next_page']}页继续导出: {self.output}")
+
+        # 最近写出的微博ID，翻页期间有新微博时相邻页面会有重复
+        recent_ids = OrderedDict.fromkeys(state['recent_ids'])
+
+        with open(self.output, 'r+b') as f, ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="hyperweibo-export") as executor:
+            # 丢弃上次中断时最后一次记录之后写入的内容
+            f.truncate(state['offset'])
+            f.seek(state['offset'])
+
+            page = state['next_page']
+            pending = OrderedDict()
+            done = False
+            try:
+                while not done and (self.end_page is None or page <= self.end_page):
+                    # 保持固定数量的页面在获取中
+                    next_submit = page + len(pending)
+                    while len(pending) < self.concurrency and (self.end_page is None or next_submit <= self.end_page):
+                        pending[next_submit] = executor.submit(self.api.fetch_timeline_page, self.feed, next_submit, self.gid)
+                        next_submit += 1
+
+                    statuses = pending.pop(page).result()
+                    lines = []
+                    page_ids = []
+                    for status in statuses:
+                        if self.older_than is not None and status.get('created_ts') is not None \
+                                and status['created_ts'] < self.older_than:
+                            done = True
+                            continue
+                        sid = status_id(status)
+                        if sid and sid in recent_ids:
+                            self.stats['duplicates'] += 1
+                            continue
+                        if sid and self.seen_index is not None and sid in self.seen_index:
+                            self.stats['skipped_seen'] += 1
+                            continue
+                        if sid:
+                            page_ids.append(sid)
+                            recent_ids[sid] = None
+                            if len(recent_ids) > ExportCheckpoint.RECENT_IDS:
+                                recent_ids.popitem(last=False)
+                        # api以keep_raw=True创建时导出接口返回的原始数据
+                        record = getattr(status, 'raw', None) or status
+                        lines.append(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=to_jsonable))
+                    if not statuses:
+                        # 时间线已经到底
+                        done = True
+
+                    if lines:
+                        chunk = ('\n'.join(lines) + '\n').encode('utf-8')
+                        f.write(gzip.compress(chunk, mtime=0) if self.compress else chunk)
+                        f.flush()
+
+                    state['exported'] += len(lines)
+                    state['offset'] = f.tell()
+                    state['next_page'] = page + 1
+                    state['recent_ids'] = list(recent_ids)
+                    self.checkpoint.save(state)
+                    # 进度写入后才记录，中断后重新导出的页面不会被当作已导出
+                    if self.seen_index is not None:
+                        self.seen_index.update(page_ids)
+
+                    self.stats['pages'] += 1
+                    if self.progress:
+                        self.progress(page, len(lines), state['exported'])
+                    page += 1
+            finally:
+                for future in pending.values():
+                    future.cancel()
+                if self.seen_index is not None:
+                    self.seen_index.save()
+
+        # 正常结束时删除进度文件，中断（包括请求失败）时保留以便继续
+        self.checkpoint.delete()
+        self.stats['exported'] = state['exported']
+        return self.stats
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分组索引
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 特别关注分组的名称
+SPECIAL_FOCUS_NAME = "特别关注"
+
+
+def group_signature(groups: Iterable[Dict[str, Any]]) -> Tuple[Tuple[Any, Any], ...]:
+    """分组列表的成员签名，由每个分组的(gid, name)按顺序组成"""
+    return tuple((group.get("gid"), group.get("name")) for group in groups)
+
+
+class GroupRegistry:
+    """
+    一次获取的分组列表及其索引，按gid和名称查找都是O(1)
+
+    gid或名称重复时以列表中第一个为准，与按顺序查找的结果一致；
+    version在分组成员变化时递增，依赖分组的缓存可据此判断是否需要失效。
+    """
+
+    __slots__ = ('groups', 'version', 'signature', 'special_focus_gid', '_by_gid', '_by_name')
+
+    def __init__(self, groups: List[Dict[str, Any]], version: int = 0):
+        """
+        建立分组索引
+
+        Args:
+            groups: get_groups返回的分组列表，每个分组包含gid和name
+            version: 版本号
+        """
+        self.groups = groups
+        self.version = version
+        self.signature = group_signature(groups)
+        self._by_gid = {}
+        self._by_name = {}
+        for group in groups:
+            self._by_gid.setdefault(group.get("gid"), group)
+            self._by_name.setdefault(group.get("name"), group)
+
+        special_focus = self._by_name.get(SPECIAL_FOCUS_NAME)
+        self.special_focus_gid = special_focus.get("gid") if special_focus else None
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __iter__(self):
+        return iter(self.groups)
+
+    def __contains__(self, gid):
+        return gid in self._by_gid
+
+    def by_gid(self, gid: str) -> Optional[Dict[str, Any]]:
+        """按分组ID查找分组，不存在时返回None"""
+        return self._by_gid.get(gid)
+
+    def by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """按分组名称查找分组，不存在时返回None"""
+        return self._by_name.get(name)
+
+    def is_special_focus(self, gid: str) -> bool:
+        """判断分组ID是否为特别关注分组"""
+        return gid is not None and gid == self.special_focus_gid
+
+    def refreshed(self, groups: List[Dict[str, Any]]) -> "GroupRegistry":
+        """
+        用新获取的分组列表建立索引
+
+        Args:
+            groups: 新的分组列表
+
+        Returns:
+            新的GroupRegistry，成员不变时沿用当前版本号，否则版本号加一
+        """
+        registry = GroupRegistry(groups, self.version)
+        if registry.signature != self.signature:
+            registry.version += 1
+        return registry
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多分组合并时间线
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import heapq
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, List, Optional, Tuple
+
+from hyperweibo.api.sync import status_id
+
+logger = logging.getLogger(__name__)
+
+
+class _Source:
+    """一个分组的读取位置：当前页的微博和下一条未合并微博的下标"""
+
+    __slots__ = ('gid', 'page', 'statuses', 'index', 'exhausted')
+
+    def __init__(self, gid: str):
+        self.gid = gid
+        self.page = 1
+        self.statuses = []
+        self.index = 0
+        self.exhausted = False
+
+    def head(self) -> Optional[Any]:
+        """下一条未合并的微博，当前页已读完时返回None"""
+        return self.statuses[self.index] if self.index < len(self.statuses) else None
+
+
+def _sort_key(status) -> Tuple[float, int]:
+    """堆中的排序键：时间越新越靠前，同一时间按ID从大到小，同一条微博的多个副本因此相邻"""
+    return -(status.get('created_ts') or 0), -status_id(status)
+
+
+class MergedFeed:
+    """
+    按时间从新到旧合并多个分组的时间线
+
+    每个分组只持有当前页，堆中每个分组只有一条候选微博（k路归并）；某个分组的当前页读完时
+    才获取它的下一页。出现在多个分组中的同一条微博只返回一次。每屏开始时记录各分组的读取位置，
+    返回前面的页时从记录的位置重新合并（分组页面通常仍在缓存中），因此内存占用与已浏览的页数无关。
+    """
+
+    def __init__(self, api, gids: Iterable[str], page_size: int = 20, concurrency: int = 8):
+        """
+        初始化合并时间线
+
+        Args:
+            api: WeiboAPI实例
+            gids: 要合并的分组ID
+            page_size: 每屏的微博数
+            concurrency: 同时获取分组页面的请求数
+        """
+        self.api = api
+        self.gids = list(dict.fromkeys(gids))
+        self.page_size = max(1, page_size)
+        self._sources = [_Source(gid) for gid in self.gids]
+        self._executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(self.gids) or 1)),
+                                            thread_name_prefix="hyperweibo-merge")
+        self._lock = threading.Lock()
+        self._heap = []
+        self._last_id = None
+        # 第n屏开始时各分组的(页码, 下标)以及上一条返回的微博ID
+        self._screens = []
+        # 当前读取位置是第几屏的开始
+        self._screen = 0
+        self.stats = {'pages_fetched': 0, 'duplicates': 0}
+
+    def page(self, number: int) -> List[Any]:
+        """
+        获取合并结果的第number屏
+
+        Args:
+            number: 屏序号，从1开始
+
+        Returns:
+            按从新到旧排列的微博列表，所有分组都已读完时返回空列表
+        """
+        number = max(1, number)
+        with self._lock:
+            if not self._screens:
+                self._restore(tuple((1, 0) for _ in self._sources), None)
+                self._screens.append(self._snapshot())
+                self._screen = 1
+            if number != self._screen:
+                # 从不超过目标的最近一屏的开始位置重新合并
+                start = min(number, len(self._screens))
+                self._restore(*self._screens[start - 1])
+                self._screen = start
+
+            # 跳过目标之前的屏，顺序翻页时不会进入循环
+            while self._screen < number:
+                if not self._next_screen():
+                    return []
+            return self._next_screen()
+
+    def _next_screen(self) -> List[Any]:
+        """取出一屏微博，并记录下一屏的开始位置"""
+        items = self._take(self.page_size)
+        self._screen += 1
+        if self._screen > len(self._screens):
+            self._screens.append(self._snapshot())
+        return items
+
+    def _take(self, count: int) -> List[Any]:
+        """从堆中依次取出最多count条不重复的微博"""
+        items = []
+        while self._heap and len(items) < count:
+            _, source_index, status = heapq.heappop(self._heap)
+            self._advance(source_index)
+
+            sid = status_id(status)
+            if sid and sid == self._last_id:
+                self.stats['duplicates'] += 1
+                continue
+            self._last_id = sid
+            items.append(status)
+        return items
+
+    def _advance(self, source_index: int):
+        """分组的下标后移，当前页读完时获取下一页，然后把新的候选微博放入堆中"""
+        source = self._sources[source_index]
+        source.index += 1
+        if source.head() is None and not source.exhausted:
+            self._load(source, source.page + 1, 0)
+        self._push(source_index)
+
+    def _push(self, source_index: int):
+        head = self._sources[source_index].head()
+        if head is not None:
+            heapq.heappush(self._heap, (_sort_key(head), source_index, head))
+
+    def _load(self, source: _Source, page: int, index: int):
+        """获取分组的指定页并定位到index"""
+        source.page = page
+        source.index = index
+        try:
+            source.statuses = list(self.api.get_group_timeline(source.gid, page))
+        except Exception as e:
+            logger.warning(f"获取分组{source.gid}第{page}页失败: {str(e)}")
+            source.statuses = []
+        self.stats['pages_fetched'] += 1
+        source.exhausted = not source.statuses
+
+    def _snapshot(self):
+        """当前各分组的读取位置，堆中的候选微博视为尚未读取"""
+        return tuple((source.page, source.index) for source in self._sources), self._last_id
+
+    def _restore(self, positions, last_id):
+        """把各分组恢复到记录的位置，并发获取各分组的当前页后重建堆"""
+        def load(args):
+            source, (page, index) = args
+            self._load(source, page, index)
+            # 重新获取的页面变短时从下一页开始
+            if source.head() is None and not source.exhausted:
+                self._load(source, page + 1, 0)
+
+        list(self._executor.map(load, zip(self._sources, positions)))
+        self._heap = []
+        for source_index in range(len(self._sources)):
+            self._push(source_index)
+        self._last_id = last_id
+
+    def close(self):
+        """关闭线程池"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+微博数据模型
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+# 视频信息中保留的字段
+_MEDIA_INFO_KEYS = ('duration', 'stream_url', 'stream_url_hd', 'mp4_sd_url', 'mp4_hd_url', 'h5_url')
+
+
+class _Model:
+    """
+    只保留所需字段的数据模型，读取方式与dict相同
+
+    值为None的字段视为不存在：get返回默认值，下标访问抛出KeyError，to_dict中省略。
+    """
+
+    __slots__ = ()
+
+    # 可以像dict一样读取的字段
+    FIELDS = ()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取字段，不存在时返回default"""
+        if key not in self.FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def keys(self) -> List[str]:
+        """存在的字段名"""
+        return [key for key in self.FIELDS if self.get(key) is not None]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可JSON序列化的dict，嵌套的模型也一并转换"""
+        result = {}
+        for key in self.FIELDS:
+            value = self.get(key)
+            if value is not None:
+                result[key] = value.to_dict() if isinstance(value, _Model) else value
+        return result
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class User(_Model):
+    """微博作者"""
+
+    __slots__ = ('id', 'screen_name', 'verified', 'verified_type', 'profile_image_url')
+
+    FIELDS = __slots__
+
+    def __init__(self, id=None, screen_name=None, verified=None, verified_type=None, profile_image_url=None):
+        self.id = id
+        self.screen_name = screen_name
+        self.verified = verified
+        self.verified_type = verified_type
+        self.profile_image_url = profile_image_url
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "User":
+        """从接口返回的用户对象中提取所需字段"""
+        if isinstance(data, User):
+            return data
+        return cls(data.get('id'), data.get('screen_name'), data.get('verified'),
+                   data.get('verified_type'), data.get('profile_image_url'))
+
+
+class Status(_Model):
+    """
+    一条微博
+
+    只保留格式化、交互界面和导出用到的字段；图片只保留地址，视频只保留时长和播放地址。
+    raw为创建时传入的原始数据，只在keep_raw=True时保留。
+    """
+
+    __slots__ = ('id', 'mid', 'created_at', 'created_ts', 'text', 'source', 'user',
+                 'reposts_count', 'comments_count', 'attitudes_count', 'pics', 'page_info',
+                 'retweeted_status', 'quote', 'attachments', 'quotes', 'comments', 'likes', 'time', 'raw')
+
+    # idstr由id生成，raw不作为字段读取
+    FIELDS = ('id', 'idstr') + __slots__[1:-1]
+
+    def __init__(self, **fields):
+        for key in self.__slots__:
+            setattr(self, key, fields.get(key))
+
+    @property
+    def idstr(self) -> Optional[str]:
+        """字符串形式的微博ID"""
+        return str(self.id) if self.id is not None else None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], keep_raw: bool = False) -> "Status":
+        """
+        从接口返回的微博对象中提取所需字段
+
+        Args:
+            data: 微博对象（接口JSON、HTML解析结果或to_dict的结果）
+            keep_raw: 是否保留原始数据，可通过raw访问
+
+        Returns:
+            Status实例，data已经是Status时原样返回
+        """
+        if isinstance(data, Status):
+            return data
+
+        sid = data.get('id') or data.get('idstr') or data.get('mid')
+        try:
+            sid = int(sid) if sid is not None else None
+        except (TypeError, ValueError):
+            pass
+        mid = data.get('mid')
+        if mid is not None and str(mid) == str(sid):
+            mid = None
+
+        user = data.get('user')
+        retweeted = data.get('retweeted_status')
+        status = cls(
+            id=sid,
+            mid=mid,
+            created_at=data.get('created_at'),
+            created_ts=data.get('created_ts'),
+            text=data.get('text'),
+            source=data.get('source') or None,
+            user=User.from_dict(user) if isinstance(user, (dict, User)) else user,
+            reposts_count=data.get('reposts_count'),
+            comments_count=data.get('comments_count'),
+            attitudes_count=data.get('attitudes_count'),
+            pics=_project_pics(data.get('pics')),
+            page_info=_project_page_info(data.get('page_info')),
+            retweeted_status=cls.from_dict(retweeted) if isinstance(retweeted, dict) else retweeted,
+            quote=data.get('quote'),
+            attachments=data.get('attachments'),
+            quotes=data.get('quotes'),
+            comments=data.get('comments'),
+            likes=data.get('likes'),
+            time=data.get('time'),
+            raw=data if keep_raw else None,
+        )
+        return status
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # mid与id相同时不单独保存
+        if key == 'mid' and self.mid is None:
+            return self.idstr if self.id is not None else default
+        return super().get(key, default)
+
+
+def _project_pics(pics) -> Optional[List[str]]:
+    """图片只保留大图地址"""
+    if not pics:
+        return None
+    urls = []
+    for pic in pics:
+        if isinstance(pic, dict):
+            large = pic.get('large')
+            url = large.get('url') if isinstance(large, dict) else None
+            urls.append(url or pic.get('url'))
+        else:
+            urls.append(pic)
+    return urls
+
+
+def _project_page_info(page_info) -> Optional[Dict[str, Any]]:
+    """卡片信息只保留类型、标题、链接和视频的时长与播放地址"""
+    if not isinstance(page_info, dict) or not page_info:
+        return None
+    result = {key: page_info[key] for key in ('type', 'page_title', 'page_url') if page_info.get(key)}
+    media_info = page_info.get('media_info')
+    if media_info:
+        result['media_info'] = {key: media_info[key] for key in _MEDIA_INFO_KEYS if media_info.get(key)}
+        result['media_info'].setdefault('duration', media_info.get('duration') or 0)
+    return result or None
+
+
+class TimelineResult(list):
+    """时间线结果列表，stale为True表示这是已过期的缓存数据，新数据正在后台获取"""
+
+    def __init__(self, statuses=(), stale=False):
+        super().__init__(statuses)
+        self.stale = stale
+
+
+def project_statuses(statuses: Iterable[Any], keep_raw: bool = False) -> List[Any]:
+    """
+    把微博列表转换为Status列表
+
+    Args:
+        statuses: 微博对象列表，不是dict的元素原样保留
+        keep_raw: 是否保留原始数据
+
+    Returns:
+        新的列表
+    """
+    return [Status.from_dict(status, keep_raw) if isinstance(status, dict) else status for status in statuses]
+
+
+def to_jsonable(obj: Any) -> Any:
+    """json.dumps的default参数：把模型转换为dict"""
+    if isinstance(obj, _Model):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
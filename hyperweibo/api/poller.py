@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+按活跃程度自适应的后台轮询
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from hyperweibo.api.sync import status_id
+
+logger = logging.getLogger(__name__)
+
+# 时间线标识: (feed, gid)，feed为"home"、"special"或"group"
+FeedKey = Tuple[str, Optional[str]]
+
+
+class FeedActivity:
+    """单个时间线的轮询状态：估计的新微博到达速率、连续没有新微博的次数和统计"""
+
+    def __init__(self, key: FeedKey):
+        self.key = key
+        # 估计的到达速率（条/秒），尚未看到任何微博时为None
+        self.rate = None
+        # 已知最新的微博ID，新微博指ID比它大的微博
+        self.newest_id = 0
+        self.quiet_polls = 0
+        self.interval = 0.0
+        self.next_due = 0.0
+        self.last_poll = None
+        self.stats = {'polls': 0, 'new': 0, 'empty': 0, 'failures': 0}
+
+    def observe(self, statuses: Iterable[Any], now: float) -> int:
+        """
+        根据时间线第1页的微博更新到达速率和最新ID
+
+        速率取页面中的微博数除以最旧一条到现在的时间，时间线安静下来后估计值会随时间下降；
+        新的估计值与之前的估计值取平均，减少单次波动。
+
+        Args:
+            statuses: 时间线第1页的微博
+            now: 当前时间戳
+
+        Returns:
+            比之前已知最新ID更新的微博数，第一次观察时返回0
+        """
+        statuses = list(statuses)
+        timestamps = [status.get('created_ts') for status in statuses if status.get('created_ts')]
+        if timestamps:
+            sample = len(timestamps) / max(now - min(timestamps), 1.0)
+            self.rate = sample if self.rate is None else (self.rate + sample) / 2
+
+        ids = [sid for sid in map(status_id, statuses) if sid]
+        if not ids:
+            return 0
+        new = sum(1 for sid in ids if sid > self.newest_id) if self.newest_id else 0
+        self.newest_id = max(self.newest_id, max(ids))
+        return new
+
+    def expected_new(self, now: float) -> float:
+        """按估计速率，自上次轮询以来预计出现的新微博数，用于请求预算不足时决定先轮询哪个时间线"""
+        if self.last_poll is None:
+            return float('inf')
+        return (self.rate or 0.0) * (now - self.last_poll)
+
+
+class AdaptivePoller:
+    """
+    按各时间线的活跃程度在后台轮询第1页，发现新微博时更新缓存并通知界面
+
+    轮询间隔为预计出现target条新微博所需的时间，连续没有新微博（或请求失败）时按2的幂退避，
+    并限制在[min_interval, max_interval]之间；所有时间线共享每分钟budget次请求的预算，
+    预算用完时先轮询预计新微博最多的时间线。轮询在独立线程中进行，不依赖输入循环。
+    """
+
+    BUDGET_WINDOW = 60.0
+    MAX_BACKOFF_EXPONENT = 10
+
+    def __init__(self, api, min_interval: float = 30, max_interval: float = 900, budget: int = 12,
+                 target: float = 1.0, on_update: Optional[Callable[[FeedKey, int], None]] = None,
+                 clock: Callable[[], float] = time.time, background: bool = True):
+        """
+        初始化轮询器
+
+        Args:
+            api: WeiboAPI实例，通过poll_timeline获取第1页
+            min_interval: 同一时间线两次轮询的最短间隔（秒）
+            max_interval: 同一时间线两次轮询的最长间隔（秒）
+            budget: 所有时间线每分钟最多发出的请求数
+            target: 每次轮询期望获取的新微博数，越小轮询越频繁
+            on_update: 发现新微博时在轮询线程中调用，参数为(时间线标识, 新微博数)
+            clock: 返回当前时间戳的函数
+            background: 是否启动轮询线程，为False时由调用者定期调用poll_due
+        """
+        self.api = api
+        self.min_interval = max(1.0, float(min_interval))
+        self.max_interval = max(self.min_interval, float(max_interval))
+        self.budget = max(1, budget)
+        self.target = max(0.1, target)
+        self.on_update = on_update
+        self.clock = clock
+        self._feeds: Dict[FeedKey, FeedActivity] = {}
+        self._sent = deque()
+        self._cond = threading.Condition()
+        self._background = background
+        self._thread = None
+        self._stopped = False
+
+    def watch(self, feed: str, gid: Optional[str] = None, statuses: Optional[Iterable[Any]] = None):
+        """
+        开始轮询时间线，已在轮询时保留其状态
+
+        Args:
+            feed: "home"、"special"或"group"
+            gid: feed为"group"时的分组ID
+            statuses: 界面当前显示的第1页，之后只把比它更新的微博视为新微博；每次重新显示都会传入同一页，
+                      只有比已观察到的最新微博更新的部分参与速率估计，以免重复计算
+        """
+        key = (feed, gid)
+        with self._cond:
+            activity = self._feeds.get(key)
+            created = activity is None
+            if created:
+                activity = self._feeds[key] = FeedActivity(key)
+            if statuses is not None:
+                newest_id = activity.newest_id
+                fresh = [status for status in statuses if status_id(status) > newest_id]
+                if fresh:
+                    activity.observe(fresh, self.clock())
+            if created:
+                self._reschedule(activity, self.clock())
+            if self._background and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="hyperweibo-poller", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def retain(self, keys: Iterable[FeedKey]):
+        """停止轮询不在keys中的时间线，用于切换视图"""
+        keys = set(keys)
+        with self._cond:
+            for key in [key for key in self._feeds if key not in keys]:
+                del self._feeds[key]
+            self._cond.notify()
+
+    def is_watching(self, key: FeedKey) -> bool:
+        with self._cond:
+            return key in self._feeds
+
+    def poll_due(self, now: Optional[float] = None) -> Optional[float]:
+        """
+        轮询一个已到期的时间线（请求预算允许时）
+
+        Args:
+            now: 当前时间戳，默认为clock()
+
+        Returns:
+            距下一次应当调用的秒数，没有要轮询的时间线时返回None
+        """
+        now = self.clock() if now is None else now
+        with self._cond:
+            activity, wait = self._pick(now)
+            if activity is None:
+                return wait
+            self._sent.append(now)
+
+        try:
+            statuses = self.api.poll_timeline(*activity.key)
+        except Exception as e:
+            logger.warning(f"后台轮询失败: {activity.key[0]} {activity.key[1] or ''}: {str(e)}")
+            statuses = None
+
+        new = 0
+        with self._cond:
+            now = self.clock()
+            activity.last_poll = now
+            activity.stats['polls'] += 1
+            if statuses is None:
+                activity.stats['failures'] += 1
+                activity.quiet_polls += 1
+            else:
+                new = activity.observe(statuses, now)
+                activity.stats['new'] += new
+                if new:
+                    activity.quiet_polls = 0
+                else:
+                    activity.stats['empty'] += 1
+                    activity.quiet_polls += 1
+            self._reschedule(activity, now)
+            watching = self._feeds.get(activity.key) is activity
+            logger.debug(f"后台轮询: {activity.key[0]} {activity.key[1] or ''} 新微博{new}条，"
+                         f"下次间隔{activity.interval:.0f}秒")
+
+        if new and watching and self.on_update is not None:
+            self.on_update(activity.key, new)
+        return 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """各时间线的估计速率、当前间隔和轮询统计"""
+        with self._cond:
+            return {
+                f"{feed}:{gid}" if gid else feed: dict(activity.stats, rate=activity.rate, interval=activity.interval)
+                for (feed, gid), activity in self._feeds.items()
+            }
+
+    def shutdown(self):
+        """停止轮询线程，不等待正在进行的请求"""
+        with self._cond:
+            self._stopped = True
+            self._feeds.clear()
+            self._cond.notify()
+
+    def _pick(self, now: float) -> Tuple[Optional[FeedActivity], Optional[float]]:
+        """选择要轮询的时间线，返回(时间线, None)或(None, 需要等待的秒数)"""
+        if not self._feeds:
+            return None, None
+        due = [activity for activity in self._feeds.values() if activity.next_due <= now]
+        if not due:
+            return None, min(activity.next_due for activity in self._feeds.values()) - now
+
+        while self._sent and self._sent[0] <= now - self.BUDGET_WINDOW:
+            self._sent.popleft()
+        if len(self._sent) >= self.budget:
+            return None, self._sent[0] + self.BUDGET_WINDOW - now
+        return max(due, key=lambda activity: activity.expected_new(now)), None
+
+    def _reschedule(self, activity: FeedActivity, now: float):
+        """按估计速率和连续没有新微博的次数计算下一次轮询时间"""
+        if activity.rate:
+            interval = self.target / activity.rate
+        else:
+            interval = self.max_interval if activity.last_poll is not None else self.min_interval
+        interval *= 2 ** min(activity.quiet_polls, self.MAX_BACKOFF_EXPONENT)
+        activity.interval = min(self.max_interval, max(self.min_interval, interval))
+        activity.next_due = now + activity.interval
+
+    def _run(self):
+        while True:
+            polled = self.poll_due() == 0.0
+            with self._cond:
+                if self._stopped:
+                    return
+                if polled:
+                    continue
+                # 在持有锁时重新计算等待时间，避免错过watch的通知
+                activity, wait = self._pick(self.clock())
+                if activity is None:
+                    self._cond.wait(wait)
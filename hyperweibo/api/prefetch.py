@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+相邻页面预取
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PagePrefetcher:
+    """在后台线程中预取当前页之后（以及可选的之前）的页面，写入WeiboAPI的缓存"""
+
+    def __init__(self, api, depth: int = 1, backward: bool = False, workers: int = 1):
+        """
+        初始化预取器
+
+        Args:
+            api: WeiboAPI实例
+            depth: 向后预取的页数，0表示不预取
+            backward: 是否同时预取上一页
+            workers: 预取线程数
+        """
+        self.api = api
+        self.depth = max(0, depth)
+        self.backward = backward
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="hyperweibo-prefetch")
+        self._lock = threading.Lock()
+        # 每次切换页面或模式时递增，旧任务发现代数不一致时直接放弃
+        self._generation = 0
+        self._futures = {}
+
+    @property
+    def enabled(self) -> bool:
+        return (self.depth > 0 or self.backward) and not self.api.use_mock
+
+    def schedule(self, mode: str, page: int, gid: Optional[str] = None):
+        """
+        以当前页为中心安排预取，之前未开始的预取任务会被取消
+
+        Args:
+            mode: "home"、"special"或"group"
+            page: 当前页码
+            gid: mode为"group"时的分组ID
+        """
+        if not self.enabled:
+            return
+
+        pages = [page + offset for offset in range(1, self.depth + 1)]
+        if self.backward and page > 1:
+            pages.append(page - 1)
+
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._discard_pending()
+            for target in pages:
+                key = (mode, gid, target)
+                if key in self._futures:
+                    continue
+                self._futures[key] = self._executor.submit(self._prefetch, generation, mode, gid, target)
+
+    def cancel(self):
+        """取消所有尚未开始的预取任务，用于切换分组或特别关注模式"""
+        with self._lock:
+            self._generation += 1
+            self._discard_pending()
+
+    def wait(self, mode: str, page: int, gid: Optional[str] = None, timeout: Optional[float] = None):
+        """如果该页面正在预取，等待其完成，避免重复请求"""
+        with self._lock:
+            future = self._futures.get((mode, gid, page))
+        if future is None or future.cancelled():
+            return
+        try:
+            future.result(timeout=timeout)
+        except Exception:
+            pass
+
+    def shutdown(self):
+        """停止预取线程，不等待正在进行的请求"""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _discard_pending(self):
+        for key, future in list(self._futures.items()):
+            if future.done() or future.cancel():
+                del self._futures[key]
+
+    def _prefetch(self, generation: int, mode: str, gid: Optional[str], page: int):
+        if generation != self._generation:
+            return
+        try:
+            if mode == "special":
+                self.api.get_special_focus(page=page)
+            elif mode == "group":
+                self.api.get_group_timeline(gid, page=page)
+            else:
+                self.api.get_home_timeline(page=page)
+            logger.debug(f"已预取页面: {mode} {gid or ''} 第{page}页")
+        except Exception as e:
+            logger.warning(f"预取页面失败: {str(e)}")
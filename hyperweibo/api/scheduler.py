@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+请求调度：限速、并发控制和重试
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# 表示被限流的状态码：418为微博反爬虫的常见响应
+THROTTLE_STATUS = (418, 429)
+# 可以重试的服务端错误
+RETRY_STATUS = (500, 502, 503, 504)
+
+
+class ThrottledError(requests.exceptions.RequestException):
+    """重试后仍被限流"""
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """请求在截止时间之前没有完成"""
+
+
+class TokenBucket:
+    """
+    令牌桶限速器，速率按AIMD调整：被限流时减半，之后每次成功缓慢恢复到设定速率
+    """
+
+    def __init__(self, rate: float, burst: int, min_rate: float = 0.2):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒最多请求数
+            burst: 允许的突发请求数
+            min_rate: 被限流后速率的下限
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min(min_rate, rate)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: Optional[float] = None):
+        """取得一个令牌，需要等待时阻塞；无法在截止时间（time.monotonic）之前取得时抛出DeadlineExceeded"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                raise DeadlineExceeded("等待限速令牌超过截止时间")
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            # 每次成功恢复设定速率的5%
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def on_throttle(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+
+
+class AIMDLimiter:
+    """并发数限制，成功时线性增加（每完成约一个窗口的请求加1），被限流时减半"""
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 16):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, deadline: Optional[float] = None):
+        """占用一个并发名额，无法在截止时间之前取得时抛出DeadlineExceeded"""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    raise DeadlineExceeded("等待并发名额超过截止时间")
+                self._cond.wait(timeout)
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def on_success(self):
+        with self._cond:
+            before = int(self.limit)
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if int(self.limit) > before:
+                self._cond.notify()
+
+    def on_throttle(self):
+        with self._cond:
+            self.limit = max(self.minimum, self.limit / 2)
+
+
+class RequestScheduler:
+    """
+    所有微博请求的统一入口
+
+    每个接口（URL路径）有独立的令牌桶，所有接口共享一个AIMD并发限制；GET请求遇到网络错误、
+    5xx或限流时按带抖动的指数退避重试，每个请求都有超时和总截止时间。
+    """
+
+    def __init__(self, session: requests.Session, rate: float = 10.0, burst: int = 20,
+                 endpoint_rates: Optional[Dict[str, Tuple[float, int]]] = None,
+                 initial_concurrency: int = 8, max_concurrency: int = 32, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 timeout: Tuple[float, float] = (5, 15), deadline: float = 30.0):
+        """
+        初始化请求调度器
+
+        Args:
+            session: 发出请求的requests.Session
+            rate: 每个接口默认每秒最多请求数
+            burst: 每个接口默认允许的突发请求数
+            endpoint_rates: 指定接口的限速，格式: {URL路径: (每秒请求数, 突发数)}
+            initial_concurrency: 初始并发数
+            max_concurrency: 并发数上限
+            max_retries: 最大重试次数
+            backoff_base: 第一次重试前的等待时间（秒），之后每次翻倍
+            backoff_max: 重试等待时间上限（秒）
+            timeout: 单次请求的(连接超时, 读取超时)（秒）
+            deadline: 包括排队和重试在内的总截止时间（秒）
+        """
+        self.session = session
+        self.rate = rate
+        self.burst = burst
+        self.endpoint_rates = dict(endpoint_rates or {})
+        self.limiter = AIMDLimiter(initial_concurrency, 1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.deadline = deadline
+        self._buckets = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, url: str) -> str:
+        return urlparse(url).path or "/"
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(endpoint)
+            if bucket is None:
+                rate, burst = self.endpoint_rates.get(endpoint, (self.rate, self.burst))
+                bucket = self._buckets[endpoint] = TokenBucket(rate, burst)
+                self._stats[endpoint] = {'requests': 0, 'retries': 0, 'throttled': 0, 'errors': 0}
+            return bucket
+
+    def _count(self, endpoint: str, name: str):
+        with self._lock:
+            self._stats[endpoint][name] += 1
+
+    @staticmethod
+    def is_throttled(response: requests.Response, accept_html: bool = False) -> bool:
+        """
+        判断响应是否表示被限流
+
+        Args:
+            response: 响应
+            accept_html: 是否接受包含$render_data的HTML页面作为正常响应
+
+        Returns:
+            状态码为418/429，或200响应既不是JSON也不是正常页面时返回True
+        """
+        if response.status_code in THROTTLE_STATUS:
+            return True
+        if response.status_code != 200:
+            return False
+        body = response.text.lstrip()
+        if body.startswith(("{", "[")):
+            return False
+        # 被限流时微博返回跳转或验证页面，而不是数据
+        return not (accept_html and "$render_data" in body)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """第attempt次重试前的等待时间，优先使用Retry-After"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        # 抖动避免多个请求同时重试
+        return random.uniform(delay / 2, delay)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, timeout=None,
+            deadline: Optional[float] = None, accept_html: bool = False,
+            max_retries: Optional[int] = None) -> requests.Response:
+        """
+        发出GET请求
+
+        Args:
+            url: 请求地址
+            params: 请求参数
+            timeout: 单次请求超时，默认使用调度器设置
+            deadline: 总截止时间（秒），默认使用调度器设置
+            accept_html: 是否接受包含$render_data的HTML页面，时间线接口为True
+            max_retries: 最大重试次数，默认使用调度器设置
+
+        Returns:
+            响应；非限流的4xx响应直接返回，由调用方处理
+
+        Raises:
+            ThrottledError: 重试后仍被限流
+            DeadlineExceeded: 超过截止时间
+            requests.exceptions.RequestException: 重试后仍然出现网络错误
+        """
+        endpoint = self._endpoint(url)
+        bucket = self._bucket(endpoint)
+        retries = self.max_retries if max_retries is None else max_retries
+        end = time.monotonic() + (self.deadline if deadline is None else deadline)
+        timeout = timeout or self.timeout
+
+        attempt = 0
+        while True:
+            bucket.acquire(end)
+            self.limiter.acquire(end)
+            self._count(endpoint, 'requests')
+            response = None
+            error = None
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            finally:
+                self.limiter.release()
+
+            if error is None and self.is_throttled(response, accept_html):
+                self._count(endpoint, 'throttled')
+                self.limiter.on_throttle()
+                bucket.on_throttle()
+                logger.warning(f"请求被限流: {endpoint}，状态码: {response.status_code}，"
+                               f"并发上限降为{int(self.limiter.limit)}，速率降为{bucket.rate:.2f}/秒")
+                error = ThrottledError(f"请求被限流: {endpoint}，状态码: {response.status_code}", response=response)
+            elif error is None and response.status_code in RETRY_STATUS:
+                self._count(endpoint, 'errors')
+                error = requests.exceptions.HTTPError(f"服务端错误: {response.status_code}", response=response)
+            elif error is None:
+                self.limiter.on_success()
+                bucket.on_success()
+                return response
+            else:
+                self._count(endpoint, 'errors')
+
+            delay = self._backoff(attempt, response)
+            if attempt >= retries or time.monotonic() + delay >= end:
+                if isinstance(error, requests.exceptions.HTTPError) and response is not None:
+                    # 服务端错误重试后仍然失败时返回最后的响应，由调用方处理
+                    return response
+                raise error
+            attempt += 1
+            self._count(endpoint, 'retries')
+            logger.info(f"{delay:.2f}秒后第{attempt}次重试: {endpoint}，原因: {str(error)}")
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取各接口的请求数、重试数、限流次数、错误数和当前速率，以及当前并发上限"""
+        with self._lock:
+            endpoints = {
+                endpoint: dict(counts, rate=round(self._buckets[endpoint].rate, 2))
+                for endpoint, counts in self._stats.items()
+            }
+        return {'concurrency_limit': int(self.limiter.limit), 'in_flight': self.limiter.in_flight, 'endpoints': endpoints}
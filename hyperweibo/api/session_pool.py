@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多账号会话池
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import requests
+
+from hyperweibo.api.weibo_api import WeiboAPI
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("round_robin", "least_loaded")
+
+# 池中的时间线调用直接请求网络（fetch_timeline_page），失败时抛出异常并计入该账号的错误数，
+# 而不是像WeiboAPI的同名方法那样返回缓存的旧数据
+_TIMELINE_METHODS = {
+    "get_home_timeline": lambda api, page=1: api.fetch_timeline_page("home", page),
+    "get_special_focus": lambda api, page=1: api.fetch_timeline_page("special", page),
+    "get_group_timeline": lambda api, gid, page=1: api.fetch_timeline_page("group", page, gid),
+}
+
+
+class PooledAccount:
+    """会话池中的一个账号及其统计信息"""
+
+    def __init__(self, name: str, api: WeiboAPI):
+        self.name = name
+        self.api = api
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    def stats(self, elapsed: float) -> Dict[str, Any]:
+        """获取统计信息，elapsed为会话池运行的秒数；throttled和retries来自该账号的请求调度器"""
+        endpoints = self.api.scheduler.stats()['endpoints'].values()
+        return {
+            'in_flight': self.in_flight,
+            'requests': self.requests,
+            'errors': self.errors,
+            'throttled': sum(counts['throttled'] for counts in endpoints),
+            'retries': sum(counts['retries'] for counts in endpoints),
+            'avg_latency': self.busy_seconds / self.requests if self.requests else 0.0,
+            'throughput': self.requests / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+class SessionPool:
+    """
+    持有多个已登录账号的会话池
+
+    每个账号是一个独立的WeiboAPI实例，拥有自己的requests.Session、连接池、内存缓存，
+    本地数据库中的数据也按账号区分，因此不同账号的数据不会混在一起。调用按轮询或
+    最少进行中请求的策略分配给账号，从而突破单个账号的频率限制。
+
+    时间线方法（get_home_timeline、get_special_focus、get_group_timeline）在池中直接请求网络，
+    失败时抛出异常，不返回旧数据。
+    """
+
+    def __init__(self, apis: Union[Sequence[WeiboAPI], Dict[str, WeiboAPI]], policy: str = "round_robin",
+                 concurrency_per_account: int = 2):
+        """
+        初始化会话池
+
+        Args:
+            apis: WeiboAPI实例列表，或{账号名称: WeiboAPI}
+            policy: 分配策略，"round_robin"（轮询）或"least_loaded"（进行中请求最少）
+            concurrency_per_account: 每个账号同时进行的最大请求数
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"不支持的分配策略: {policy}")
+        if not apis:
+            raise ValueError("会话池中至少需要一个账号")
+
+        if isinstance(apis, dict):
+            items = list(apis.items())
+        else:
+            items = [(self._default_name(api, index), api) for index, api in enumerate(apis)]
+
+        self.policy = policy
+        self.concurrency_per_account = max(1, concurrency_per_account)
+        # from_cookie_strings创建的WeiboAPI由会话池关闭
+        self._owns_apis = False
+        self._accounts = [PooledAccount(name, api) for name, api in items]
+        self._by_name = {account.name: account for account in self._accounts}
+        self._round_robin = itertools.cycle(self._accounts)
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._started_at = time.time()
+        self._executor = ThreadPoolExecutor(max_workers=len(self._accounts) * self.concurrency_per_account,
+                                            thread_name_prefix="hyperweibo-pool")
+
+        # 每个账号的连接池大小与其并发数一致
+        for account in self._accounts:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=self.concurrency_per_account)
+            account.api.session.mount("https://", adapter)
+            account.api.session.mount("http://", adapter)
+
+    @classmethod
+    def from_cookie_strings(cls, cookie_strs: Iterable[str], policy: str = "round_robin",
+                            concurrency_per_account: int = 2, **kwargs) -> "SessionPool":
+        """
+        使用多个cookie字符串创建会话池
+
+        Args:
+            cookie_strs: 每个账号的cookie字符串
+            policy: 分配策略
+            concurrency_per_account: 每个账号同时进行的最大请求数
+            **kwargs: 创建WeiboAPI时的其他参数，如data_dir
+        """
+        # 本地数据库按账号区分数据，所有账号共用第一个账号打开的数据库和全文索引
+        apis = []
+        for cookie_str in cookie_strs:
+            if apis:
+                apis.append(WeiboAPI(cookie_str=cookie_str, store=apis[0].store, search_index=apis[0].search_index,
+                                     **kwargs))
+            else:
+                apis.append(WeiboAPI(cookie_str=cookie_str, **kwargs))
+        pool = cls(apis, policy=policy, concurrency_per_account=concurrency_per_account)
+        pool._owns_apis = True
+        return pool
+
+    @staticmethod
+    def _default_name(api: WeiboAPI, index: int) -> str:
+        key = api._account_key()
+        return f"account_{index + 1}_{key[:8]}" if key else f"account_{index + 1}"
+
+    @property
+    def accounts(self) -> List[str]:
+        """账号名称列表"""
+        return [account.name for account in self._accounts]
+
+    def api(self, name: str) -> WeiboAPI:
+        """获取指定账号的WeiboAPI实例"""
+        return self._by_name[name].api
+
+    def _choose(self) -> Optional[PooledAccount]:
+        """按策略选择一个未达到并发上限的账号，都已满时返回None；调用时需持有锁"""
+        if self.policy == "least_loaded":
+            account = min(self._accounts, key=lambda item: (item.in_flight, item.requests))
+            return account if account.in_flight < self.concurrency_per_account else None
+
+        for _ in range(len(self._accounts)):
+            account = next(self._round_robin)
+            if account.in_flight < self.concurrency_per_account:
+                return account
+        return None
+
+    @contextmanager
+    def acquire(self, name: Optional[str] = None):
+        """
+        占用一个账号，账号都已达到并发上限时等待
+
+        Args:
+            name: 指定账号名称，为None时按策略选择
+
+        Yields:
+            WeiboAPI实例
+        """
+        with self._available:
+            while True:
+                if name is not None:
+                    account = self._by_name[name]
+                    if account.in_flight >= self.concurrency_per_account:
+                        account = None
+                else:
+                    account = self._choose()
+                if account is not None:
+                    break
+                self._available.wait()
+            account.in_flight += 1
+
+        start = time.time()
+        failed = False
+        try:
+            yield account.api
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._available:
+                account.in_flight -= 1
+                account.requests += 1
+                account.errors += failed
+                account.busy_seconds += time.time() - start
+                self._available.notify()
+
+    def call(self, method: str, *args, account: Optional[str] = None, **kwargs) -> Any:
+        """
+        在选中的账号上调用WeiboAPI方法
+
+        Args:
+            method: WeiboAPI方法名，如"get_home_timeline"
+            *args: 方法参数
+            account: 指定账号名称，为None时按策略选择
+            **kwargs: 方法的关键字参数
+
+        Returns:
+            方法返回值
+        """
+        with self.acquire(account) as api:
+            timeline_method = _TIMELINE_METHODS.get(method)
+            if timeline_method is not None:
+                return timeline_method(api, *args, **kwargs)
+            return getattr(api, method)(*args, **kwargs)
+
+    def submit(self, method: str, *args, account: Optional[str] = None, **kwargs) -> Future:
+        """在后台线程中执行call，返回Future"""
+        return self._executor.submit(self.call, method, *args, account=account, **kwargs)
+
+    def map(self, method: str, args_list: Iterable[Sequence[Any]]) -> List[Any]:
+        """
+        并发执行多次调用，结果按args_list的顺序返回
+
+        Args:
+            method: WeiboAPI方法名
+            args_list: 每次调用的参数元组
+        """
+        futures = [self.submit(method, *args) for args in args_list]
+        return [future.result() for future in futures]
+
+    def for_each_account(self, method: str, *args, **kwargs) -> Dict[str, Any]:
+        """在每个账号上各调用一次，返回{账号名称: 返回值}，如获取所有账号的首页"""
+        futures = {name: self.submit(method, *args, account=name, **kwargs) for name in self.accounts}
+        return {name: future.result() for name, future in futures.items()}
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各账号的请求数、错误数、平均耗时和吞吐量（次/秒）"""
+        with self._lock:
+            elapsed = time.time() - self._started_at
+            return {account.name: account.stats(elapsed) for account in self._accounts}
+
+    def close(self):
+        """关闭线程池，等待进行中的调用完成；from_cookie_strings创建的WeiboAPI也一并关闭"""
+        self._executor.shutdown(wait=True)
+        if self._owns_apis:
+            # 第一个账号持有共用的全文索引，最后关闭
+            for account in reversed(self._accounts):
+                account.api.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
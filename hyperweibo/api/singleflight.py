@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+相同请求合并
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+def request_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    生成请求的规范化键：协议和主机名小写，URL中的查询参数与params合并后排序
+
+    Args:
+        url: 请求地址
+        params: 请求参数
+
+    Returns:
+        相同请求对应相同的字符串
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(name), str(value)) for name, value in params.items() if value is not None)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path or '/'}?{urlencode(sorted(query))}"
+
+
+class _Call:
+    """一次进行中的调用"""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    合并并发的相同调用：同一个键同时只执行一次，其余调用方等待并共享其结果或异常
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        执行func，同一个键已有进行中的调用时等待其结果
+
+        Args:
+            key: 调用的键，如request_key的结果
+            func: 实际执行的函数
+            *args: 函数参数
+            **kwargs: 函数的关键字参数
+
+        Returns:
+            func的返回值，合并的调用方得到同一个对象
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self) -> Dict[str, int]:
+        """获取统计信息：实际执行次数、被合并的调用次数和进行中的调用数"""
+        with self._lock:
+            return {'executed': self.executed, 'coalesced': self.coalesced, 'in_flight': len(self._calls)}
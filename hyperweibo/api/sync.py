@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+时间线增量同步
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def status_id(status: Dict[str, Any]) -> int:
+    """获取微博的数字ID，没有ID时返回0"""
+    try:
+        return int(status.get('id') or status.get('mid') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class TimelineSync:
+    """
+    基于since_id/max_id游标的时间线增量同步
+
+    记录本地时间线中最新和最旧的微博ID，刷新时只请求比最新ID更新的微博；
+    如果新微博多到一页放不下，会并发获取后续页面补齐中间缺失的部分。
+    任何一页请求失败时整次刷新失败并抛出异常，本地时间线和游标保持不变，下次刷新从原来的位置重新请求。
+    """
+
+    def __init__(self, api, feed: str = "home", gid: Optional[str] = None, max_statuses: int = 1000,
+                 backfill_workers: int = 4, max_backfill_pages: int = 10):
+        """
+        初始化增量同步
+
+        Args:
+            api: WeiboAPI实例
+            feed: "home"或"group"
+            gid: feed为"group"时的分组ID
+            max_statuses: 本地时间线最多保留的微博数，超出时丢弃最旧的
+            backfill_workers: 补齐缺口时的并发请求数
+            max_backfill_pages: 一次刷新最多补齐的页数
+        """
+        self.api = api
+        self.feed = feed
+        self.gid = gid
+        self.max_statuses = max_statuses
+        self.backfill_workers = max(1, backfill_workers)
+        self.max_backfill_pages = max_backfill_pages
+        self.newest_id = None
+        self.oldest_id = None
+        self.page_size = 0
+        self.stats = {'requests': 0, 'received': 0, 'new': 0, 'backfill_pages': 0}
+        self._statuses = {}
+        self._order = []
+        self._lock = threading.Lock()
+
+    @property
+    def statuses(self) -> List[Dict[str, Any]]:
+        """本地时间线，按从新到旧排列"""
+        with self._lock:
+            return [self._statuses[sid] for sid in self._order]
+
+    def refresh(self) -> List[Dict[str, Any]]:
+        """
+        获取比本地最新微博更新的微博并合并到本地时间线
+
+        Returns:
+            新增的微博列表，按从新到旧排列，没有新微博时为空列表；请求失败时抛出异常
+        """
+        if self.api.use_mock:
+            return []
+
+        with self._lock:
+            since_id = self.newest_id
+            if since_id:
+                first = self._fetch(since_id=since_id)
+            else:
+                first = self._fetch(page=1)
+
+            self.page_size = max(self.page_size, len(first))
+            fetched = list(first)
+            if since_id and self._has_gap(first, since_id):
+                logger.info(f"新微博超过一页，开始补齐缺口: {self.feed} {self.gid or ''}")
+                fetched.extend(self._backfill(since_id))
+
+            return self._merge(fetched)
+
+    def load_older(self) -> List[Dict[str, Any]]:
+        """
+        获取比本地最旧微博更早的一页微博
+
+        Returns:
+            新增的较早微博列表，按从新到旧排列；请求失败时抛出异常
+        """
+        if self.api.use_mock or not self.oldest_id:
+            return []
+
+        with self._lock:
+            return self._merge(self._fetch(max_id=self.oldest_id))
+
+    def _fetch(self, **params) -> List[Dict[str, Any]]:
+        if self.feed == "group":
+            url = f"{self.api.BASE_URL}/feed/group"
+            request_params = {"gid": self.gid}
+        else:
+            url = f"{self.api.BASE_URL}/feed/friends"
+            request_params = {}
+        request_params.update({key: value for key, value in params.items() if value})
+
+        statuses = self.api._request_statuses(url, request_params)
+        self.stats['requests'] += 1
+        self.stats['received'] += len(statuses)
+        return statuses
+
+    def _has_gap(self, statuses, since_id) -> bool:
+        """一整页都比since_id新，说明后面可能还有没取到的新微博"""
+        return 0 < self.page_size <= len(statuses) and all(status_id(status) > since_id for status in statuses)
+
+    def _backfill(self, since_id) -> List[Dict[str, Any]]:
+        """
+        按批并发获取第2页开始的页面，直到某页与已有数据衔接或达到页数上限
+
+        某页请求失败时抛出异常：把失败的页当作空页会被误认为已经衔接，
+        合并后newest_id越过从未获取的微博，这些微博以后也不会再被请求
+        """
+        collected = []
+        last_page = self.max_backfill_pages + 1
+
+        def fetch_page(page):
+            try:
+                return self._fetch(since_id=since_id, page=page)
+            except Exception as e:
+                logger.warning(f"补齐第{page}页失败，本次刷新放弃: {str(e)}")
+                raise
+
+        with ThreadPoolExecutor(max_workers=self.backfill_workers, thread_name_prefix="hyperweibo-backfill") as executor:
+            page = 2
+            while page <= last_page:
+                batch = list(range(page, min(page + self.backfill_workers, last_page + 1)))
+                for statuses in executor.map(fetch_page, batch):
+                    self.stats['backfill_pages'] += 1
+                    collected.extend(statuses)
+                    if not self._has_gap(statuses, since_id):
+                        return collected
+                page += len(batch)
+
+        logger.warning(f"补齐缺口达到页数上限({self.max_backfill_pages})，部分微博可能缺失")
+        return collected
+
+    def _merge(self, statuses) -> List[Dict[str, Any]]:
+        new_ids = []
+        for status in statuses:
+            sid = status_id(status)
+            if not sid:
+                continue
+            if sid not in self._statuses:
+                new_ids.append(sid)
+            # 已有的微博也用新数据替换，以更新转发、评论和点赞数
+            self._statuses[sid] = status
+
+        if new_ids:
+            self._order = sorted(self._statuses, reverse=True)
+            for sid in self._order[self.max_statuses:]:
+                del self._statuses[sid]
+            del self._order[self.max_statuses:]
+
+        if self._order:
+            self.newest_id = self._order[0]
+            self.oldest_id = self._order[-1]
+
+        self.stats['new'] += len(new_ids)
+        return [self._statuses[sid] for sid in sorted(new_ids, reverse=True) if sid in self._statuses]
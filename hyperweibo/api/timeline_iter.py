@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+跨页遍历时间线
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Container, Iterator, Optional
+
+from hyperweibo.api.sync import status_id
+
+logger = logging.getLogger(__name__)
+
+# 用于跨页去重的最近微博ID数量，翻页期间有新微博时相邻页面会有重复
+_RECENT_IDS = 200
+
+
+def iter_timeline(api, feed: str = "home", gid: Optional[str] = None, start_page: int = 1,
+                  max_items: Optional[int] = None, older_than: Optional[float] = None,
+                  seen_ids: Optional[Container[int]] = None, max_pages: Optional[int] = None,
+                  read_ahead: bool = True) -> Iterator[Any]:
+    """
+    逐条遍历时间线，按需跨页获取
+
+    同一时间最多持有当前页和预读的下一页，内存占用与遍历的深度无关。页面直接从网络获取
+    （见WeiboAPI.fetch_timeline_page），不写入缓存，请求失败时抛出异常。
+
+    Args:
+        api: WeiboAPI实例
+        feed: "home"、"special"或"group"
+        gid: feed为"group"时的分组ID
+        start_page: 起始页码
+        max_items: 最多返回的微博数
+        older_than: 遇到早于该Unix时间戳的微博时停止
+        seen_ids: 遇到其中的微博ID时停止，如上次处理到的微博
+        max_pages: 最多获取的页数
+        read_ahead: 处理当前页时是否在后台获取下一页
+
+    Yields:
+        按从新到旧排列的微博
+    """
+    if max_items is not None and max_items <= 0:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hyperweibo-iter") if read_ahead else None
+    page = max(1, start_page)
+    last_page = page + max_pages - 1 if max_pages else None
+    recent_ids = OrderedDict()
+    yielded = 0
+    pending = None
+
+    def fetch(number):
+        if executor is None:
+            return _Done(api.fetch_timeline_page(feed, number, gid))
+        return executor.submit(api.fetch_timeline_page, feed, number, gid)
+
+    try:
+        pending = fetch(page)
+        while pending is not None:
+            statuses = pending.result()
+            pending = None
+            if not statuses:
+                return
+            # 当前页足够凑满max_items时不预读
+            enough = max_items is not None and yielded + len(statuses) >= max_items
+            if executor is not None and not enough and (last_page is None or page < last_page):
+                pending = fetch(page + 1)
+
+            for status in statuses:
+                created_ts = status.get('created_ts')
+                if older_than is not None and created_ts is not None and created_ts < older_than:
+                    return
+                sid = status_id(status)
+                if sid and seen_ids is not None and sid in seen_ids:
+                    return
+                if sid:
+                    if sid in recent_ids:
+                        continue
+                    recent_ids[sid] = None
+                    if len(recent_ids) > _RECENT_IDS:
+                        recent_ids.popitem(last=False)
+
+                yield status
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+
+            if last_page is not None and page >= last_page:
+                return
+            page += 1
+            if pending is None:
+                pending = fetch(page)
+    finally:
+        if executor is not None:
+            if pending is not None:
+                pending.cancel()
+            executor.shutdown(wait=False)
+
+
+class _Done:
+    """不预读时代替Future，保存已获取的结果"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
+
+    def cancel(self):
+        return False
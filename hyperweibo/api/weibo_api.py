@@ -26,48 +26,59 @@
 """
 
 import requests
-import browser_cookie3
 import json
-from bs4 import BeautifulSoup
 import re
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 import datetime
 import random
-import webbrowser
 import time
 import os
-import subprocess
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlencode
-try:
-    from pycookiecheat import chrome_cookies
-    HAS_PYCOOKIECHEAT = True
-except ImportError:
-    HAS_PYCOOKIECHEAT = False
 
-# 配置日志
-log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'logs')
-os.makedirs(log_dir, exist_ok=True)
-log_file = os.path.join(log_dir, 'weibo_api.log')
+from hyperweibo.utils.cache import CacheManager, DEFAULT_CACHE_LIMITS
+from hyperweibo.utils.store import TimelineStore
+from hyperweibo.utils.search_index import SearchIndex
+from hyperweibo.utils.credentials import CredentialCache
+from hyperweibo.utils.render_data import extract_statuses
+from hyperweibo.utils.timeparse import normalize_statuses
+from hyperweibo.api.sync import TimelineSync
+from hyperweibo.api.scheduler import RequestScheduler, ThrottledError
+from hyperweibo.api.singleflight import SingleFlight, request_key
+from hyperweibo.api.groups import GroupRegistry
+from hyperweibo.api.models import TimelineResult, project_statuses
+from hyperweibo.api.timeline_iter import iter_timeline
 
-# 配置文件和控制台双重输出
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+
+def _import_chrome_cookies():
+    """按需导入pycookiecheat，未安装时返回None"""
+    try:
+        from pycookiecheat import chrome_cookies
+        return chrome_cookies
+    except ImportError:
+        return None
+
+
 class WeiboAPI:
     """微博API客户端，使用H5版本的微博"""
     
     BASE_URL = "https://m.weibo.cn"
     USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36"
     
-    def __init__(self, browser="chrome", use_mock=False, cookie_str=None):
+    # 需要持久化到本地数据库的缓存类型
+    PERSISTENT_CACHE_TYPES = ('groups', 'group_timeline', 'home_timeline', 'special_focus', 'user_info')
+    
+    # 内容为微博列表的缓存类型，从本地数据库读取后需要转换为Status
+    TIMELINE_CACHE_TYPES = ('group_timeline', 'home_timeline', 'special_focus', 'html_parse')
+    
+    def __init__(self, browser="chrome", use_mock=False, cookie_str=None, data_dir=None, use_store=True,
+                 stale_while_revalidate=False, use_credential_cache=True, keep_raw=False, use_search_index=True,
+                 store=None, search_index=None):
         """
         初始化微博API客户端
         
@@ -75,8 +86,18 @@ class WeiboAPI:
             browser: 浏览器类型，支持"chrome"、"firefox"、"edge"等
             use_mock: 是否使用模拟数据
             cookie_str: 直接提供cookie字符串，如果提供则优先使用
+            data_dir: 本地数据目录，用于持久化缓存，默认为~/.hyperweibo
+            use_store: 是否启用本地持久化缓存
+            stale_while_revalidate: 时间线缓存过期后是否先返回旧数据并在后台更新
+            use_credential_cache: 是否缓存从浏览器读取并验证过的cookie，有效期内启动时不再解密和验证
+            keep_raw: 是否在Status.raw中保留接口返回的原始微博数据，默认只保留所需字段以节省内存
+            use_search_index: 是否把从网络获取的微博写入本地全文索引（需要启用本地持久化缓存）
+            store: 与其他实例共用的TimelineStore（如会话池中的多个账号），为None时按use_store打开
+            search_index: 与其他实例共用的SearchIndex，为None时按use_search_index打开；共用的索引由创建者关闭
         """
         self.session = requests.Session()
+        # 后台重新读取浏览器cookie时整体替换session.cookies，替换在此锁内进行
+        self._cookie_lock = threading.Lock()
         self.session.headers.update({
             "User-Agent": self.USER_AGENT,
             "Accept": "application/json, text/plain, */*",
@@ -87,55 +108,93 @@ class WeiboAPI:
             "Sec-Fetch-Dest": "empty"
         })
         
+        # 所有请求经由调度器发出：按接口限速、自适应并发、失败重试和超时
+        self.scheduler = RequestScheduler(self.session)
+        # 并发的相同请求只发出一次，共享响应和解析结果
+        self._single_flight = SingleFlight()
+        
         self.use_mock = use_mock
         self.browser = browser
+        self.keep_raw = keep_raw
         
-        # 初始化缓存
-        self._cache = {
-            'groups': None,  # 分组列表缓存
-            'group_timeline': {},  # 分组微博缓存，格式: {gid_page: data}
-            'home_timeline': {},  # 首页微博缓存，格式: {page: data}
-            'special_focus': {},  # 特别关注缓存，格式: {page: data}
-            'html_parse': {},  # HTML解析结果缓存，格式: {url_params: data}
-            'user_info': None,  # 用户信息缓存
-        }
-        self._cache_expiry = {
-            'groups': 0,  # 分组列表缓存过期时间
-            'group_timeline': {},  # 分组微博缓存过期时间
-            'home_timeline': {},  # 首页微博缓存过期时间
-            'special_focus': {},  # 特别关注缓存过期时间
-            'html_parse': {},  # HTML解析结果缓存过期时间
-            'user_info': 0,  # 用户信息缓存过期时间
-        }
+        # 初始化缓存，各缓存类型有独立的条目数和字节上限，超出时按LRU淘汰
+        self.cache_limits = {name: dict(limit) for name, limit in DEFAULT_CACHE_LIMITS.items()}
+        self._cache = CacheManager(self.cache_limits)
         # 缓存过期时间（秒）
         self.cache_ttl = {
             'groups': 300,  # 分组列表缓存1小时
             'timeline': 300,  # 微博时间线缓存5分钟
             'user_info': 3600,  # 用户信息缓存1小时
             'html_parse': 300,  # HTML解析结果缓存5分钟
+            'stale': 86400,  # 过期后仍作为旧数据保留1天，用于先显示后更新
         }
         
+        # 时间线缓存过期后先返回旧数据，同时在后台重新获取
+        self.stale_while_revalidate = stale_while_revalidate
+        self._revalidate_executor = None
+        self._revalidating = set()
+        self._revalidate_lock = threading.Lock()
+        # 后台更新得到新数据后在后台线程中调用，参数为时间线标识(feed, gid, page)，界面据此重新显示当前页
+        self.on_revalidated = None
+        
+        # 增量同步状态，格式: {(feed, gid): TimelineSync}
+        self._syncs = {}
+        # 分组索引，分组列表重新获取后重建
+        self._group_registry = None
+        self._group_registry_lock = threading.Lock()
+        
+        # 本地持久化缓存，重启后可直接从磁盘读取上次的数据
+        self.store = store
+        self._account_key_cache = (None, None)
+        if store is None and use_store and not use_mock:
+            try:
+                # 过期的条目保留到旧数据的保留期限结束，供先显示后更新和请求失败时使用
+                self.store = TimelineStore(data_dir, retention=self.cache_ttl['stale'])
+            except Exception as e:
+                logger.warning(f"无法打开本地缓存数据库，将仅使用内存缓存: {str(e)}")
+        
+        # 从网络获取的微博在后台写入全文索引，见hyperweibo.py search
+        self.search_index = search_index
+        self._owns_search_index = search_index is None
+        if search_index is None and use_store and use_search_index and not use_mock:
+            try:
+                self.search_index = SearchIndex(data_dir)
+            except Exception as e:
+                logger.warning(f"无法打开全文索引，将不索引微博: {str(e)}")
+        
+        # 浏览器登录凭据缓存；缓存的凭据在后台验证失败且浏览器中的cookie也无效时auth_failed为True，
+        # 同时在后台线程中调用on_auth_failed
+        self.credentials = None
+        self.auth_failed = False
+        self.on_auth_failed = None
+        if use_credential_cache and not cookie_str and not use_mock:
+            try:
+                self.credentials = CredentialCache(data_dir)
+            except Exception as e:
+                logger.warning(f"无法使用登录凭据缓存: {str(e)}")
+        
         # 如果提供了cookie字符串，直接使用
         if cookie_str:
             self.set_cookie_from_string(cookie_str)
             logger.info("已使用提供的cookie")
-        # 否则从浏览器获取cookie
+        # 否则优先使用缓存的凭据，没有时从浏览器获取cookie
         elif not use_mock:
-            self._load_cookies_from_browser(browser)
+            if not self._load_cached_credentials(browser):
+                self._load_cookies_from_browser(browser)
     
-    def _is_cache_valid(self, cache_type, key=None):
-        """检查缓存是否有效"""
-        current_time = time.time()
-        
-        if key is None:
-            # 检查没有key的缓存类型
-            return (self._cache[cache_type] is not None and 
-                    self._cache_expiry[cache_type] > current_time)
-        else:
-            # 检查有key的缓存类型
-            return (key in self._cache[cache_type] and 
-                    key in self._cache_expiry[cache_type] and 
-                    self._cache_expiry[cache_type][key] > current_time)
+    def _account_key(self):
+        """获取当前账号标识，用于区分本地缓存中不同账号的数据"""
+        sub = None
+        for cookie in self.session.cookies:
+            if cookie.name == 'SUB':
+                sub = cookie.value
+                break
+        if not sub:
+            return None
+        # SUB没有变化时复用上次的结果
+        if self._account_key_cache[0] != sub:
+            self._account_key_cache = (sub, hashlib.sha1(sub.encode('utf-8')).hexdigest()[:16])
+        return self._account_key_cache[1]
     
     def _set_cache(self, cache_type, data, key=None, ttl=None):
         """设置缓存"""
@@ -145,62 +204,183 @@ class WeiboAPI:
             else:
                 ttl = self.cache_ttl['timeline']
         
-        current_time = time.time()
+        expires_at = time.time() + ttl
         
-        if key is None:
-            # 设置没有key的缓存类型
-            self._cache[cache_type] = data
-            self._cache_expiry[cache_type] = current_time + ttl
-        else:
-            # 设置有key的缓存类型
-            self._cache[cache_type][key] = data
-            self._cache_expiry[cache_type][key] = current_time + ttl
+        # 需要写入本地数据库时只序列化一次，序列化结果的长度同时作为内存缓存的大小
+        account = payload = size = None
+        if self.store is not None and cache_type in self.PERSISTENT_CACHE_TYPES:
+            account = self._account_key()
+            if account:
+                try:
+                    payload = self.store.encode(data)
+                    size = len(payload.encode('utf-8'))
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"无法序列化缓存数据: {str(e)}")
+        self._cache.set(cache_type, data, expires_at, key, expires_at + self.cache_ttl['stale'], size)
+        
+        # 写入本地数据库
+        if payload is not None:
+            try:
+                self.store.set(account, cache_type, data, expires_at, key, payload)
+            except Exception as e:
+                logger.warning(f"写入本地缓存失败: {str(e)}")
     
     def _get_cache(self, cache_type, key=None):
-        """获取缓存"""
-        if not self._is_cache_valid(cache_type, key):
+        """获取缓存，内存中没有时从本地数据库读取"""
+        entry = self._get_cache_entry(cache_type, key)
+        return entry[0] if entry is not None else None
+    
+    def _get_cache_entry(self, cache_type, key=None, allow_stale=False):
+        """
+        获取缓存条目，内存中没有时从本地数据库读取
+        
+        Args:
+            cache_type: 缓存类型
+            key: 缓存键
+            allow_stale: 是否返回已过期但仍在保留期限内的旧数据
+            
+        Returns:
+            (数据, 是否新鲜) 元组，没有可用数据时返回None
+        """
+        entry = self._cache.get_entry(cache_type, key, allow_stale)
+        if entry is not None:
+            return entry
+        
+        if self.store is None or cache_type not in self.PERSISTENT_CACHE_TYPES:
             return None
         
-        if key is None:
-            # 获取没有key的缓存类型
-            return self._cache[cache_type]
-        else:
-            # 获取有key的缓存类型
-            return self._cache[cache_type].get(key)
+        account = self._account_key()
+        if not account:
+            return None
+        
+        try:
+            stored = self.store.get(account, cache_type, key)
+        except Exception as e:
+            logger.warning(f"读取本地缓存失败: {str(e)}")
+            return None
+        
+        if stored is None:
+            return None
+        data, expires_at = stored
+        current_time = time.time()
+        stale_until = expires_at + self.cache_ttl['stale']
+        fresh = expires_at > current_time
+        if not fresh and not (allow_stale and stale_until > current_time):
+            return None
+        
+        logger.info(f"从本地数据库加载缓存: {cache_type} {key or ''}")
+        if cache_type in self.TIMELINE_CACHE_TYPES and isinstance(data, list):
+            data = project_statuses(data, self.keep_raw)
+        # 回填内存缓存，保留原有的过期时间
+        self._cache.set(cache_type, data, expires_at, key, stale_until)
+        return data, fresh
+    
+    def _get_stale_timeline(self, cache_type, cache_key, timeline, revalidate, *args):
+        """
+        获取已过期的时间线缓存，并在后台调用revalidate重新获取
+        
+        Args:
+            cache_type: 缓存类型
+            cache_key: 缓存键
+            timeline: 时间线标识(feed, gid, page)，后台更新完成后传给on_revalidated
+            revalidate: 重新获取数据的方法，参数为args
+        
+        Returns:
+            标记为旧数据的TimelineResult，没有旧数据时返回None
+        """
+        if not self.stale_while_revalidate:
+            return None
+        
+        entry = self._get_cache_entry(cache_type, cache_key, allow_stale=True)
+        if entry is None:
+            return None
+        data, fresh = entry
+        if fresh:
+            return TimelineResult(data)
+        
+        logger.info(f"先返回过期的缓存数据，后台重新获取: {cache_type} {cache_key}")
+        self._revalidate(timeline, revalidate, *args)
+        return TimelineResult(data, stale=True)
+    
+    def _fallback_timeline(self, cache_type, cache_key):
+        """请求失败（如重试后仍被限流）时返回保留期限内的旧数据，没有旧数据时返回None"""
+        entry = self._get_cache_entry(cache_type, cache_key, allow_stale=True)
+        if entry is not None:
+            logger.warning(f"请求失败，返回缓存的旧数据: {cache_type} {cache_key}")
+            return TimelineResult(entry[0], stale=True)
+        return None
+    
+    def _revalidate(self, task_key, func, *args):
+        """在后台线程中执行func重新获取数据，同一个task_key同时只执行一次，得到新数据时调用on_revalidated"""
+        with self._revalidate_lock:
+            if task_key in self._revalidating:
+                return
+            self._revalidating.add(task_key)
+            if self._revalidate_executor is None:
+                self._revalidate_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hyperweibo-revalidate")
+        
+        def run():
+            try:
+                result = func(*args)
+            except Exception as e:
+                logger.warning(f"后台更新缓存失败: {str(e)}")
+                return
+            finally:
+                with self._revalidate_lock:
+                    self._revalidating.discard(task_key)
+            # 请求失败时func返回的仍是旧数据，不通知界面，以免反复重新显示和请求
+            if self.on_revalidated is not None and not getattr(result, 'stale', False):
+                self.on_revalidated(task_key)
+        
+        self._revalidate_executor.submit(run)
     
     def _clear_cache(self, cache_type=None, key=None):
         """清除缓存"""
-        if cache_type is None:
-            # 清除所有缓存
-            self._cache = {
-                'groups': None,
-                'group_timeline': {},
-                'home_timeline': {},
-                'special_focus': {},
-                'html_parse': {},
-                'user_info': None,
-            }
-            self._cache_expiry = {
-                'groups': 0,
-                'group_timeline': {},
-                'home_timeline': {},
-                'special_focus': {},
-                'html_parse': {},
-                'user_info': 0,
-            }
-        elif key is None:
-            # 清除指定类型的所有缓存
-            self._cache[cache_type] = {} if isinstance(self._cache[cache_type], dict) else None
-            self._cache_expiry[cache_type] = {} if isinstance(self._cache_expiry[cache_type], dict) else 0
-        else:
-            # 清除指定类型和key的缓存
-            if key in self._cache[cache_type]:
-                del self._cache[cache_type][key]
-            if key in self._cache_expiry[cache_type]:
-                del self._cache_expiry[cache_type][key]
+        self._cache.delete(cache_type, key)
+        
+        # 同步清除本地数据库中的缓存
+        if self.store is not None:
+            account = self._account_key()
+            if account:
+                try:
+                    self.store.delete(account, cache_type, key)
+                except Exception as e:
+                    logger.warning(f"清除本地缓存失败: {str(e)}")
+    
+    def close(self):
+        """写完全文索引队列中的微博并关闭索引，之后获取的微博不再索引；共用的索引只是不再使用"""
+        if self.search_index is not None:
+            search_index, self.search_index = self.search_index, None
+            if self._owns_search_index:
+                search_index.close()
+    
+    def request_stats(self) -> Dict[str, Any]:
+        """获取请求统计：合并的相同请求数和请求调度器的统计"""
+        return {'single_flight': self._single_flight.stats(), 'scheduler': self.scheduler.stats()}
+    
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        获取内存缓存的统计信息
+        
+        Returns:
+            各缓存类型的条目数、字节数、命中、未命中、淘汰和过期次数
+        """
+        return self._cache.stats()
 
     def _parse_html_for_weibo(self, html_content):
         """解析HTML内容提取微博数据，并缓存结果"""
+        # 优先直接扫描原始文本，失败时再构建DOM逐个检查script标签
+        statuses = extract_statuses(html_content)
+        if statuses is not None:
+            return statuses
+        
+        return self._parse_html_with_soup(html_content)
+    
+    def _parse_html_with_soup(self, html_content):
+        """使用BeautifulSoup解析HTML内容提取微博数据"""
+        # 只有快速路径失败时才需要BeautifulSoup，避免启动时导入
+        from bs4 import BeautifulSoup
+        
         soup = BeautifulSoup(html_content, 'lxml')
         
         # 尝试提取渲染数据
@@ -223,6 +403,9 @@ class WeiboAPI:
 
     def _open_browser_for_login(self):
         """打开浏览器让用户登录微博"""
+        import subprocess
+        import webbrowser
+        
         logger.info("正在打开浏览器，请登录微博...")
         
         # 根据不同操作系统和浏览器类型打开浏览器
@@ -285,12 +468,15 @@ class WeiboAPI:
         input("请在浏览器中登录微博后，按回车键继续...")
         logger.info("用户已确认登录完成")
     
-    def _load_cookies_from_browser(self, browser):
-        """从浏览器加载微博cookie"""
-        try:
-            logger.info(f"尝试从{browser}浏览器获取cookie...")
-            
-            if browser.lower() == "chrome" and HAS_PYCOOKIECHEAT:
+    def _read_browser_cookies(self, browser):
+        """读取浏览器中微博的cookie，不验证，也不打开浏览器"""
+        # 浏览器cookie库导入较慢，只有没有提供cookie时才需要
+        import browser_cookie3
+        
+        browser = browser.lower()
+        if browser == "chrome":
+            chrome_cookies = _import_chrome_cookies()
+            if chrome_cookies is not None:
                 logger.info("使用pycookiecheat.chrome_cookies获取cookie")
                 try:
                     cookies_dict = chrome_cookies("https://m.weibo.cn")
@@ -300,28 +486,30 @@ class WeiboAPI:
                     cookies = requests.cookies.RequestsCookieJar()
                     for name, value in cookies_dict.items():
                         cookies.set(name, value, domain=".weibo.cn")
+                    return cookies
                 except Exception as e:
                     logger.error(f"使用pycookiecheat获取cookie失败: {str(e)}")
                     logger.info("尝试使用browser_cookie3作为备选方案")
-                    cookies = browser_cookie3.chrome(domain_name=".weibo.cn")
-            elif browser.lower() == "chrome":
-                logger.info("使用browser_cookie3.chrome获取cookie")
-                cookies = browser_cookie3.chrome(domain_name=".weibo.cn")
-                logger.info(f"成功获取Chrome cookie，cookie数量: {len(list(cookies))}")
-            elif browser.lower() == "firefox":
-                logger.info("使用browser_cookie3.firefox获取cookie")
-                cookies = browser_cookie3.firefox(domain_name=".weibo.cn")
-                logger.info(f"成功获取Firefox cookie，cookie数量: {len(list(cookies))}")
-            elif browser.lower() == "edge":
-                logger.info("使用browser_cookie3.edge获取cookie")
-                cookies = browser_cookie3.edge(domain_name=".weibo.cn")
-                logger.info(f"成功获取Edge cookie，cookie数量: {len(list(cookies))}")
-            elif browser.lower() == "safari":
-                logger.info("使用browser_cookie3.safari获取cookie")
-                cookies = browser_cookie3.safari(domain_name=".weibo.cn")
-                logger.info(f"成功获取Safari cookie，cookie数量: {len(list(cookies))}")
-            else:
-                raise ValueError(f"不支持的浏览器类型: {browser}")
+            loader = browser_cookie3.chrome
+        elif browser == "firefox":
+            loader = browser_cookie3.firefox
+        elif browser == "edge":
+            loader = browser_cookie3.edge
+        elif browser == "safari":
+            loader = browser_cookie3.safari
+        else:
+            raise ValueError(f"不支持的浏览器类型: {browser}")
+        
+        logger.info(f"使用browser_cookie3.{browser}获取cookie")
+        cookies = loader(domain_name=".weibo.cn")
+        logger.info(f"成功获取{browser} cookie，cookie数量: {len(list(cookies))}")
+        return cookies
+    
+    def _load_cookies_from_browser(self, browser):
+        """从浏览器加载微博cookie"""
+        try:
+            logger.info(f"尝试从{browser}浏览器获取cookie...")
+            cookies = self._read_browser_cookies(browser)
             
             # 检查是否获取到了关键cookie
             if isinstance(cookies, requests.cookies.RequestsCookieJar):
@@ -350,6 +538,7 @@ class WeiboAPI:
                 self._open_browser_for_login()
                 # 重新尝试获取cookie
                 return self._load_cookies_from_browser(browser)
+            self._save_credentials(browser)
             
         except Exception as e:
             logger.error(f"从{browser}浏览器加载cookie失败: {str(e)}")
@@ -361,25 +550,7 @@ class WeiboAPI:
             # 重新尝试获取cookie
             try:
                 logger.info(f"重新尝试从{browser}浏览器获取cookie...")
-                
-                if browser.lower() == "chrome" and HAS_PYCOOKIECHEAT:
-                    try:
-                        cookies_dict = chrome_cookies("https://m.weibo.cn")
-                        cookies = requests.cookies.RequestsCookieJar()
-                        for name, value in cookies_dict.items():
-                            cookies.set(name, value, domain=".weibo.cn")
-                    except Exception:
-                        cookies = browser_cookie3.chrome(domain_name=".weibo.cn")
-                elif browser.lower() == "chrome":
-                    cookies = browser_cookie3.chrome(domain_name=".weibo.cn")
-                elif browser.lower() == "firefox":
-                    cookies = browser_cookie3.firefox(domain_name=".weibo.cn")
-                elif browser.lower() == "edge":
-                    cookies = browser_cookie3.edge(domain_name=".weibo.cn")
-                elif browser.lower() == "safari":
-                    cookies = browser_cookie3.safari(domain_name=".weibo.cn")
-                else:
-                    raise ValueError(f"不支持的浏览器类型: {browser}")
+                cookies = self._read_browser_cookies(browser)
                 
                 # 检查是否获取到了关键cookie
                 if isinstance(cookies, requests.cookies.RequestsCookieJar):
@@ -398,41 +569,158 @@ class WeiboAPI:
                     logger.warning("重新加载的cookie仍然无效")
                     self.use_mock = True
                     logger.info("已切换到模拟数据模式")
+                else:
+                    self._save_credentials(browser)
             except Exception as e:
                 logger.error(f"重新加载cookie失败: {str(e)}")
                 self.use_mock = True
                 logger.info("已切换到模拟数据模式")
     
+    def _load_cached_credentials(self, browser):
+        """
+        使用缓存的登录凭据，有效时在后台重新验证
+        
+        Returns:
+            是否已从缓存加载cookie
+        """
+        if self.credentials is None:
+            return False
+        try:
+            cookies = self.credentials.load(browser)
+        except Exception as e:
+            logger.warning(f"读取登录凭据缓存失败: {str(e)}")
+            return False
+        if not cookies:
+            return False
+        
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain') or ".weibo.cn",
+                                     path=cookie.get('path') or "/")
+        logger.info(f"已使用缓存的{browser}浏览器登录凭据")
+        
+        # 验证需要一次网络请求，放到后台进行；只有服务器拒绝时才删除缓存并重新从浏览器读取，
+        # 网络错误或被限流时无法判断，继续使用缓存的凭据。浏览器中的cookie也被拒绝时
+        # 设置auth_failed并调用on_auth_failed，由界面提示用户重新登录
+        def verify():
+            valid = self._check_cookie()
+            if valid is None:
+                logger.warning("暂时无法验证缓存的登录凭据，继续使用")
+                return
+            if valid:
+                return
+            logger.warning("缓存的登录凭据已被服务器拒绝，重新从浏览器读取")
+            self.credentials.invalidate(browser)
+            try:
+                # 先建立新的cookie，再整体替换，其他线程中的请求始终看到完整的一组cookie
+                cookies = requests.cookies.RequestsCookieJar()
+                cookies.update(self._read_browser_cookies(browser))
+                with self._cookie_lock:
+                    self.session.cookies = cookies
+            except Exception as e:
+                logger.error(f"从{browser}浏览器重新读取cookie失败: {str(e)}")
+            else:
+                valid = self._check_cookie()
+                if valid is None:
+                    logger.warning("暂时无法验证浏览器中的cookie，继续使用")
+                    return
+                if valid:
+                    logger.info(f"已改用{browser}浏览器中的cookie")
+                    self._save_credentials(browser)
+                    return
+            logger.warning("浏览器中的cookie也无效，请在浏览器中重新登录微博")
+            self.auth_failed = True
+            if self.on_auth_failed is not None:
+                self.on_auth_failed()
+        
+        threading.Thread(target=verify, name="hyperweibo-verify", daemon=True).start()
+        return True
+    
+    def _save_credentials(self, browser):
+        """缓存已验证的cookie"""
+        if self.credentials is None:
+            return
+        cookies = [
+            {'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path}
+            for cookie in self.session.cookies
+        ]
+        try:
+            self.credentials.save(browser, cookies)
+        except Exception as e:
+            logger.warning(f"保存登录凭据缓存失败: {str(e)}")
+    
+    def _get_json(self, url, **kwargs):
+        """
+        发出GET请求并解析JSON，地址、参数和调度选项都相同的并发请求只发出一次
+        
+        Args:
+            url: 请求地址
+            **kwargs: 传给RequestScheduler.get的参数
+            
+        Returns:
+            (状态码, JSON数据)，响应不是JSON时数据为None
+        """
+        def fetch():
+            response = self.scheduler.get(url, **kwargs)
+            try:
+                return response.status_code, response.json()
+            except ValueError:
+                logger.warning(f"无法解析JSON响应: {response.text[:100]}...")
+                return response.status_code, None
+        
+        # 参数、超时或重试次数不同的请求不合并，否则一方会得到按另一方的超时和重试策略发出的结果
+        options = tuple(sorted((name, value) for name, value in kwargs.items() if name != 'params'))
+        return self._single_flight.do((request_key(url, kwargs.get('params')), options), fetch)
+    
     def _verify_cookie(self):
-        """验证cookie是否有效"""
+        """验证cookie是否有效，无法判断（如网络错误）时也返回False"""
+        return self._check_cookie() is True
+    
+    def _check_cookie(self) -> Optional[bool]:
+        """
+        验证cookie是否有效，成功时顺便缓存分组列表（同一个接口）
+        
+        Returns:
+            有效时返回True；服务器拒绝（401/403、跳转到登录页或ok不为1）时返回False；
+            网络错误、被限流或服务端错误等无法判断的情况返回None
+        """
         try:
-            # 尝试获取用户信息，如果成功则cookie有效
+            # 尝试获取分组列表，如果成功则cookie有效
             url = f"{self.BASE_URL}/api/config/list"
             logger.info(f"正在验证cookie有效性，请求URL: {url}")
             
-            response = self.session.get(url, timeout=5)
-            logger.info(f"验证cookie响应状态码: {response.status_code}")
+            status_code, data = self._get_json(url, timeout=5, max_retries=1)
+            logger.info(f"验证cookie响应状态码: {status_code}")
             
-            if response.status_code != 200:
-                logger.warning(f"验证cookie请求失败，状态码: {response.status_code}")
+            if status_code in (401, 403):
+                logger.warning(f"cookie验证失败，状态码: {status_code}")
                 return False
+            if status_code != 200:
+                logger.warning(f"验证cookie请求失败，状态码: {status_code}")
+                return None
+            if data is None:
+                logger.warning("cookie验证失败，无法解析JSON响应")
+                return None
             
-            try:
-                data = response.json()
-                logger.info(f"验证cookie响应JSON: {data}")
-                
-                if data.get('ok') == 1:
-                    logger.info("cookie验证成功")
-                    return True
-                else:
-                    logger.warning(f"cookie验证失败，响应ok值不为1: {data.get('ok')}")
-                    return False
-            except json.JSONDecodeError:
-                logger.warning(f"cookie验证失败，无法解析JSON响应: {response.text[:100]}...")
+            if data.get('ok') == 1:
+                logger.info("cookie验证成功")
+                # 启动时紧接着会获取分组列表，避免再次请求同一个接口
+                if isinstance(data.get('data'), dict) and 'groups' in data['data']:
+                    self._set_cache('groups', data['data']['groups'])
+                return True
+            else:
+                logger.warning(f"cookie验证失败，响应ok值不为1: {data.get('ok')}")
                 return False
+        except ThrottledError as e:
+            # 登录失效时微博会跳转到登录页面，调度器把非数据页面当作限流
+            response = e.response
+            if response is not None and "passport.weibo" in (response.url or ""):
+                logger.warning("cookie验证失败，已跳转到登录页面")
+                return False
+            logger.error(f"cookie验证过程中发生错误: {str(e)}")
+            return None
         except Exception as e:
             logger.error(f"cookie验证过程中发生错误: {str(e)}")
-            return False
+            return None
     
     def set_cookie_from_string(self, cookie_str):
         """从字符串设置cookie"""
@@ -473,7 +761,7 @@ class WeiboAPI:
             page: 页码，从1开始
             
         Returns:
-            微博列表
+            微博列表，请求失败时返回保留期限内的旧数据，没有旧数据时抛出异常
         """
         # 如果使用模拟数据，直接返回模拟数据
         if self.use_mock:
@@ -486,42 +774,140 @@ class WeiboAPI:
             logger.info(f"使用缓存的首页微博数据，页码: {page}")
             return cached_data
         
-        # 添加页码参数
+        # 缓存已过期时先返回旧数据
+        stale_data = self._get_stale_timeline('home_timeline', cache_key, ("home", None, page),
+                                              self._fetch_home_timeline, page)
+        if stale_data is not None:
+            return stale_data
+        
+        return self._fetch_home_timeline(page)
+    
+    def _fetch_home_timeline(self, page) -> List[Dict[str, Any]]:
+        """从网络获取首页微博并写入缓存"""
+        cache_key = f"page_{page}"
+        
         url = f"{self.BASE_URL}/feed/friends"
         params = {"page": page}
         
         try:
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            
-            # 尝试解析JSON响应
-            try:
-                data = response.json()
-                if 'data' in data and 'statuses' in data['data']:
-                    result = data['data']['statuses']
-                    # 缓存结果
-                    self._set_cache('home_timeline', result, cache_key)
-                    return result
-            except json.JSONDecodeError:
-                pass
-            
-            # 生成HTML解析缓存键
-            html_cache_key = f"{url}_{urlencode(params)}"
-            parsed_html = self._get_cache('html_parse', html_cache_key)
-            
-            if parsed_html is None:
-                # 如果JSON解析失败，尝试解析HTML
-                parsed_html = self._parse_html_for_weibo(response.text)
-                # 缓存HTML解析结果
-                self._set_cache('html_parse', parsed_html, html_cache_key, self.cache_ttl['html_parse'])
-            
+            result = self._request_statuses(url, params)
             # 缓存结果
-            self._set_cache('home_timeline', parsed_html, cache_key)
-            return parsed_html
+            self._set_cache('home_timeline', result, cache_key)
+            return result
         except Exception as e:
             logger.error(f"获取首页微博失败: {str(e)}")
-            # 如果获取失败，返回模拟数据
-            return self._generate_mock_weibo(10)
+            # 如果获取失败，返回旧数据，没有旧数据时抛出异常
+            stale_data = self._fallback_timeline('home_timeline', cache_key)
+            if stale_data is None:
+                raise
+            return stale_data
+    
+    def fetch_timeline_page(self, feed="home", page=1, gid=None) -> List[Dict[str, Any]]:
+        """
+        直接从网络获取时间线的一页，不读写缓存，用于导出等批量任务
+        
+        Args:
+            feed: "home"、"special"或"group"
+            page: 页码，从1开始
+            gid: feed为"group"时的分组ID
+            
+        Returns:
+            微博列表，请求失败时抛出异常，而不是返回旧数据或模拟数据
+        """
+        if self.use_mock:
+            return self._generate_mock_weibo(10 if feed == "home" else 5)
+        
+        if feed == "special":
+            gid = self.get_group_registry().special_focus_gid
+            if gid is None:
+                raise ValueError("未找到特别关注分组")
+            feed = "group"
+        
+        if feed == "group":
+            return self._request_statuses(f"{self.BASE_URL}/feed/group", {"gid": gid, "page": page})
+        return self._request_statuses(f"{self.BASE_URL}/feed/friends", {"page": page})
+
+    def poll_timeline(self, feed="home", gid=None) -> List[Dict[str, Any]]:
+        """
+        增量同步时间线并用其最新的一页更新第1页的缓存，用于后台轮询
+
+        第一次轮询请求完整的第1页，之后只请求比已知最新微博更新的微博（见TimelineSync），
+        界面在收到更新通知后重新显示第1页时直接使用缓存
+
+        Args:
+            feed: "home"、"special"或"group"
+            gid: feed为"group"时的分组ID
+
+        Returns:
+            第1页的微博列表，请求失败时抛出异常
+        """
+        if self.use_mock:
+            return self.fetch_timeline_page(feed, 1, gid)
+
+        sync = self.get_timeline_sync(feed, gid)
+        sync.refresh()
+        statuses = sync.statuses[:sync.page_size]
+
+        if feed == "home":
+            self._set_cache('home_timeline', statuses, "page_1")
+            return statuses
+
+        registry = self.get_group_registry()
+        if feed == "special":
+            gid = registry.special_focus_gid
+        self._set_cache('group_timeline', statuses, f"{gid}_page_1")
+        if registry.is_special_focus(gid):
+            self._set_cache('special_focus', statuses, "page_1")
+        return statuses
+
+    def _ingest_statuses(self, statuses) -> List[Any]:
+        """补充created_ts字段，并转换为只保留所需字段的Status"""
+        return project_statuses(normalize_statuses(statuses), self.keep_raw)
+    
+    def _index_statuses(self, statuses) -> List[Any]:
+        """把从网络获取的微博交给全文索引（后台写入），返回原列表"""
+        if self.search_index is not None:
+            self.search_index.submit(statuses)
+        return statuses
+    
+    def _request_statuses(self, url, params) -> List[Dict[str, Any]]:
+        """
+        请求时间线接口并提取微博列表，JSON解析失败时从HTML中提取
+        
+        Args:
+            url: 接口地址
+            params: 请求参数
+            
+        Returns:
+            微博列表，请求失败时抛出异常
+        """
+        # 相同的并发请求（如预取和用户翻页同时请求同一页）共享一次请求和解析
+        return self._single_flight.do(request_key(url, params), self._fetch_statuses, url, params)
+    
+    def _fetch_statuses(self, url, params) -> List[Dict[str, Any]]:
+        """请求时间线接口并提取微博列表，见_request_statuses"""
+        response = self.scheduler.get(url, params=params, accept_html=True)
+        response.raise_for_status()
+        
+        # 尝试解析JSON响应
+        try:
+            data = response.json()
+            if 'data' in data and 'statuses' in data['data']:
+                return self._index_statuses(self._ingest_statuses(data['data']['statuses']))
+        except json.JSONDecodeError:
+            pass
+        
+        # 生成HTML解析缓存键
+        html_cache_key = f"{url}_{urlencode(params)}"
+        parsed_html = self._get_cache('html_parse', html_cache_key)
+        
+        if parsed_html is None:
+            # 如果JSON解析失败，尝试解析HTML
+            parsed_html = self._index_statuses(self._ingest_statuses(self._parse_html_for_weibo(response.text)))
+            # 缓存HTML解析结果
+            self._set_cache('html_parse', parsed_html, html_cache_key, self.cache_ttl['html_parse'])
+        
+        return parsed_html
     
     def get_special_focus(self, page=1) -> List[Dict[str, Any]]:
         """
@@ -531,7 +917,7 @@ class WeiboAPI:
             page: 页码，从1开始
             
         Returns:
-            特别关注的微博列表
+            特别关注的微博列表，请求失败时同get_group_timeline，没有特别关注分组时抛出ValueError
         """
         # 如果使用模拟数据，直接返回模拟数据
         if self.use_mock:
@@ -544,24 +930,13 @@ class WeiboAPI:
             logger.info(f"使用缓存的特别关注微博数据，页码: {page}")
             return cached_data
         
-        # 先获取用户的分组列表
-        groups = self.get_groups()
-        special_focus_group = None
-        
-        # 查找名为"特别关注"的分组
-        for group in groups:
-            if group.get("name") == "特别关注":
-                special_focus_group = group
-                break
+        # 从分组索引中查找特别关注分组
+        gid = self.get_group_registry().special_focus_gid
         
-        # 如果找到了特别关注分组，使用其ID；否则使用默认ID
-        if special_focus_group:
-            gid = special_focus_group.get("gid")
-            logger.info(f"找到特别关注分组，ID: {gid}")
-        else:
-            logger.warning("未找到特别关注分组，将使用默认分组")
-            # 如果没有找到特别关注分组，返回模拟数据
-            return self._generate_mock_weibo(5)
+        # 没有特别关注分组时无法获取，不再用模拟数据代替
+        if gid is None:
+            raise ValueError("未找到特别关注分组")
+        logger.info(f"找到特别关注分组，ID: {gid}")
         
         # 使用分组ID获取微博
         return self.get_group_timeline(gid, page)
@@ -587,19 +962,19 @@ class WeiboAPI:
         url = f"{self.BASE_URL}/api/config"
         
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
+            status_code, data = self._get_json(url)
+            if status_code != 200 or data is None:
+                raise ValueError(f"获取登录状态失败，状态码: {status_code}")
             
             # 解析JSON响应
-            data = response.json()
             if 'data' in data and 'login' in data['data'] and data['data']['login']:
                 # 如果已登录，获取用户详细信息
                 uid = data['data'].get('uid', '')
                 if uid:
                     user_url = f"{self.BASE_URL}/api/container/getIndex?containerid=230283{uid}_-_INFO"
-                    user_response = self.session.get(user_url)
-                    user_response.raise_for_status()
-                    user_data = user_response.json()
+                    user_status, user_data = self._get_json(user_url)
+                    if user_status != 200 or user_data is None:
+                        raise ValueError(f"获取用户详细信息失败，状态码: {user_status}")
                     
                     # 提取用户信息
                     if 'data' in user_data and 'cards' in user_data['data']:
@@ -639,13 +1014,12 @@ class WeiboAPI:
                 self._set_cache('user_info', result)
                 return result
             
-            # 如果未登录，返回模拟数据
             logger.error("未登录微博")
-            return self._generate_mock_user()
+            return None
         except Exception as e:
+            # 模拟数据只在use_mock时使用，获取失败时不用模拟用户代替
             logger.error(f"获取用户信息失败: {str(e)}")
-            # 如果获取失败，返回模拟数据
-            return self._generate_mock_user()
+            return None
     
     def _extract_number(self, text):
         """从文本中提取数字"""
@@ -666,7 +1040,8 @@ class WeiboAPI:
         获取用户的分组列表
         
         Returns:
-            分组列表，每个分组包含gid和name
+            分组列表，每个分组包含gid和name；请求失败（如重试后仍被限流）时返回上次获取的分组列表，
+            没有可用的旧分组列表时抛出异常
         """
         # 如果使用模拟数据，直接返回模拟数据
         if self.use_mock:
@@ -686,28 +1061,56 @@ class WeiboAPI:
         url = f"{self.BASE_URL}/api/config/list"
         
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
+            status_code, data = self._get_json(url)
+            if status_code != 200 or data is None:
+                raise ValueError(f"获取分组列表失败，状态码: {status_code}")
             
             # 解析JSON响应
-            data = response.json()
             if data.get('ok') == 1 and 'data' in data and 'groups' in data['data']:
                 result = data['data']['groups']
                 # 缓存结果
                 self._set_cache('groups', result)
                 return result
             
-            return []
+            raise ValueError(f"分组列表响应格式不正确: ok={data.get('ok')}")
         except Exception as e:
             logger.error(f"获取分组列表失败: {str(e)}")
-            # 如果获取失败，返回模拟数据
-            mock_data = [
-                {"gid": "xxxxxxxxxxxxxxxxxx", "name": "特别关注"},
-                {"gid": "xxxxxxxxxxxxxxxxxx", "name": "名人明星"},
-                {"gid": "xxxxxxxxxxxxxxxxxx", "name": "同事"},
-                {"gid": "xxxxxxxxxxxxxxxxxx", "name": "同学"}
-            ]
-            return mock_data
+            # 失败的请求不能当作分组变化，否则会清除特别关注的缓存；返回上次的分组列表
+            registry = self._group_registry
+            if registry is not None:
+                logger.warning("使用上次获取的分组列表")
+                return registry.groups
+            entry = self._get_cache_entry('groups', allow_stale=True)
+            if entry is not None:
+                logger.warning("使用缓存的旧分组列表")
+                return entry[0]
+            raise
+    
+    def get_group_registry(self) -> GroupRegistry:
+        """
+        获取分组索引，分组列表重新获取后才重建
+        
+        Returns:
+            GroupRegistry，可按gid和名称查找分组；分组成员变化时version递增。
+            获取分组列表失败时沿用当前索引，没有可用的分组列表时抛出异常
+        """
+        groups = self.get_groups()
+        registry = self._group_registry
+        if registry is not None and registry.groups is groups:
+            return registry
+        
+        with self._group_registry_lock:
+            registry = self._group_registry
+            if registry is None:
+                registry = GroupRegistry(groups)
+            elif registry.groups is not groups:
+                registry = registry.refreshed(groups)
+                if registry.version != self._group_registry.version:
+                    # 特别关注分组可能已变化，按旧分组缓存的特别关注微博不再可靠
+                    logger.info(f"分组列表已变化，版本: {registry.version}")
+                    self._clear_cache('special_focus')
+            self._group_registry = registry
+        return registry
     
     def get_group_timeline(self, gid: str, page=1) -> List[Dict[str, Any]]:
         """
@@ -718,7 +1121,7 @@ class WeiboAPI:
             page: 页码，从1开始
             
         Returns:
-            分组微博列表
+            分组微博列表，请求失败时返回保留期限内的旧数据，没有旧数据时抛出异常
         """
         # 如果使用模拟数据，直接返回模拟数据
         if self.use_mock:
@@ -731,52 +1134,101 @@ class WeiboAPI:
             logger.info(f"使用缓存的分组微博数据，分组ID: {gid}, 页码: {page}")
             return cached_data
         
+        # 缓存已过期时先返回旧数据
+        stale_data = self._get_stale_timeline('group_timeline', cache_key, ("group", gid, page),
+                                              self._fetch_group_timeline, gid, page)
+        if stale_data is not None:
+            return stale_data
+        
+        return self._fetch_group_timeline(gid, page)
+    
+    def _fetch_group_timeline(self, gid: str, page) -> List[Dict[str, Any]]:
+        """从网络获取指定分组的微博并写入缓存"""
+        cache_key = f"{gid}_page_{page}"
+        
         # 使用分组ID获取微博
         url = f"{self.BASE_URL}/feed/group"
         params = {"gid": gid, "page": page}
         
         try:
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            
-            # 尝试解析JSON响应
-            try:
-                data = response.json()
-                if 'data' in data and 'statuses' in data['data']:
-                    result = data['data']['statuses']
-                    # 缓存结果
-                    self._set_cache('group_timeline', result, cache_key)
-                    # 如果是特别关注分组，也缓存到special_focus
-                    for group in self.get_groups():
-                        if group.get("gid") == gid and group.get("name") == "特别关注":
-                            self._set_cache('special_focus', result, f"page_{page}")
-                            break
-                    return result
-            except json.JSONDecodeError:
-                pass
-            
-            # 生成HTML解析缓存键
-            html_cache_key = f"{url}_{urlencode(params)}"
-            parsed_html = self._get_cache('html_parse', html_cache_key)
-            
-            if parsed_html is None:
-                # 如果JSON解析失败，尝试解析HTML
-                parsed_html = self._parse_html_for_weibo(response.text)
-                # 缓存HTML解析结果
-                self._set_cache('html_parse', parsed_html, html_cache_key, self.cache_ttl['html_parse'])
-            
+            result = self._request_statuses(url, params)
             # 缓存结果
-            self._set_cache('group_timeline', parsed_html, cache_key)
+            self._set_cache('group_timeline', result, cache_key)
             # 如果是特别关注分组，也缓存到special_focus
-            for group in self.get_groups():
-                if group.get("gid") == gid and group.get("name") == "特别关注":
-                    self._set_cache('special_focus', parsed_html, f"page_{page}")
-                    break
-            return parsed_html
+            registry = self._group_registry or self.get_group_registry()
+            if registry.is_special_focus(gid):
+                self._set_cache('special_focus', result, f"page_{page}")
+            return result
         except Exception as e:
             logger.error(f"获取分组微博失败: {str(e)}")
-            # 如果获取失败，返回模拟数据
-            return self._generate_mock_weibo(5) 
+            # 如果获取失败，返回旧数据，没有旧数据时抛出异常
+            stale_data = self._fallback_timeline('group_timeline', cache_key)
+            if stale_data is None:
+                raise
+            return stale_data
+    
+    def iter_home_timeline(self, start_page=1, max_items=None, older_than=None, seen_ids=None,
+                           max_pages=None, read_ahead=True) -> Iterator[Any]:
+        """
+        逐条遍历首页微博，按需跨页获取，参数见iter_timeline
+        
+        Returns:
+            按从新到旧排列的微博迭代器
+        """
+        return iter_timeline(self, "home", None, start_page, max_items, older_than, seen_ids, max_pages, read_ahead)
+    
+    def iter_group_timeline(self, gid: str, start_page=1, max_items=None, older_than=None, seen_ids=None,
+                            max_pages=None, read_ahead=True) -> Iterator[Any]:
+        """
+        逐条遍历指定分组的微博，按需跨页获取，参数见iter_timeline
+        
+        Returns:
+            按从新到旧排列的微博迭代器
+        """
+        return iter_timeline(self, "group", gid, start_page, max_items, older_than, seen_ids, max_pages, read_ahead)
+    
+    def iter_special_focus(self, start_page=1, max_items=None, older_than=None, seen_ids=None,
+                           max_pages=None, read_ahead=True) -> Iterator[Any]:
+        """
+        逐条遍历特别关注的微博，按需跨页获取，参数见iter_timeline
+        
+        Returns:
+            按从新到旧排列的微博迭代器
+        """
+        return iter_timeline(self, "special", None, start_page, max_items, older_than, seen_ids, max_pages, read_ahead)
+    
+    def get_timeline_sync(self, feed="home", gid=None) -> TimelineSync:
+        """
+        获取时间线的增量同步对象，同一个时间线始终返回同一个对象
+        
+        Args:
+            feed: "home"、"special"或"group"
+            gid: feed为"group"时的分组ID
+            
+        Returns:
+            TimelineSync实例
+        """
+        if feed == "special":
+            gid = self.get_group_registry().special_focus_gid
+            feed = "group"
+        key = (feed, gid if feed == "group" else None)
+        if key not in self._syncs:
+            self._syncs[key] = TimelineSync(self, feed=key[0], gid=key[1])
+        return self._syncs[key]
+    
+    def sync_timeline(self, feed="home", gid=None) -> List[Dict[str, Any]]:
+        """
+        增量刷新时间线，只请求比上次最新微博更新的内容
+        
+        Args:
+            feed: "home"、"special"或"group"
+            gid: feed为"group"时的分组ID
+            
+        Returns:
+            新增的微博列表，按从新到旧排列；完整时间线见get_timeline_sync(...).statuses。
+            请求失败时抛出异常，游标不变
+        """
+        return self.get_timeline_sync(feed, gid).refresh()
     
     def _generate_mock_weibo(self, count=10) -> List[Dict[str, Any]]:
         """生成模拟微博数据"""
@@ -867,7 +1319,7 @@ class WeiboAPI:
             
             mock_weibos.append(weibo)
         
-        return mock_weibos
+        return self._ingest_statuses(mock_weibos)
     
     def _generate_mock_user(self) -> Dict[str, Any]:
         """生成模拟用户数据"""
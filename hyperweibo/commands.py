@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+非交互式子命令
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import argparse
+import os
+import sys
+
+from rich.console import Console
+from rich.text import Text
+
+# 尝试使用相对导入
+try:
+    from utils.startup import setup_logging
+except ImportError:
+    # 如果相对导入失败，尝试使用绝对导入
+    try:
+        from hyperweibo.utils.startup import setup_logging
+    except ImportError:
+        # 如果绝对导入也失败，尝试调整导入路径
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from hyperweibo.utils.startup import setup_logging
+
+# 进度和结果输出到标准错误，不干扰标准输出
+console = Console(stderr=True)
+
+
+def add_api_arguments(parser):
+    """添加创建WeiboAPI所需的公共参数"""
+    parser.add_argument("-b", "--browser", default="chrome", choices=["chrome", "firefox", "edge", "safari"],
+                        help="指定浏览器 (默认: chrome)")
+    parser.add_argument("-m", "--mock", action="store_true",
+                        help="使用模拟数据")
+    parser.add_argument("-c", "--cookie", type=str,
+                        help="提供会话cookie")
+    parser.add_argument("-d", "--data-dir", type=str,
+                        help="本地数据目录，用于持久化缓存 (默认: ~/.hyperweibo)")
+    parser.add_argument("--no-credential-cache", action="store_true",
+                        help="不缓存浏览器登录凭据，每次启动都从浏览器读取并验证cookie")
+
+
+def create_api(args, **kwargs):
+    """按命令行参数创建WeiboAPI，kwargs为其他构造参数"""
+    # WeiboAPI会导入requests、bs4和浏览器cookie等较重的模块，只在需要请求微博的命令中导入
+    from hyperweibo.api.weibo_api import WeiboAPI
+    
+    setup_logging()
+    return WeiboAPI(browser=args.browser, use_mock=args.mock, cookie_str=args.cookie,
+                    data_dir=args.data_dir, use_credential_cache=not args.no_credential_cache, **kwargs)
+
+
+def export_main(argv=None):
+    """
+    export子命令：把时间线导出为NDJSON文件
+
+    Args:
+        argv: 命令行参数（不含子命令名），默认为sys.argv[2:]
+
+    Returns:
+        退出码
+    """
+    from hyperweibo.api.export import TimelineExporter, parse_cutoff
+
+    parser = argparse.ArgumentParser(prog="hyperweibo.py export", description="把时间线导出为NDJSON文件（每行一条微博）")
+    parser.add_argument("-o", "--output", required=True,
+                        help="输出文件，以.gz结尾时使用gzip压缩")
+    parser.add_argument("-S", "--special", action="store_true",
+                        help="导出特别关注")
+    parser.add_argument("-g", "--group", type=str,
+                        help="导出指定分组ID")
+    parser.add_argument("-p", "--page", type=int, default=1,
+                        help="起始页码，从1开始 (默认: 1)")
+    parser.add_argument("-e", "--end-page", type=int,
+                        help="结束页码（包含）")
+    parser.add_argument("-t", "--older-than", type=str,
+                        help="遇到早于该时间的微博时停止，支持时间戳、ISO日期时间或相对时间如7d、12h")
+    parser.add_argument("-j", "--concurrency", type=int, default=4,
+                        help="同时获取的页数 (默认: 4)")
+    parser.add_argument("--gzip", action="store_true", default=None,
+                        help="使用gzip压缩，不论文件名后缀")
+    parser.add_argument("--restart", action="store_true",
+                        help="忽略上次中断时的进度，重新导出")
+    parser.add_argument("--raw", action="store_true",
+                        help="导出接口返回的全部字段，默认只导出精简后的字段")
+    parser.add_argument("--skip-exported", action="store_true",
+                        help="跳过之前任何一次导出中已经导出过的微博")
+    add_api_arguments(parser)
+    args = parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+    if args.end_page is None and args.older_than is None:
+        parser.error("必须指定 --end-page 或 --older-than")
+    if args.special and args.group:
+        parser.error("--special 和 --group 不能同时使用")
+    try:
+        older_than = parse_cutoff(args.older_than) if args.older_than else None
+    except ValueError:
+        parser.error(f"无法解析的时间: {args.older_than}")
+
+    feed = "special" if args.special else "group" if args.group else "home"
+
+    def progress(page, count, total):
+        console.print(f"已导出第{page}页: {count}条，共{total}条")
+
+    api = None
+    try:
+        api = create_api(args, keep_raw=args.raw)
+        seen_index = None
+        if args.skip_exported:
+            from hyperweibo.utils.seen import SeenIndex
+            seen_index = SeenIndex(args.data_dir, name="export")
+        exporter = TimelineExporter(api, args.output, feed=feed, gid=args.group,
+                                    start_page=args.page, end_page=args.end_page, older_than=older_than,
+                                    concurrency=args.concurrency, compress=args.gzip, progress=progress,
+                                    seen_index=seen_index)
+        stats = exporter.run(restart=args.restart)
+    except KeyboardInterrupt:
+        console.print("[bold yellow]导出已中断，再次运行相同的命令即可继续[/bold yellow]")
+        return 130
+    except Exception as e:
+        console.print(f"[bold red]导出失败: {str(e)}[/bold red]")
+        console.print("[bold yellow]再次运行相同的命令即可从中断处继续[/bold yellow]")
+        return 1
+    finally:
+        if api is not None:
+            api.close()
+
+    console.print(f"[bold green]导出完成: {stats['exported']}条微博，{stats['pages']}页 -> {args.output}[/bold green]")
+    return 0
+
+
+def search_main(argv=None):
+    """
+    search子命令：在本地全文索引中检索看过的微博，不访问网络
+
+    Args:
+        argv: 命令行参数（不含子命令名），默认为sys.argv[2:]
+
+    Returns:
+        退出码
+    """
+    import json
+    from hyperweibo.api.export import parse_cutoff
+    from hyperweibo.utils.search_index import SearchIndex
+
+    parser = argparse.ArgumentParser(prog="hyperweibo.py search", description="在本地全文索引中检索看过的微博")
+    parser.add_argument("query", nargs="*",
+                        help="关键词，多个关键词须同时出现；以#开头的词只匹配话题")
+    parser.add_argument("-a", "--author", type=str,
+                        help="只显示指定作者（昵称）的微博")
+    parser.add_argument("--since", type=str,
+                        help="只显示此时间之后的微博，支持时间戳、ISO日期时间或相对时间如7d、12h")
+    parser.add_argument("--until", type=str,
+                        help="只显示此时间之前的微博，格式同--since")
+    parser.add_argument("-n", "--limit", type=int, default=20,
+                        help="最多显示的条数 (默认: 20)")
+    parser.add_argument("--sort", choices=["rank", "time"], default="rank",
+                        help="按相关度或发布时间排序 (默认: rank)")
+    parser.add_argument("--json", action="store_true",
+                        help="每行输出一条微博的JSON")
+    parser.add_argument("-d", "--data-dir", type=str,
+                        help="本地数据目录 (默认: ~/.hyperweibo)")
+    args = parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+    try:
+        since = parse_cutoff(args.since) if args.since else None
+        until = parse_cutoff(args.until) if args.until else None
+    except ValueError:
+        parser.error(f"无法解析的时间: {args.since if args.since else args.until}")
+
+    index = SearchIndex(args.data_dir, background=False)
+    try:
+        results = index.search(" ".join(args.query), author=args.author, since=since, until=until,
+                               limit=args.limit, sort=args.sort)
+    finally:
+        index.close()
+
+    if args.json:
+        for status in results:
+            print(json.dumps(status, ensure_ascii=False))
+        return 0
+
+    if not results:
+        console.print("[bold yellow]没有找到匹配的微博[/bold yellow]")
+        return 0
+
+    from rich.console import Group
+    from hyperweibo.utils.formatter import WeiboFormatter
+
+    output = Console()
+    renderables = [Text(f"找到 {len(results)} 条微博", style="bold"), Text()]
+    for status in results:
+        renderables.append(WeiboFormatter.format_weibo(status, absolute_time=True))
+    output.print(Group(*renderables))
+    return 0
+
+
+def daemon_main(argv=None):
+    """
+    daemon子命令：启动、停止常驻后台的时间线服务或查看其状态
+
+    Args:
+        argv: 命令行参数（不含子命令名），默认为sys.argv[2:]
+
+    Returns:
+        退出码
+    """
+    import json
+    from hyperweibo.api.daemon_client import DaemonClient, format_address
+
+    parser = argparse.ArgumentParser(prog="hyperweibo.py daemon",
+                                     description="常驻后台的时间线服务，多个终端共用一个会话、缓存和轮询")
+    parser.add_argument("action", nargs="?", choices=["start", "run", "stop", "status"], default="start",
+                        help="start: 在后台启动；run: 在前台运行；stop: 停止；status: 查看状态 (默认: start)")
+    parser.add_argument("-r", "--refresh", type=int, default=60,
+                        help="轮询时间线的最短间隔（秒） (默认: 60)")
+    parser.add_argument("--refresh-max", type=int, default=900,
+                        help="安静的时间线最长的轮询间隔（秒） (默认: 900)")
+    parser.add_argument("--refresh-budget", type=int, default=12,
+                        help="每分钟最多的轮询请求数 (默认: 12)")
+    add_api_arguments(parser)
+    argv = sys.argv[2:] if argv is None else list(argv)
+    args = parser.parse_args(argv)
+
+    client = DaemonClient.connect(args.data_dir)
+    if args.action in ("stop", "status"):
+        if client is None:
+            console.print("[bold yellow]后台服务没有运行[/bold yellow]")
+            return 1
+        try:
+            if args.action == "stop":
+                client.stop()
+                console.print("[bold green]后台服务已停止[/bold green]")
+            else:
+                print(json.dumps(client.stats(), ensure_ascii=False, indent=2))
+        finally:
+            client.close()
+        return 0
+
+    if client is not None:
+        client.close()
+        console.print(f"[bold yellow]后台服务已在运行: {format_address(client.address)}[/bold yellow]")
+        return 0
+
+    if args.action == "start":
+        return _start_daemon(args, [arg for arg in argv if arg != "start"])
+
+    import signal
+    from hyperweibo.api.daemon import TimelineDaemon
+
+    # 终止信号与Ctrl+C相同，退出前删除套接字并写完全文索引
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    api = create_api(args, stale_while_revalidate=True)
+    daemon = TimelineDaemon(api, args.data_dir, min_interval=args.refresh, max_interval=args.refresh_max,
+                            budget=args.refresh_budget)
+    try:
+        address = daemon.bind()
+    except (RuntimeError, OSError) as e:
+        api.close()
+        console.print(f"[bold red]启动后台服务失败: {str(e)}[/bold red]")
+        return 1
+    console.print(f"[bold green]后台服务正在监听: {format_address(address)}[/bold green]")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    console.print("后台服务已退出")
+    return 0
+
+
+def _start_daemon(args, argv):
+    """在新的会话中以run运行后台服务，等待其开始监听，输出写入数据目录下的daemon.log"""
+    import subprocess
+    import time
+    from hyperweibo.api.daemon_client import DaemonClient, format_address
+    from hyperweibo.utils.store import get_data_dir
+
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hyperweibo.py")
+    log_path = os.path.join(get_data_dir(args.data_dir), "daemon.log")
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen([sys.executable, script, "daemon", "run"] + argv, stdin=subprocess.DEVNULL,
+                                   stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        client = DaemonClient.connect(args.data_dir)
+        if client is not None:
+            client.close()
+            console.print(f"[bold green]后台服务已启动 (pid {process.pid}): {format_address(client.address)}[/bold green]")
+            return 0
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+    console.print(f"[bold red]后台服务启动失败，详见 {log_path}[/bold red]")
+    return 1
+
+
+# 子命令名称 -> 入口函数
+COMMANDS = {
+    "export": export_main,
+    "search": search_main,
+    "daemon": daemon_main,
+}
@@ -26,32 +26,58 @@
 """
 
 import argparse
+import queue
 import sys
+import threading
 import time
 import os
 import json
-from rich.console import Console
-from rich.prompt import Prompt, Confirm
+from collections import OrderedDict
+from rich.console import Console, Group
 from rich import print
-from rich.table import Table
-from rich.panel import Panel
 from rich.text import Text
-import datetime
 
 # 尝试使用相对导入
 try:
-    from api.weibo_api import WeiboAPI
-    from utils.formatter import WeiboFormatter
+    from api.models import TimelineResult
+    from api.groups import GroupRegistry
+    from api.sync import status_id
+    from api.prefetch import PagePrefetcher
+    from api.merged_feed import MergedFeed
+    from api.poller import AdaptivePoller
+    from api.daemon_client import DaemonClient, RemotePoller, format_address
+    from utils.formatter import WeiboFormatter, DEFAULT_LABELS
+    from utils import startup
+    from utils.startup import setup_logging
+    from utils.seen import SeenIndex
 except ImportError:
     # 如果相对导入失败，尝试使用绝对导入
     try:
-        from hyperweibo.api.weibo_api import WeiboAPI
-        from hyperweibo.utils.formatter import WeiboFormatter
+        from hyperweibo.api.models import TimelineResult
+        from hyperweibo.api.groups import GroupRegistry
+        from hyperweibo.api.sync import status_id
+        from hyperweibo.api.prefetch import PagePrefetcher
+        from hyperweibo.api.merged_feed import MergedFeed
+        from hyperweibo.api.poller import AdaptivePoller
+        from hyperweibo.api.daemon_client import DaemonClient, RemotePoller, format_address
+        from hyperweibo.utils.formatter import WeiboFormatter, DEFAULT_LABELS
+        from hyperweibo.utils import startup
+        from hyperweibo.utils.startup import setup_logging
+        from hyperweibo.utils.seen import SeenIndex
     except ImportError:
         # 如果绝对导入也失败，尝试调整导入路径
         sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        from hyperweibo.api.weibo_api import WeiboAPI
-        from hyperweibo.utils.formatter import WeiboFormatter
+        from hyperweibo.api.models import TimelineResult
+        from hyperweibo.api.groups import GroupRegistry
+        from hyperweibo.api.sync import status_id
+        from hyperweibo.api.prefetch import PagePrefetcher
+        from hyperweibo.api.merged_feed import MergedFeed
+        from hyperweibo.api.poller import AdaptivePoller
+        from hyperweibo.api.daemon_client import DaemonClient, RemotePoller, format_address
+        from hyperweibo.utils.formatter import WeiboFormatter, DEFAULT_LABELS
+        from hyperweibo.utils import startup
+        from hyperweibo.utils.startup import setup_logging
+        from hyperweibo.utils.seen import SeenIndex
 
 console = Console()
 
@@ -65,6 +91,7 @@ TEXT = {
         "weibo": {
             "title": "Weibo Command Line Tool",
             "initializing": "Initializing...",
+            "daemon_connected": "Connected to background service: {}",
             "browser_auth": "If unable to automatically get session info, a browser will open for authentication",
             "group_not_found": "Group ID not found: {}",
             "timeline": "Timeline (Page {})",
@@ -72,16 +99,22 @@ TEXT = {
             "group_timeline": "{} Timeline (Page {})",
             "total_records": "Total {} records",
             "no_records": "No records found",
+            "load_failed": "Failed to load statuses: {}",
+            "groups_failed": "Failed to load groups: {}",
+            "auth_failed": "Login has expired, please log in to Weibo in the browser and restart",
             "operation_menu": "Operation Menu",
             "refresh": "Refresh current page",
             "switch_special": "Switch to special focus",
             "switch_normal": "Switch to normal timeline",
             "select_group": "Select group",
+            "merge_groups": "Merge several groups",
+            "merged_timeline": "Merged Timeline of {} Groups (Page {})",
+            "select_groups_prompt": "Enter group numbers separated by commas, 'a' for all groups (0 to return): ",
             "next_page": "Next page",
             "prev_page": "Previous page",
             "goto_page": "Go to specific page",
             "exit": "Exit",
-            "select_prompt": "Please select [1/2/3/n/p/g/q] (1): ",
+            "select_prompt": "Please select [1/2/3/4/n/p/g/q] (1): ",
             "group_list": "Group List",
             "group_number": "No.",
             "group_id": "Group ID",
@@ -100,11 +133,13 @@ TEXT = {
             "quote_error": "Error processing quoted content",
             "quote_prefix": "Quote from @{}:",
             "retweet_prefix": "Retweet from @{}:",
-            "item_count": "{} items"
+            "item_count": "{} items",
+            "stale_hint": "Showing cached data, refreshing in background"
         },
         "maven": {
             "title": "Java Project Build Tool",
             "initializing": "Initializing build environment...",
+            "daemon_connected": "Connected to build daemon: {}",
             "browser_auth": "If unable to automatically get session info, a browser will open for authentication",
             "group_not_found": "Test group ID not found: {}",
             "timeline": "Standard Test Suite Data (Page {})",
@@ -112,16 +147,22 @@ TEXT = {
             "group_timeline": "{} Test Data (Page {})",
             "total_records": "Total {} records",
             "no_records": "No records found",
+            "load_failed": "Failed to load test data: {}",
+            "groups_failed": "Failed to load test groups: {}",
+            "auth_failed": "Test credentials have expired, please re-authenticate in the browser and restart",
             "operation_menu": "Operation Menu",
             "refresh": "Refresh current page",
             "switch_special": "Switch to special test suite",
             "switch_normal": "Switch to standard test suite",
             "select_group": "Select test group",
+            "merge_groups": "Merge several test groups",
+            "merged_timeline": "Merged Test Data of {} Groups (Page {})",
+            "select_groups_prompt": "Enter test group numbers separated by commas, 'a' for all groups (0 to return): ",
             "next_page": "Next page",
             "prev_page": "Previous page",
             "goto_page": "Go to specific page",
             "exit": "Exit",
-            "select_prompt": "Please select [1/2/3/n/p/g/q] (1): ",
+            "select_prompt": "Please select [1/2/3/4/n/p/g/q] (1): ",
             "group_list": "Test Group List",
             "group_number": "No.",
             "group_id": "Group ID",
@@ -140,13 +181,15 @@ TEXT = {
             "quote_error": "Error processing referenced content",
             "quote_prefix": "Reference from @{}:",
             "retweet_prefix": "Reference from @{}:",
-            "item_count": "{} items"
+            "item_count": "{} items",
+            "stale_hint": "Showing cached results, rebuilding in background"
         }
     },
     "zh": {
         "weibo": {
             "title": "微博命令行工具",
             "initializing": "正在初始化...",
+            "daemon_connected": "已连接后台服务: {}",
             "browser_auth": "如果无法自动获取会话信息，将会打开浏览器进行认证",
             "group_not_found": "未找到指定的分组ID: {}",
             "timeline": "微博关注内容（第{}页）",
@@ -154,16 +197,22 @@ TEXT = {
             "group_timeline": "{}分组内容（第{}页）",
             "total_records": "共 {} 条记录",
             "no_records": "没有找到记录",
+            "load_failed": "获取微博失败: {}",
+            "groups_failed": "获取分组列表失败: {}",
+            "auth_failed": "登录已失效，请在浏览器中重新登录微博后重新启动",
             "operation_menu": "操作菜单",
             "refresh": "刷新当前页",
             "switch_special": "切换到特别关注",
             "switch_normal": "切换到普通关注",
             "select_group": "选择分组",
+            "merge_groups": "合并多个分组",
+            "merged_timeline": "{}个分组合并内容（第{}页）",
+            "select_groups_prompt": "请输入分组序号，用逗号分隔，输入a选择全部分组（输入0返回）: ",
             "next_page": "下一页",
             "prev_page": "上一页",
             "goto_page": "跳转到指定页",
             "exit": "退出",
-            "select_prompt": "请选择 [1/2/3/n/p/g/q] (1): ",
+            "select_prompt": "请选择 [1/2/3/4/n/p/g/q] (1): ",
             "group_list": "分组列表",
             "group_number": "序号",
             "group_id": "分组ID",
@@ -182,11 +231,13 @@ TEXT = {
             "quote_error": "处理引用内容时出错",
             "quote_prefix": "引用@{}:",
             "retweet_prefix": "转发@{}:",
-            "item_count": "{}个"
+            "item_count": "{}个",
+            "stale_hint": "当前为缓存数据，正在后台更新"
         },
         "maven": {
             "title": "Java项目构建工具",
             "initializing": "正在初始化构建环境...",
+            "daemon_connected": "已连接构建守护进程: {}",
             "browser_auth": "如果无法自动获取会话信息，将会打开浏览器进行认证",
             "group_not_found": "未找到指定的测试组ID: {}",
             "timeline": "标准测试套件数据（第{}页）",
@@ -194,16 +245,22 @@ TEXT = {
             "group_timeline": "{}测试数据（第{}页）",
             "total_records": "共 {} 条记录",
             "no_records": "没有找到记录",
+            "load_failed": "加载测试数据失败: {}",
+            "groups_failed": "加载测试组列表失败: {}",
+            "auth_failed": "测试凭据已失效，请在浏览器中重新认证后重新启动",
             "operation_menu": "操作菜单",
             "refresh": "刷新当前页",
             "switch_special": "切换到特殊测试套件",
             "switch_normal": "切换到标准测试套件",
             "select_group": "选择测试组",
+            "merge_groups": "合并多个测试组",
+            "merged_timeline": "{}个测试组合并数据（第{}页）",
+            "select_groups_prompt": "请输入测试组序号，用逗号分隔，输入a选择全部测试组（输入0返回）: ",
             "next_page": "下一页",
             "prev_page": "上一页",
             "goto_page": "跳转到指定页",
             "exit": "退出",
-            "select_prompt": "请选择 [1/2/3/n/p/g/q] (1): ",
+            "select_prompt": "请选择 [1/2/3/4/n/p/g/q] (1): ",
             "group_list": "测试组列表",
             "group_number": "序号",
             "group_id": "组ID",
@@ -222,7 +279,8 @@ TEXT = {
             "quote_error": "处理引用内容时出错",
             "quote_prefix": "引用@{}:",
             "retweet_prefix": "引用@{}:",
-            "item_count": "{}个"
+            "item_count": "{}个",
+            "stale_hint": "当前为缓存结果，正在后台重新构建"
         }
     }
 }
@@ -239,7 +297,11 @@ def parse_args():
     parser.add_argument("-s", "--special", action="store_true",
                         help="查看特别关注内容")
     parser.add_argument("-r", "--refresh", type=int, default=0,
-                        help="自动刷新间隔（秒），0表示不自动刷新")
+                        help="自动刷新的最短间隔（秒），在后台按各时间线的活跃程度轮询，0表示不自动刷新")
+    parser.add_argument("--refresh-max", type=int, default=900,
+                        help="自动刷新时安静的时间线最长的轮询间隔（秒） (默认: 900)")
+    parser.add_argument("--refresh-budget", type=int, default=12,
+                        help="自动刷新时每分钟最多的请求数 (默认: 12)")
     parser.add_argument("-m", "--mock", action="store_true",
                         help="使用模拟数据")
     parser.add_argument("-c", "--cookie", type=str,
@@ -252,6 +314,24 @@ def parse_args():
                         help="设置语言 (en/zh/auto)")
     parser.add_argument("-y", "--style", choices=["weibo", "maven"], default="weibo",
                         help="设置界面风格 (weibo/maven)")
+    parser.add_argument("-d", "--data-dir", type=str,
+                        help="本地数据目录，用于持久化缓存 (默认: ~/.hyperweibo)")
+    parser.add_argument("--no-store", action="store_true",
+                        help="不使用本地持久化缓存")
+    parser.add_argument("--prefetch", type=int, default=1,
+                        help="在后台预取后续页数，0表示不预取 (默认: 1)")
+    parser.add_argument("--prefetch-prev", action="store_true",
+                        help="同时在后台预取上一页")
+    parser.add_argument("--no-swr", action="store_true",
+                        help="缓存过期时等待网络请求，而不是先显示旧数据")
+    parser.add_argument("--no-credential-cache", action="store_true",
+                        help="不缓存浏览器登录凭据，每次启动都从浏览器读取并验证cookie")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="输出启动各阶段耗时和最慢的导入后退出")
+    parser.add_argument("--hide-seen", action="store_true",
+                        help="隐藏之前看过的微博（包括在其他时间线和之前运行时看过的）")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="后台服务（hyperweibo.py daemon）正在运行时也不使用，由本进程获取数据")
     
     args = parser.parse_args()
     
@@ -266,10 +346,65 @@ def parse_args():
 
 def clear_screen():
     """清屏"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    console.clear()
 
-def display_groups(groups):
-    """显示分组列表"""
+def build_timeline_page(title, data, labels, is_special, error=None, auth_failed=False):
+    """
+    组合一页时间线的全部内容
+    
+    Args:
+        title: 页面标题
+        data: 微博列表
+        labels: format_weibo使用的当前语言文案
+        is_special: 当前是否为特别关注
+        error: 获取失败时的错误信息，显示在微博列表的位置
+        auth_failed: 登录凭据是否已失效，失效时在标题下提示用户重新登录
+        
+    Returns:
+        包含标题、微博和操作菜单的renderable，可一次输出
+    """
+    renderables = [
+        console.render_str(f"[bold]{get_text('title')}[/bold]"),
+        Text(),
+        console.render_str(f"[bold]{title}[/bold]"),
+    ]
+    if auth_failed:
+        renderables.append(Text(get_text('auth_failed'), style="bold red"))
+    
+    # 显示数据
+    if data and len(data) > 0:
+        renderables.append(console.render_str(get_text('total_records').format(len(data))))
+        if getattr(data, 'stale', False):
+            renderables.append(console.render_str(f"[dim]({get_text('stale_hint')})[/dim]"))
+        renderables.append(Text())
+        renderables.extend(WeiboFormatter.format_weibo(item, labels, absolute_time=True) for item in data)
+    elif error:
+        renderables.append(Text(get_text('load_failed').format(error), style="bold red"))
+        renderables.append(Text())
+    else:
+        renderables.append(console.render_str(f"[bold yellow]{get_text('no_records')}[/bold yellow]"))
+        renderables.append(Text())
+    
+    # 显示操作菜单
+    renderables.append(console.render_str(f"[bold]{get_text('operation_menu')}[/bold]"))
+    renderables.append(console.render_str(f"1. {get_text('refresh')}"))
+    if is_special:
+        renderables.append(console.render_str(f"2. {get_text('switch_normal')}"))
+    else:
+        renderables.append(console.render_str(f"2. {get_text('switch_special')}"))
+    renderables.append(console.render_str(f"3. {get_text('select_group')}"))
+    renderables.append(console.render_str(f"4. {get_text('merge_groups')}"))
+    renderables.append(console.render_str(f"n. {get_text('next_page')}"))
+    renderables.append(console.render_str(f"p. {get_text('prev_page')}"))
+    renderables.append(console.render_str(f"g. {get_text('goto_page')}"))
+    renderables.append(console.render_str(f"q. {get_text('exit')}"))
+    renderables.append(Text())
+    return Group(*renderables)
+
+def print_group_table(groups):
+    """输出带序号的分组列表"""
+    from rich.table import Table
+    
     table = Table(title=get_text("group_list"))
     table.add_column(get_text("group_number"), style="cyan")
     table.add_column(get_text("group_id"), style="green")
@@ -279,6 +414,18 @@ def display_groups(groups):
         table.add_row(str(i+1), group["gid"], group["name"])
     
     console.print(table)
+
+def load_groups(api):
+    """获取分组列表，失败时显示错误并返回空列表"""
+    try:
+        return api.get_group_registry().groups
+    except Exception as e:
+        console.print(f"[bold red]{get_text('groups_failed').format(str(e))}[/bold red]")
+        return []
+
+def display_groups(groups):
+    """显示分组列表"""
+    print_group_table(groups)
     
     while True:
         try:
@@ -293,6 +440,128 @@ def display_groups(groups):
         except ValueError:
             console.print(f"[bold red]{get_text('invalid_input')}[/bold red]")
 
+def select_groups(groups):
+    """
+    选择要合并的多个分组
+    
+    Returns:
+        选中的分组列表，返回时为None
+    """
+    print_group_table(groups)
+    
+    while True:
+        choice = input(get_text("select_groups_prompt")).strip().lower()
+        if choice == "0":
+            return None
+        if choice == "a":
+            return list(groups)
+        try:
+            numbers = [int(part) for part in choice.replace("，", ",").split(",") if part.strip()]
+        except ValueError:
+            numbers = []
+        if numbers and all(1 <= number <= len(groups) for number in numbers):
+            return [groups[number-1] for number in dict.fromkeys(numbers)]
+        console.print(f"[bold red]{get_text('invalid_input')}[/bold red]")
+
+def hide_seen_statuses(data, seen_index, shown):
+    """
+    隐藏之前看过的微博，并把显示的微博记为已读
+    
+    Args:
+        data: 当前页的微博列表
+        seen_index: SeenIndex
+        shown: 本页上次显示的微博ID，刷新或返回本页时这些微博仍然显示
+        
+    Returns:
+        (要显示的微博列表, 显示的微博ID)
+    """
+    visible = [item for item in data if status_id(item) in shown or status_id(item) not in seen_index]
+    visible_ids = frozenset(status_id(item) for item in visible)
+    seen_index.update(visible_ids)
+    return TimelineResult(visible, getattr(data, 'stale', False)), visible_ids
+
+class LineReader:
+    """在后台线程中读取输入，主线程可以同时等待其他事件（如后台轮询发现新微博）"""
+    
+    def __init__(self, events):
+        """
+        Args:
+            events: 事件队列，读到的输入以("input", 内容)放入，出错时放入("error", 异常)
+        """
+        self.events = events
+        self._pending = False
+    
+    def request(self, prompt):
+        """显示提示并开始读取一行；上一行还没有读完时只重新显示提示"""
+        if self._pending:
+            sys.stdout.write(prompt)
+            sys.stdout.flush()
+            return
+        self._pending = True
+        threading.Thread(target=self._read, args=(prompt,), name="hyperweibo-input", daemon=True).start()
+    
+    def received(self):
+        """主线程取出输入事件后调用"""
+        self._pending = False
+    
+    def _read(self, prompt):
+        try:
+            self.events.put(("input", input(prompt)))
+        except (EOFError, KeyboardInterrupt) as e:
+            self.events.put(("error", e))
+
+def wait_for_choice(reader, events, prompt, watching):
+    """
+    等待用户输入，期间正在显示的时间线有新微博、旧数据已在后台更新或登录凭据失效时返回None以刷新页面
+    
+    Args:
+        reader: LineReader
+        events: reader、轮询器和后台更新共用的事件队列
+        prompt: 输入提示
+        watching: 判断事件是否与正在显示的页面有关的函数，参数为(事件类型, 时间线标识)
+        
+    Returns:
+        用户输入，需要刷新页面时返回None
+    """
+    reader.request(prompt)
+    while True:
+        kind, value = events.get()
+        if kind in ("update", "revalidated", "auth_failed"):
+            if watching(kind, value):
+                return None
+            continue
+        reader.received()
+        if kind == "error":
+            raise value
+        return value
+
+def discard_updates(events):
+    """丢弃已经过时的新微博通知，保留尚未处理的输入和后台更新通知"""
+    pending = []
+    while True:
+        try:
+            event = events.get_nowait()
+        except queue.Empty:
+            break
+        if event[0] != "update":
+            pending.append(event)
+    for event in pending:
+        events.put(event)
+
+def close_merged_feed(merged_feed):
+    """关闭合并时间线，返回None以便清除当前状态"""
+    if merged_feed:
+        merged_feed.close()
+    return None
+
+def load_weibo_api():
+    """按需导入WeiboAPI：它会导入requests等较重的模块，连接后台服务时不需要"""
+    try:
+        from api.weibo_api import WeiboAPI
+    except ImportError:
+        from hyperweibo.api.weibo_api import WeiboAPI
+    return WeiboAPI
+
 def show_license_agreement():
     """显示许可协议并要求用户同意"""
     console = Console()
@@ -338,15 +607,60 @@ def main():
     # show_license_agreement()
     
     args = parse_args()
+    setup_logging()
+    api = None
+    seen_index = None
+    poller = None
     
     try:
+        # 后台服务正在运行时从它获取数据，共用其会话、缓存和轮询；模拟数据或指定cookie时不使用
+        client = None
+        if not (args.mock or args.cookie or args.no_daemon):
+            client = DaemonClient.connect(args.data_dir)
+        
         # 初始化API
         console.print(f"[bold cyan]{get_text('initializing')}[/bold cyan]")
-        console.print(f"[bold yellow]{get_text('browser_auth')}[/bold yellow]")
-        api = WeiboAPI(browser=args.browser, use_mock=args.mock, cookie_str=args.cookie)
+        if client is not None:
+            console.print(f"[bold cyan]{get_text('daemon_connected').format(format_address(client.address))}[/bold cyan]")
+            api = client
+        else:
+            console.print(f"[bold yellow]{get_text('browser_auth')}[/bold yellow]")
+            WeiboAPI = load_weibo_api()
+            api = WeiboAPI(browser=args.browser, use_mock=args.mock, cookie_str=args.cookie,
+                           data_dir=args.data_dir, use_store=not args.no_store,
+                           stale_while_revalidate=not args.no_swr,
+                           use_credential_cache=not args.no_credential_cache)
+        startup.mark("api_ready")
+        
+        # 后台预取相邻页面，翻页时直接使用缓存
+        prefetcher = PagePrefetcher(api, depth=args.prefetch, backward=args.prefetch_prev)
         
-        # 获取分组列表
-        groups = api.get_groups()
+        # 自动刷新：后台按各时间线的活跃程度轮询第1页，用户输入在单独的线程中读取，
+        # 正在显示的第1页有新微博时重新显示，不需要等待用户按键
+        events = queue.Queue()
+        reader = LineReader(events)
+        # 显示的是过期的缓存数据时，后台更新完成后重新显示当前页
+        api.on_revalidated = lambda key: events.put(("revalidated", key))
+        # 缓存的登录凭据在后台验证失败、浏览器中的cookie也无效时重新显示当前页，提示用户重新登录
+        api.on_auth_failed = lambda: events.put(("auth_failed", None))
+        if args.refresh > 0 and not api.use_mock:
+            on_update = lambda key, count: events.put(("update", key))
+            if client is not None:
+                # 轮询间隔和预算以后台服务的设置为准
+                poller = RemotePoller(client, on_update=on_update)
+            else:
+                poller = AdaptivePoller(api, min_interval=args.refresh, max_interval=args.refresh_max,
+                                        budget=args.refresh_budget, on_update=on_update)
+        
+        # 获取分组列表及其索引，失败时先使用空索引，之后选择分组时重新获取
+        try:
+            group_registry = api.get_group_registry()
+        except Exception as e:
+            if args.group:
+                console.print(f"[bold red]{get_text('groups_failed').format(str(e))}[/bold red]")
+                return 1
+            group_registry = GroupRegistry([])
+        startup.mark("groups_loaded")
         
         # 当前页码
         current_page = args.page
@@ -355,10 +669,7 @@ def main():
         current_group = None
         if args.group:
             # 如果指定了分组ID，查找对应的分组
-            for group in groups:
-                if group["gid"] == args.group:
-                    current_group = group
-                    break
+            current_group = group_registry.by_gid(args.group)
             if not current_group:
                 console.print(f"[bold red]{get_text('group_not_found').format(args.group)}[/bold red]")
                 return 1
@@ -366,177 +677,144 @@ def main():
         # 是否显示特别关注
         is_special = args.special
         
+        # 多个分组的合并时间线，见菜单4
+        merged_feed = None
+        
+        # 隐藏看过的微博时，所有时间线共用一个已读索引；shown_pages记录每页显示过的微博
+        seen_index = SeenIndex(args.data_dir, persist=not args.no_store) if args.hide_seen else None
+        shown_pages = OrderedDict()
+        
+        # format_weibo使用的当前语言文案
+        labels = {key: get_text(key) for key in DEFAULT_LABELS}
+        
         while True:
-            clear_screen()
-            
-            # 显示标题
-            if current_group:
+            # 页面标题
+            if merged_feed:
+                title = get_text("merged_timeline").format(len(merged_feed.gids), current_page)
+            elif current_group:
                 title = get_text("group_timeline").format(current_group["name"], current_page)
             elif is_special:
                 title = get_text("special_timeline").format(current_page)
             else:
                 title = get_text("timeline").format(current_page)
             
-            console.print(f"[bold]{get_text('title')}[/bold]")
-            console.print()
-            console.print(f"[bold]{title}[/bold]")
-            
             # 获取数据
-            console.print(f"[italic]{get_text('loading')}[/italic]")
             if is_special:
-                console.print(f"[bold]{get_text('special_timeline').format(current_page)}[/bold]")
-                console.print(f"[dim]{get_text('loading')}[/dim]")
-                data = api.get_special_focus(page=current_page)
-                title = get_text('special_timeline').format(current_page)
+                mode, mode_gid = "special", None
             elif current_group:
-                group_name = current_group["name"]
-                console.print(f"[bold]{get_text('group_timeline').format(group_name, current_page)}[/bold]")
-                console.print(f"[dim]{get_text('loading')}[/dim]")
-                data = api.get_group_timeline(current_group["gid"], page=current_page)
-                title = get_text('group_timeline').format(group_name, current_page)
+                mode, mode_gid = "group", current_group["gid"]
             else:
-                console.print(f"[bold]{get_text('timeline').format(current_page)}[/bold]")
-                console.print(f"[dim]{get_text('loading')}[/dim]")
-                data = api.get_home_timeline(page=current_page)
-                title = get_text('timeline').format(current_page)
+                mode, mode_gid = "home", None
+            # 当前页不能很快获取（没有缓存）时才在上一页下方显示加载提示，
+            # 缓存命中时每页只有下面的一次清屏和一次写入
+            loading_hint = threading.Timer(0.2, console.print, (f"[italic]{get_text('loading')}[/italic]",))
+            loading_hint.daemon = True
+            loading_hint.start()
+            # 如果当前页正在后台预取，等待其完成后直接从缓存读取
+            prefetcher.wait(mode, current_page, mode_gid)
+            # 请求失败且没有缓存的旧数据时显示错误，按1可以重试
+            error = None
+            try:
+                if merged_feed:
+                    data = merged_feed.page(current_page)
+                elif is_special:
+                    data = api.get_special_focus(page=current_page)
+                elif current_group:
+                    data = api.get_group_timeline(current_group["gid"], page=current_page)
+                else:
+                    data = api.get_home_timeline(page=current_page)
+            except Exception as e:
+                data, error = [], str(e)
+            finally:
+                loading_hint.cancel()
             
-            # 显示数据
-            if data and len(data) > 0:
-                console.print(f"{get_text('total_records').format(len(data))}")
-                console.print()
-                
-                for item in data:
-                    try:
-                        # 显示用户名和发布时间
-                        user_info = item.get('user', {})
-                        if isinstance(user_info, dict):
-                            user = user_info.get('screen_name', '未知用户')
-                        else:
-                            user = str(user_info)
-                        
-                        # 处理时间
-                        time_str = item.get('time', '')
-                        if not time_str:
-                            time_str = item.get('created_at', '未知时间')
-                            # 尝试解析标准微博时间格式
-                            if time_str and not time_str == '未知时间':
-                                try:
-                                    dt = datetime.datetime.strptime(time_str, "%a %b %d %H:%M:%S +0800 %Y")
-                                    time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-                                except:
-                                    pass
-                        
-                        console.print(f"✓ [bold]{user}[/bold] {time_str}:")
-                        
-                        # 显示微博内容
-                        try:
-                            console.print()
-                            # 使用clean_text处理微博内容
-                            from hyperweibo.utils.formatter import WeiboFormatter
-                            text = WeiboFormatter.clean_text(item.get('text', ''))
-                            console.print(text)
-                            
-                            # 处理引用内容
-                            try:
-                                quote = item.get('quote', None)
-                                retweeted = item.get('retweeted_status', None)
-                                
-                                if quote:
-                                    quote_user = quote.get('user', '未知用户')
-                                    quote_content = WeiboFormatter.clean_text(quote.get('content', '无内容'))
-                                    console.print(f"{get_text('quote_prefix').format(quote_user)}")
-                                    console.print(quote_content)
-                                elif retweeted:
-                                    retweeted_user_info = retweeted.get('user', {})
-                                    if isinstance(retweeted_user_info, dict):
-                                        retweeted_user = retweeted_user_info.get('screen_name', '未知用户')
-                                    else:
-                                        retweeted_user = str(retweeted_user_info)
-                                    retweeted_content = WeiboFormatter.clean_text(retweeted.get('text', '无内容'))
-                                    console.print(f"{get_text('retweet_prefix').format(retweeted_user)}")
-                                    console.print(retweeted_content)
-                            except Exception as e:
-                                console.print(f"[bold yellow]{get_text('quote_error')}: {str(e)}[/bold yellow]")
-                        except Exception as e:
-                            console.print(f"[bold yellow]{get_text('attachment_error') if 'attachment_error' in TEXT[LANGUAGE][STYLE] else '处理附件时出错'}: {str(e)}[/bold yellow]")
-                        
-                        # 显示附件
-                        try:
-                            attachments = item.get("attachments", {})
-                            pics = item.get("pics", [])
-                            page_info = item.get("page_info", {})
-                            
-                            if attachments or pics or page_info:
-                                console.print()
-                                if attachments:
-                                    if attachments.get("type") == "image":
-                                        count = attachments.get('count', 0)
-                                        console.print(f"[{get_text('attachments')}: {get_text('item_count').format(count)}]")
-                                    elif attachments.get("type") == "video":
-                                        console.print(f"[{get_text('media')}]")
-                                elif pics and len(pics) > 0:
-                                    console.print(f"[{get_text('attachments')}: {get_text('item_count').format(len(pics))}]")
-                                elif page_info and page_info.get("media_info"):
-                                    console.print(f"[{get_text('media')}]")
-                        except Exception as e:
-                            console.print(f"[bold yellow]{get_text('attachment_error') if 'attachment_error' in TEXT[LANGUAGE][STYLE] else '处理附件时出错'}: {str(e)}[/bold yellow]")
-                        
-                        # 显示统计信息
-                        try:
-                            console.print()
-                            quotes = item.get('quotes', 0) or item.get('reposts_count', 0)
-                            comments = item.get('comments', 0) or item.get('comments_count', 0)
-                            likes = item.get('likes', 0) or item.get('attitudes_count', 0)
-                            # 使用一致的格式显示统计信息
-                            stats_text = f"{get_text('quotes')}: {quotes} | {get_text('comments')}: {comments} | {get_text('likes')}: {likes}"
-                            console.print(stats_text)
-                        except Exception as e:
-                            console.print(f"[bold yellow]{get_text('stats_error') if 'stats_error' in TEXT[LANGUAGE][STYLE] else '处理统计信息时出错'}: {str(e)}[/bold yellow]")
-                        
-                        # 分隔线
-                        console.print("─" * 80)
-                        console.print()
-                    except Exception as e:
-                        console.print(f"[bold red]显示微博时出错: {str(e)}[/bold red]")
-                        console.print(f"[bold yellow]微博数据: {item}[/bold yellow]")
-                        console.print("─" * 80)
-                        console.print()
-            else:
-                console.print(f"[bold yellow]{get_text('no_records')}[/bold yellow]")
-                console.print()
+            startup.mark("page_loaded")
+            page_data = data
             
-            # 显示操作菜单
-            console.print(f"[bold]{get_text('operation_menu')}[/bold]")
-            console.print(f"1. {get_text('refresh')}")
-            if is_special:
-                console.print(f"2. {get_text('switch_normal')}")
-            else:
-                console.print(f"2. {get_text('switch_special')}")
-            console.print(f"3. {get_text('select_group')}")
-            console.print(f"n. {get_text('next_page')}")
-            console.print(f"p. {get_text('prev_page')}")
-            console.print(f"g. {get_text('goto_page')}")
-            console.print(f"q. {get_text('exit')}")
-            console.print()
+            # 旧数据所在的页面，后台更新完成后重新显示；特别关注由其分组更新
+            stale_keys = set()
+            if getattr(page_data, 'stale', False) and not merged_feed:
+                stale_keys.add((mode, mode_gid, current_page))
+                if is_special:
+                    stale_keys.add(("group", group_registry.special_focus_gid, current_page))
+            
+            if seen_index is not None:
+                view_key = (id(merged_feed) if merged_feed else mode, mode_gid, current_page)
+                data, shown = hide_seen_statuses(data, seen_index, shown_pages.pop(view_key, frozenset()))
+                shown_pages[view_key] = shown
+                if len(shown_pages) > 100:
+                    shown_pages.popitem(last=False)
+            
+            # 在用户阅读当前页时预取相邻页面，合并时间线按需获取各分组的页面
+            if not merged_feed:
+                prefetcher.schedule(mode, current_page, mode_gid)
+            
+            # 轮询当前显示的时间线，第1页的微博作为判断新微博的基准
+            if poller is not None:
+                if merged_feed:
+                    feed_keys = [("group", gid) for gid in merged_feed.gids]
+                else:
+                    feed_keys = [(mode, mode_gid)]
+                poller.retain(feed_keys)
+                for feed, gid in feed_keys:
+                    poller.watch(feed, gid, statuses=page_data if current_page == 1 and not merged_feed else None)
+                discard_updates(events)
+            
+            # 整页组合后清屏并一次写入终端，避免逐行输出造成闪烁
+            page_view = build_timeline_page(title, data, labels, is_special, error,
+                                            auth_failed=getattr(api, 'auth_failed', False))
+            with console:
+                clear_screen()
+                console.print(page_view)
+            
+            # 启动报告模式到此结束，见hyperweibo.py --startup-report
+            startup.mark("first_prompt")
+            if startup.report_enabled():
+                prefetcher.shutdown()
+                return 0
             
             # 获取用户输入
-            choice = input(get_text("select_prompt"))
+            def watching(kind, key):
+                if kind == "auth_failed":
+                    return True
+                if kind == "revalidated":
+                    return key in stale_keys
+                return poller is not None and current_page == 1 and poller.is_watching(key)
+            
+            choice = wait_for_choice(reader, events, get_text("select_prompt"), watching)
+            if choice is None:
+                # 后台轮询发现新微博、旧数据已在后台更新或登录凭据失效，重新显示当前页
+                continue
             
             if choice == "1":
                 # 刷新当前页
                 continue
             elif choice == "2":
                 # 切换特别关注/普通关注
+                prefetcher.cancel()
                 is_special = not is_special
                 current_page = 1
                 current_group = None
+                merged_feed = close_merged_feed(merged_feed)
             elif choice == "3":
                 # 选择分组
-                selected_group = display_groups(groups)
+                selected_group = display_groups(load_groups(api))
                 if selected_group:
+                    prefetcher.cancel()
                     current_group = selected_group
                     current_page = 1
                     is_special = False
+                    merged_feed = close_merged_feed(merged_feed)
+            elif choice == "4":
+                # 合并多个分组
+                selected_groups = select_groups(load_groups(api))
+                if selected_groups:
+                    prefetcher.cancel()
+                    close_merged_feed(merged_feed)
+                    merged_feed = MergedFeed(api, [group["gid"] for group in selected_groups])
+                    current_group = None
+                    current_page = 1
+                    is_special = False
             elif choice.lower() == "n":
                 # 下一页
                 current_page += 1
@@ -555,14 +833,12 @@ def main():
                     time.sleep(1)
             elif choice.lower() == "q":
                 # 退出
+                prefetcher.shutdown()
+                close_merged_feed(merged_feed)
                 break
             else:
                 console.print(f"[bold red]{get_text('invalid_input')}[/bold red]")
                 time.sleep(1)
-            
-            # 自动刷新
-            if args.refresh > 0:
-                time.sleep(args.refresh)
         
         return 0
     except KeyboardInterrupt:
@@ -571,6 +847,14 @@ def main():
     except Exception as e:
         console.print(f"[bold red]发生错误: {str(e)}[/bold red]")
         return 1
+    finally:
+        # 退出或中断时停止轮询、保存已读索引，并写完全文索引
+        if poller is not None:
+            poller.shutdown()
+        if seen_index is not None:
+            seen_index.save()
+        if api is not None:
+            api.close()
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+内存缓存组件
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from hyperweibo.api.models import to_jsonable
+
+# 各缓存类型的默认上限：最大条目数和近似字节数
+DEFAULT_CACHE_LIMITS = {
+    'groups': {'max_entries': 1, 'max_bytes': 1 * 1024 * 1024},
+    'user_info': {'max_entries': 1, 'max_bytes': 256 * 1024},
+    'home_timeline': {'max_entries': 50, 'max_bytes': 16 * 1024 * 1024},
+    'special_focus': {'max_entries': 50, 'max_bytes': 16 * 1024 * 1024},
+    'group_timeline': {'max_entries': 200, 'max_bytes': 32 * 1024 * 1024},
+    'html_parse': {'max_entries': 50, 'max_bytes': 16 * 1024 * 1024},
+}
+
+
+def estimate_size(data: Any, sample: int = 8) -> int:
+    """
+    估算缓存数据占用的字节数，以JSON序列化长度近似
+
+    Args:
+        data: 缓存数据
+        sample: 列表超过这个长度时，只序列化前sample个元素，按平均大小乘以元素数估算
+
+    Returns:
+        估算的字节数，无法序列化时为0
+    """
+    try:
+        if isinstance(data, list) and len(data) > sample:
+            return len(json.dumps(data[:sample], ensure_ascii=False, default=to_jsonable).encode('utf-8')) \
+                * len(data) // sample
+        return len(json.dumps(data, ensure_ascii=False, default=to_jsonable).encode('utf-8'))
+    except (TypeError, ValueError):
+        return 0
+
+
+class CacheNamespace:
+    """单个缓存类型的LRU+TTL缓存，超出条目数或字节预算时淘汰最久未使用的条目"""
+
+    def __init__(self, name: str, max_entries: int = 100, max_bytes: int = 16 * 1024 * 1024):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (data, expires_at, size, stale_until)，按访问顺序排列，末尾为最近使用
+        # expires_at之后条目不再新鲜，但在stale_until之前仍可作为旧数据返回
+        self._entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, now: Optional[float] = None):
+        """获取未过期的缓存数据，超过保留期限的条目在访问时惰性删除"""
+        entry = self.get_entry(key, now)
+        if entry is None or not entry[1]:
+            return None
+        return entry[0]
+
+    def get_entry(self, key, now: Optional[float] = None, allow_stale: bool = False):
+        """
+        获取缓存条目
+
+        Args:
+            key: 缓存键
+            now: 当前时间，默认为time.time()
+            allow_stale: 是否返回已过期但仍在保留期限内的旧数据
+
+        Returns:
+            (数据, 是否新鲜) 元组，没有可用数据时返回None
+        """
+        now = now or time.time()
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry[3] <= now:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        fresh = entry[1] > now
+        if not fresh and not allow_stale:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if fresh:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry[0], fresh
+
+    def set(self, key, data, expires_at: float, stale_until: Optional[float] = None, size: Optional[int] = None):
+        """写入缓存数据，并按LRU顺序淘汰超出限制的条目；size为数据的字节数，为None时估算"""
+        if key in self._entries:
+            self._remove(key)
+
+        if size is None:
+            size = estimate_size(data)
+        self._entries[key] = (data, expires_at, size, max(expires_at, stale_until or 0))
+        self.total_bytes += size
+
+        # 至少保留刚写入的条目
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key):
+        """删除指定条目"""
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        """清空所有条目"""
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """删除所有超过保留期限的条目，返回删除数量"""
+        now = now or time.time()
+        expired = [key for key, entry in self._entries.items() if entry[3] <= now]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        """获取统计信息"""
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale_hits': self.stale_hits,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+    def _remove(self, key):
+        size = self._entries.pop(key)[2]
+        self.total_bytes -= size
+
+
+class CacheManager:
+    """按缓存类型划分的内存缓存，带有容量上限、LRU淘汰和定期过期清理"""
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, int]]] = None, sweep_interval: float = 60):
+        """
+        初始化缓存
+
+        Args:
+            limits: 各缓存类型的上限，格式: {cache_type: {'max_entries': n, 'max_bytes': n}}
+            sweep_interval: 定期清理过期条目的间隔（秒）
+        """
+        limits = limits or DEFAULT_CACHE_LIMITS
+        self._namespaces = {name: CacheNamespace(name, **limit) for name, limit in limits.items()}
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.time()
+        self._lock = threading.RLock()
+
+    def namespace(self, cache_type: str) -> CacheNamespace:
+        """获取缓存类型对应的命名空间，不存在时使用默认上限创建"""
+        ns = self._namespaces.get(cache_type)
+        if ns is None:
+            ns = self._namespaces[cache_type] = CacheNamespace(cache_type)
+        return ns
+
+    def get(self, cache_type: str, key=None):
+        """获取缓存数据，没有key的缓存类型传None"""
+        with self._lock:
+            now = time.time()
+            self._maybe_sweep(now)
+            return self.namespace(cache_type).get(key, now)
+
+    def get_entry(self, cache_type: str, key=None, allow_stale: bool = False):
+        """获取缓存条目，返回(数据, 是否新鲜)或None，参见CacheNamespace.get_entry"""
+        with self._lock:
+            now = time.time()
+            self._maybe_sweep(now)
+            return self.namespace(cache_type).get_entry(key, now, allow_stale)
+
+    def set(self, cache_type: str, data, expires_at: float, key=None, stale_until: Optional[float] = None,
+            size: Optional[int] = None):
+        """
+        写入缓存数据
+
+        Args:
+            cache_type: 缓存类型
+            data: 缓存数据
+            expires_at: 过期时间
+            key: 缓存键
+            stale_until: 过期后仍可作为旧数据返回的截止时间
+            size: 数据的字节数（如已序列化的长度），为None时估算；估算在加锁之前完成
+        """
+        if size is None:
+            size = estimate_size(data)
+        with self._lock:
+            self._maybe_sweep(time.time())
+            self.namespace(cache_type).set(key, data, expires_at, stale_until, size)
+
+    def delete(self, cache_type: Optional[str] = None, key=None):
+        """删除缓存，cache_type为None时清空全部，key为None时清空该类型"""
+        with self._lock:
+            if cache_type is None:
+                for ns in self._namespaces.values():
+                    ns.clear()
+            elif key is None:
+                self.namespace(cache_type).clear()
+            else:
+                self.namespace(cache_type).delete(key)
+
+    def sweep(self) -> int:
+        """立即清理所有过期条目"""
+        with self._lock:
+            now = time.time()
+            self._last_sweep = now
+            return sum(ns.sweep(now) for ns in self._namespaces.values())
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """获取各缓存类型的统计信息"""
+        with self._lock:
+            return {name: ns.stats() for name, ns in self._namespaces.items()}
+
+    def _maybe_sweep(self, now: float):
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            for ns in self._namespaces.values():
+                ns.sweep(now)
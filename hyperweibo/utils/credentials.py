@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+浏览器登录凭据缓存
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from hyperweibo.utils.store import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+
+def _chromium_candidates(vendor_paths: Dict[str, str]) -> List[str]:
+    """Chromium系浏览器默认配置下Cookies数据库的可能位置，新版本位于Network子目录"""
+    if sys.platform == "darwin":
+        base = os.path.expanduser(os.path.join("~/Library/Application Support", vendor_paths["darwin"]))
+    elif os.name == "nt":
+        base = os.path.join(os.environ.get("LOCALAPPDATA", ""), vendor_paths["nt"], "User Data")
+    else:
+        base = os.path.expanduser(os.path.join("~/.config", vendor_paths["linux"]))
+    return [os.path.join(base, "Default", "Network", "Cookies"), os.path.join(base, "Default", "Cookies")]
+
+
+def _firefox_candidates() -> List[str]:
+    """Firefox各配置目录下的cookies.sqlite，最近修改的排在最前"""
+    if sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support/Firefox/Profiles")
+    elif os.name == "nt":
+        base = os.path.join(os.environ.get("APPDATA", ""), "Mozilla", "Firefox", "Profiles")
+    else:
+        base = os.path.expanduser("~/.mozilla/firefox")
+    paths = glob.glob(os.path.join(base, "*", "cookies.sqlite"))
+    return sorted(paths, key=lambda path: os.path.getmtime(path), reverse=True)
+
+
+def find_cookie_db(browser: str) -> Optional[Tuple[str, str]]:
+    """
+    查找浏览器的cookie数据库
+    
+    Args:
+        browser: 浏览器类型，支持"chrome"、"firefox"、"edge"、"safari"
+        
+    Returns:
+        (配置名称, 数据库路径)，找不到时返回None
+    """
+    browser = browser.lower()
+    if browser == "chrome":
+        candidates = _chromium_candidates({"darwin": "Google/Chrome", "nt": "Google\\Chrome", "linux": "google-chrome"})
+    elif browser == "edge":
+        candidates = _chromium_candidates({"darwin": "Microsoft Edge", "nt": "Microsoft\\Edge", "linux": "microsoft-edge"})
+    elif browser == "firefox":
+        candidates = _firefox_candidates()
+    elif browser == "safari":
+        candidates = [
+            os.path.expanduser("~/Library/Containers/com.apple.Safari/Data/Library/Cookies/Cookies.binarycookies"),
+            os.path.expanduser("~/Library/Cookies/Cookies.binarycookies"),
+        ]
+    else:
+        return None
+    
+    for path in candidates:
+        if os.path.isfile(path):
+            # Chromium的配置名称是Default等目录名，Firefox是配置目录名
+            profile_dir = os.path.dirname(path)
+            if os.path.basename(profile_dir) == "Network":
+                profile_dir = os.path.dirname(profile_dir)
+            return os.path.basename(profile_dir), path
+    return None
+
+
+def cookie_expiry(cookies: List[Dict[str, Any]], max_age: float, now: Optional[float] = None) -> float:
+    """
+    计算登录凭据的过期时间，优先使用微博的ALF cookie（登录失效时间戳）
+    
+    Args:
+        cookies: cookie列表，每项包含name和value
+        max_age: 没有ALF时的最长有效期（秒）
+        now: 当前时间，默认为time.time()
+        
+    Returns:
+        过期时间戳
+    """
+    now = now or time.time()
+    for cookie in cookies:
+        if cookie.get("name") == "ALF":
+            # ALF的值形如"1735689600"，部分版本带有"02_"前缀
+            value = str(cookie.get("value", "")).rsplit("_", 1)[-1]
+            if value.isdigit():
+                return min(float(value), now + max_age)
+    return now + max_age
+
+
+class CredentialCache:
+    """
+    已验证的浏览器cookie缓存，保存在数据目录的credentials.json中（权限0600）
+    
+    缓存按浏览器、配置名称和cookie数据库的修改时间区分：浏览器中的cookie发生变化后
+    修改时间随之改变，缓存即失效，下次启动时重新从浏览器读取。
+    """
+    
+    FILE_NAME = "credentials.json"
+    
+    def __init__(self, data_dir: Optional[str] = None, max_age: float = 7 * 86400):
+        """
+        初始化凭据缓存
+        
+        Args:
+            data_dir: 数据目录，默认见get_data_dir
+            max_age: 没有ALF cookie时缓存的最长有效期（秒）
+        """
+        self.path = os.path.join(get_data_dir(data_dir), self.FILE_NAME)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+    
+    def load(self, browser: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        读取浏览器对应的cookie
+        
+        Args:
+            browser: 浏览器类型
+            
+        Returns:
+            cookie列表，每项包含name、value、domain和path；缓存不存在、已过期或浏览器cookie已变化时返回None
+        """
+        entry = self._read().get(browser.lower())
+        if not entry:
+            return None
+        
+        db = find_cookie_db(browser)
+        if db is None:
+            return None
+        profile, path = db
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        
+        if entry.get("profile") != profile or entry.get("db_path") != path or entry.get("db_mtime") != mtime:
+            logger.info(f"{browser}浏览器的cookie已变化，凭据缓存失效")
+            return None
+        if entry.get("expires_at", 0) <= time.time():
+            logger.info(f"{browser}浏览器的登录凭据已过期")
+            return None
+        return entry.get("cookies") or None
+    
+    def save(self, browser: str, cookies: List[Dict[str, Any]]):
+        """保存已验证的cookie，找不到浏览器cookie数据库时不保存"""
+        db = find_cookie_db(browser)
+        if db is None:
+            return
+        profile, path = db
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return
+        
+        with self._lock:
+            entries = self._read()
+            entries[browser.lower()] = {
+                "profile": profile,
+                "db_path": path,
+                "db_mtime": mtime,
+                "cookies": cookies,
+                "expires_at": cookie_expiry(cookies, self.max_age),
+                "verified_at": time.time(),
+            }
+            self._write(entries)
+        logger.info(f"已缓存{browser}浏览器的登录凭据")
+    
+    def invalidate(self, browser: str):
+        """删除浏览器对应的缓存"""
+        with self._lock:
+            entries = self._read()
+            if entries.pop(browser.lower(), None) is not None:
+                self._write(entries)
+    
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"凭据缓存文件损坏，已忽略: {str(e)}")
+            return {}
+    
+    def _write(self, entries: Dict[str, Any]):
+        # 先写入临时文件再替换，文件创建时即为仅当前用户可读写
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -25,174 +25,347 @@
        任何法律或道德责任。
 """
 
-from rich.console import Console
-from rich.panel import Panel
+from rich.console import Console, Group
 from rich.text import Text
-from rich.table import Table
-from rich import box
-from datetime import datetime
+from rich.markup import escape
+from rich.styled import Styled
 import re
-from typing import Dict, Any, List
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from hyperweibo.utils.timeparse import format_absolute, parse_created_at, relative_time
 
 console = Console()
 
+# format_weibo默认使用的文案，键名与main.py中TEXT的键名一致
+DEFAULT_LABELS = {
+    'retweet_prefix': '转发@{}:',
+    'quote_prefix': '引用@{}:',
+    'attachments': '附件',
+    'item_count': '{}个',
+    'media': '多媒体',
+    'quotes': '转发',
+    'comments': '评论',
+    'likes': '点赞',
+}
+
+# clean_text中HTML片段的处理规则，按优先级排列: (名称, 正则, 替换)
+_HTML_RULES = [
+    # 处理带有alt属性的表情符号
+    ('emoji_alt', r'<span class="url-icon"><img alt=\[(?P<emoji_alt_text>[^\]]*)\][^>]*?/></span>', r'[\1]'),
+    ('emoji_quoted', r'<span class="url-icon"><img alt="?\[?(?P<emoji_quoted_text>[^\]"]*)\]?"?[^>]*?/></span>', r'[\1]'),
+    # 处理没有alt属性的表情符号
+    ('emoji', r'<span class="url-icon"><img[^>]*></span>', r'[表情]'),
+    # 处理@用户链接
+    ('mention', r'<a href=\'\/n\/(?P<mention_uid>[^\']+)\'>@(?P<mention_name>[^<]+)</a>', r'@\2'),
+    # 处理话题标签
+    ('topic', r'<a[^>]*?><span class="surl-text">#(?P<topic_text>[^#]+)#</span></a>', r'#\1#'),
+    # 处理普通链接
+    ('link', r'<a[^>]*?href="(?P<link_href>[^"]+)"[^>]*?><span class="surl-text">(?P<link_text>[^<]+)</span></a>', r'\2'),
+    ('icon_link', r'<a[^>]*?href="(?P<icon_link_href>[^"]+)"[^>]*?><span class=\'url-icon\'><img[^>]*?></span><span class="surl-text">(?P<icon_link_text>[^<]+)</span></a>', r'\2'),
+    # 处理视频链接
+    ('video', r'<a[^>]*?href="[^"]*?video[^"]*?"[^>]*?>.*?</a>', r'[视频链接]'),
+    # 处理全文链接
+    ('full_text', r'<a href="\/status\/\d+">全文</a>', r'[全文]'),
+    # 处理换行
+    ('line_break', r'<br\s*/?>', '\n'),
+    # 去除其他HTML标签
+    ('tag', r'<[^>]+>', ''),
+]
+
+# 所有规则合并为一个正则，一次扫描完成替换；同一位置按上面的顺序尝试
+# 各规则都以'<'开头，提到分支外面让正则引擎可以直接跳到下一个'<'
+_HTML_TOKEN_PATTERN = re.compile('<(?:' + '|'.join(f'(?P<{name}>{pattern[1:]})' for name, pattern, _ in _HTML_RULES) + ')')
+_HTML_SEQUENTIAL_PATTERNS = [(re.compile(pattern), replacement) for _, pattern, replacement in _HTML_RULES]
+# 规则名称 -> 规则本身包含的'<'个数（不计分组名和字符类中的'<'）；匹配中的'<'比它多时，
+# 匹配范围内还有其他标签（如未闭合的视频链接后面跟着@用户链接），逐条替换时前面的规则
+# 会先处理这些标签，一次扫描的结果可能不同
+_RULE_TAG_COUNTS = {
+    name: pattern.count('<') - pattern.count('(?P<') - pattern.count('[^<')
+    for name, pattern, _ in _HTML_RULES
+}
+_MALFORMED_TAG_PATTERN = re.compile(r'<[^>]*<')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_URL_ESCAPE_PATTERN = re.compile(r'%[0-9A-Fa-f]{2}')
+
+
+# 规则名称 -> 捕获替换文本的分组名称，其余规则使用固定的替换文本
+_TEXT_GROUPS = {
+    'emoji_alt': 'emoji_alt_text',
+    'emoji_quoted': 'emoji_quoted_text',
+    'mention': 'mention_name',
+    'topic': 'topic_text',
+    'link': 'link_text',
+    'icon_link': 'icon_link_text',
+}
+# 外层分组序号 -> (规则名称, 捕获文本的分组序号, 固定替换文本)
+_HTML_TOKEN_ACTIONS = {
+    _HTML_TOKEN_PATTERN.groupindex[name]: (
+        name,
+        _HTML_TOKEN_PATTERN.groupindex[_TEXT_GROUPS[name]] if name in _TEXT_GROUPS else None,
+        replacement,
+    )
+    for name, _, replacement in _HTML_RULES
+}
+
+
+class _SequentialFallback(Exception):
+    """替换结果中仍含有标签，需要改为逐条替换"""
+
+
+def _replace_html_token(match) -> str:
+    """合并正则的替换回调，按匹配到的规则生成替换文本"""
+    name, text_group, replacement = _HTML_TOKEN_ACTIONS[match.lastindex]
+    token = match.group()
+    if token.count('<') > _RULE_TAG_COUNTS[name]:
+        raise _SequentialFallback()
+    # 引号没有配对的链接标签只能由tag规则匹配；逐条替换时引号内的值会越过'>'，
+    # 在前面的规则改写后面的标签之后可能让链接规则匹配得更长
+    if name == 'tag' and token.startswith('<a') and (token.count('"') % 2 or token.count("'") % 2):
+        raise _SequentialFallback()
+    if text_group is None:
+        return replacement
+    
+    captured = match.group(text_group)
+    if name == 'mention':
+        return '@' + captured
+    if name == 'link' or name == 'icon_link':
+        return captured
+    
+    if name == 'topic':
+        return f"#{captured}#"
+    # alt值没有以]或"结束时正则发生了回溯，逐条替换时前面的替换可能让它匹配得更长
+    if name == 'emoji_quoted':
+        end = match.end(text_group)
+        if match.string[end:end + 1] not in (']', '"'):
+            raise _SequentialFallback()
+    return f"[{captured}]"
+
+
+def _replace_html_sequential(text: str) -> str:
+    """逐条规则依次替换，用于一次扫描无法保证结果一致的输入"""
+    for pattern, replacement in _HTML_SEQUENTIAL_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
 class WeiboFormatter:
     """数据格式化工具，用于在终端中美观地显示测试数据"""
     
+    # 渲染缓存: 微博ID -> (内容指纹, 时间之前的部分, 时间之后的部分)，按LRU淘汰
+    _render_cache = OrderedDict()
+    render_cache_size = 2000
+    
     @staticmethod
-    def format_time(created_at: str) -> str:
-        """格式化时间戳"""
-        try:
-            # 微博时间格式可能有多种，这里尝试处理常见的格式
-            dt = datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y")
-            now = datetime.now()
-            delta = now - dt.replace(tzinfo=None)
+    def format_time(created_at: str, created_ts: Optional[int] = None) -> str:
+        """
+        格式化为相对时间
+        
+        Args:
+            created_at: 微博的原始时间字符串
+            created_ts: 获取时已解析的时间戳，为None时从created_at解析
             
-            if delta.days > 365:
-                return f"{delta.days // 365}年前"
-            elif delta.days > 30:
-                return f"{delta.days // 30}个月前"
-            elif delta.days > 0:
-                return f"{delta.days}天前"
-            elif delta.seconds > 3600:
-                return f"{delta.seconds // 3600}小时前"
-            elif delta.seconds > 60:
-                return f"{delta.seconds // 60}分钟前"
-            else:
-                return "刚刚"
-        except Exception:
-            # 如果解析失败，直接返回原始时间
+        Returns:
+            相对时间文本，解析失败时返回原始时间
+        """
+        if created_ts is None:
+            created_ts = parse_created_at(created_at)
+        if created_ts is None:
             return created_at
+        return relative_time(created_ts)
     
     @staticmethod
     def clean_text(text: str) -> str:
         """清理文本内容，去除HTML标签等"""
         if not text:
             return ""
-            
-        # 处理表情符号
-        # 处理带有alt属性的表情符号
-        text = re.sub(r'<span class="url-icon"><img alt=\[([^\]]*)\][^>]*?/></span>', r'[\1]', text)
-        text = re.sub(r'<span class="url-icon"><img alt="?\[?([^\]"]*)\]?"?[^>]*?/></span>', r'[\1]', text)
-        
-        # 处理没有alt属性的表情符号
-        text = re.sub(r'<span class="url-icon"><img[^>]*></span>', r'[表情]', text)
-        
-        # 处理@用户链接
-        text = re.sub(r'<a href=\'\/n\/([^\']+)\'>@([^<]+)</a>', r'@\2', text)
-        
-        # 处理话题标签
-        text = re.sub(r'<a[^>]*?><span class="surl-text">#([^#]+)#</span></a>', r'#\1#', text)
-        
-        # 处理普通链接
-        text = re.sub(r'<a[^>]*?href="([^"]+)"[^>]*?><span class="surl-text">([^<]+)</span></a>', r'\2', text)
-        text = re.sub(r'<a[^>]*?href="([^"]+)"[^>]*?><span class=\'url-icon\'><img[^>]*?></span><span class="surl-text">([^<]+)</span></a>', r'\2', text)
         
-        # 处理视频链接
-        text = re.sub(r'<a[^>]*?href="[^"]*?video[^"]*?"[^>]*?>.*?</a>', r'[视频链接]', text)
-        
-        # 处理全文链接
-        text = re.sub(r'<a href="\/status\/\d+">全文</a>', r'[全文]', text)
-        
-        # 处理换行
-        text = re.sub(r'<br\s*/?>', '\n', text)
-        
-        # 去除其他HTML标签
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        # 替换表情符号的占位符，确保格式一致
-        text = re.sub(r'\[([^\]]+)\]', r'[\1]', text)
+        if '<' in text:
+            # 标签中嵌套了未闭合的'<'时，一次扫描的结果可能与逐条替换不同，此时逐条替换
+            # 视频链接的.*?不跨行，文本含换行时同样逐条替换以保证结果一致
+            if _MALFORMED_TAG_PATTERN.search(text) or ('\n' in text and 'video' in text):
+                text = _replace_html_sequential(text)
+            else:
+                try:
+                    text = _HTML_TOKEN_PATTERN.sub(_replace_html_token, text)
+                except _SequentialFallback:
+                    text = _replace_html_sequential(text)
         
         # 清理多余的空白字符
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r' +', ' ', text)
+        text = _WHITESPACE_PATTERN.sub(' ', text)
         
         # 清理URL编码
-        text = re.sub(r'%[0-9A-Fa-f]{2}', '', text)
+        if '%' in text:
+            text = _URL_ESCAPE_PATTERN.sub('', text)
         
         return text.strip()
     
     @staticmethod
-    def format_weibo(weibo: Dict[str, Any]) -> Text:
-        """格式化单条数据为Rich Text"""
-        try:
-            # 提取数据
-            user = weibo.get('user', {})
-            user_name = user.get('screen_name', '未知用户')
-            user_verified = user.get('verified', False)
-            verified_type = user.get('verified_type', -1)
-            
-            # 根据认证类型设置不同的标识
-            verified_mark = ""
-            if user_verified:
-                if verified_type == 0:  # 个人认证
-                    verified_mark = "✓ "
-                elif verified_type in (1, 2, 3, 5):  # 企业认证
-                    verified_mark = "✓ "
-                else:
-                    verified_mark = "✓ "
-            
-            created_at = WeiboFormatter.format_time(weibo.get('created_at', ''))
-            text = WeiboFormatter.clean_text(weibo.get('text', ''))
+    def format_weibo(weibo: Dict[str, Any], labels: Optional[Dict[str, str]] = None,
+                     absolute_time: bool = False) -> Text:
+        """
+        格式化单条数据为Rich Text
+        
+        有ID的微博按内容指纹缓存渲染结果，内容和计数都未变化时只重新计算时间
+        
+        Args:
+            weibo: 微博数据
+            labels: 转发、附件、统计等文案，键名见DEFAULT_LABELS，默认为中文
+            absolute_time: 是否按微博原始时区显示完整时间，默认显示相对时间
             
-            # 处理转发内容
-            retweeted = weibo.get('retweeted_status', None)
-            retweeted_text = ""
-            if retweeted:
-                retweeted_user = retweeted.get('user', {})
-                if isinstance(retweeted_user, dict):
-                    retweeted_user_name = retweeted_user.get('screen_name', '未知用户')
+        Returns:
+            格式化后的Rich Text
+        """
+        try:
+            labels = labels or DEFAULT_LABELS
+            created_at = weibo.get('time')
+            if not created_at:
+                if absolute_time:
+                    created_at = format_absolute(weibo.get('created_at', ''))
                 else:
-                    retweeted_user_name = str(retweeted_user)
-                
-                retweeted_text_content = WeiboFormatter.clean_text(retweeted.get('text', ''))
-                retweeted_text = f"\n\n[bold cyan]转发@{retweeted_user_name}:[/bold cyan]\n{retweeted_text_content}"
-            
-            # 处理图片
-            pics = weibo.get('pics', [])
-            pics_text = ""
-            if pics:
-                pics_text = f"\n\n[italic][附件: {len(pics)}个][/italic]"
-            
-            # 处理视频
-            video_info = weibo.get('page_info', {}).get('media_info', {})
-            video_text = ""
-            if video_info:
-                video_text = "\n\n[italic][多媒体][/italic]"
-            
-            # 处理统计数据
-            comments_count = weibo.get('comments_count', 0)
-            attitudes_count = weibo.get('attitudes_count', 0)
-            reposts_count = weibo.get('reposts_count', 0)
-            stats_text = f"\n\n[dim]转发: {reposts_count} | 评论: {comments_count} | 点赞: {attitudes_count}[/dim]"
+                    created_at = WeiboFormatter.format_time(weibo.get('created_at', ''), weibo.get('created_ts'))
             
-            # 组合完整内容，不使用Panel，直接返回格式化的文本
-            header = f"[bold]{verified_mark}{user_name}[/bold] [dim]{created_at}:[/dim]"
-            content = f"{header}\n{text}{retweeted_text}{pics_text}{video_text}{stats_text}\n"
-            
-            # 使用一个简单的分隔线分隔不同的数据
-            content += "\n" + "─" * 80 + "\n"
+            cache = WeiboFormatter._render_cache
+            status_key = weibo.get('idstr') or weibo.get('id') or weibo.get('mid')
+            fingerprint = WeiboFormatter._fingerprint(weibo, labels)
+            cached = cache.get(status_key) if status_key else None
+            if cached is not None and cached[0] == fingerprint:
+                cache.move_to_end(status_key)
+                head, body = cached[1], cached[2]
+            else:
+                head, body = WeiboFormatter._render_parts(weibo, labels)
+                if status_key:
+                    cache[status_key] = (fingerprint, head, body)
+                    cache.move_to_end(status_key)
+                    while len(cache) > WeiboFormatter.render_cache_size:
+                        cache.popitem(last=False)
             
-            return Text.from_markup(content)
+            result = head.copy()
+            result.append(f"{created_at}:", style="dim")
+            result.append_text(body)
+            return result
         except Exception as e:
             # 如果解析失败，返回错误信息
             error_text = f"[red]解析数据失败: {str(e)}[/red]"
             return Text.from_markup(error_text)
     
+    @staticmethod
+    def clear_render_cache():
+        """清空渲染缓存"""
+        WeiboFormatter._render_cache.clear()
+    
+    @staticmethod
+    def _fingerprint(weibo: Dict[str, Any], labels: Dict[str, str]) -> tuple:
+        """影响渲染结果的字段，任一变化时重新渲染该条微博"""
+        user = weibo.get('user', {})
+        retweeted = weibo.get('retweeted_status') or {}
+        return (
+            weibo.get('text'),
+            weibo.get('reposts_count', 0),
+            weibo.get('comments_count', 0),
+            weibo.get('attitudes_count', 0),
+            weibo.get('quotes'),
+            weibo.get('comments'),
+            weibo.get('likes'),
+            user.get('screen_name'),
+            user.get('verified'),
+            retweeted.get('id'),
+            retweeted.get('text'),
+            len(weibo.get('pics') or ()),
+            bool(weibo.get('page_info', {}).get('media_info')),
+            weibo.get('quote'),
+            weibo.get('attachments'),
+            labels,
+        )
+    
+    @staticmethod
+    def _render_parts(weibo: Dict[str, Any], labels: Dict[str, str]) -> Tuple[Text, Text]:
+        """渲染除时间以外的部分，返回(时间之前的部分, 时间之后的部分)"""
+        # 提取数据
+        user = weibo.get('user', {})
+        user_name = user.get('screen_name', '未知用户')
+        user_verified = user.get('verified', False)
+        verified_type = user.get('verified_type', -1)
+        
+        # 根据认证类型设置不同的标识
+        verified_mark = ""
+        if user_verified:
+            if verified_type == 0:  # 个人认证
+                verified_mark = "✓ "
+            elif verified_type in (1, 2, 3, 5):  # 企业认证
+                verified_mark = "✓ "
+            else:
+                verified_mark = "✓ "
+        
+        text = WeiboFormatter.clean_text(weibo.get('text', ''))
+        
+        # 处理引用和转发内容
+        quote = weibo.get('quote', None)
+        retweeted = weibo.get('retweeted_status', None)
+        retweeted_text = ""
+        if quote:
+            quote_user = quote.get('user', '未知用户')
+            quote_content = WeiboFormatter.clean_text(quote.get('content', ''))
+            retweeted_text = f"\n\n[bold cyan]{labels['quote_prefix'].format(quote_user)}[/bold cyan]\n{quote_content}"
+        elif retweeted:
+            retweeted_user = retweeted.get('user', {})
+            if hasattr(retweeted_user, 'get'):
+                retweeted_user_name = retweeted_user.get('screen_name', '未知用户')
+            else:
+                retweeted_user_name = str(retweeted_user)
+            
+            retweeted_text_content = WeiboFormatter.clean_text(retweeted.get('text', ''))
+            retweeted_text = f"\n\n[bold cyan]{labels['retweet_prefix'].format(retweeted_user_name)}[/bold cyan]\n{retweeted_text_content}"
+        
+        # 处理图片，已整理的附件信息优先
+        attachments = weibo.get('attachments') or {}
+        pics = weibo.get('pics', [])
+        pics_count = attachments.get('count', 0) if attachments.get('type') == 'image' else len(pics or ())
+        pics_text = ""
+        if pics_count:
+            pics_label = escape(f"[{labels['attachments']}: {labels['item_count'].format(pics_count)}]")
+            pics_text = f"\n\n[italic]{pics_label}[/italic]"
+        
+        # 处理视频
+        video_info = weibo.get('page_info', {}).get('media_info', {}) or attachments.get('type') == 'video'
+        video_text = ""
+        if video_info:
+            video_text = f"\n\n[italic]{escape('[' + labels['media'] + ']')}[/italic]"
+        
+        # 处理统计数据
+        comments_count = weibo.get('comments') or weibo.get('comments_count', 0)
+        attitudes_count = weibo.get('likes') or weibo.get('attitudes_count', 0)
+        reposts_count = weibo.get('quotes') or weibo.get('reposts_count', 0)
+        stats_text = (f"\n\n[dim]{labels['quotes']}: {reposts_count} | {labels['comments']}: {comments_count} | "
+                      f"{labels['likes']}: {attitudes_count}[/dim]")
+        
+        # 组合完整内容，不使用Panel；时间在两部分之间，每次显示时重新计算
+        head = f"[bold]{verified_mark}{user_name}[/bold] "
+        content = f"\n{text}{retweeted_text}{pics_text}{video_text}{stats_text}\n"
+        
+        # 使用一个简单的分隔线分隔不同的数据
+        content += "\n" + "─" * 80 + "\n"
+        
+        return Text.from_markup(head), Text.from_markup(content)
+    
     @staticmethod
     def display_weibos(weibos: List[Dict[str, Any]], title: str = "测试数据"):
         """显示数据列表"""
-        console.print(f"[bold cyan]{title}[/bold cyan]", style="bold")
-        console.print(f"共 {len(weibos)} 条记录", style="dim")
-        console.print()
-        
-        for weibo in weibos:
-            text = WeiboFormatter.format_weibo(weibo)
-            console.print(text)
+        # 整页组合为一个renderable，一次写入终端
+        renderables = [
+            Styled(console.render_str(f"[bold cyan]{title}[/bold cyan]"), "bold"),
+            Styled(console.render_str(f"共 {len(weibos)} 条记录"), "dim"),
+            Text(),
+        ]
+        renderables.extend(WeiboFormatter.format_weibo(weibo) for weibo in weibos)
+        console.print(Group(*renderables))
     
     @staticmethod
     def display_user_info(user_info: Dict[str, Any]):
         """显示用户信息"""
+        from rich.panel import Panel
+        from rich.table import Table
+        from rich import box
+        
         if not user_info:
             console.print("[bold red]获取用户信息失败[/bold red]")
             return
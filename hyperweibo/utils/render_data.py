@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+从页面HTML中快速提取$render_data
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import json
+from typing import Any, Optional
+
+RENDER_DATA_MARKER = "$render_data"
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def extract_render_data(html: str) -> Optional[Any]:
+    """
+    在原始HTML文本中定位 $render_data = [...] 赋值并解析其中的JSON数组
+
+    只做线性扫描，不构建DOM：找到标记后跳过空白和等号，从数组起始位置用
+    JSONDecoder.raw_decode解析一个完整的JSON值，数组在哪里闭合由解析器按括号和
+    字符串规则确定，不依赖非贪婪正则。
+
+    Args:
+        html: 页面HTML文本
+
+    Returns:
+        解析得到的数组，找不到或解析失败时返回None
+    """
+    if not html:
+        return None
+
+    start = html.find(RENDER_DATA_MARKER)
+    while start != -1:
+        pos = _skip_whitespace(html, start + len(RENDER_DATA_MARKER))
+        if pos < len(html) and html[pos] == "=":
+            pos = _skip_whitespace(html, pos + 1)
+            if pos < len(html) and html[pos] == "[":
+                try:
+                    value, _ = _decoder.raw_decode(html, pos)
+                    return value
+                except json.JSONDecodeError:
+                    pass
+        start = html.find(RENDER_DATA_MARKER, start + len(RENDER_DATA_MARKER))
+
+    return None
+
+
+def extract_statuses(html: str) -> Optional[list]:
+    """
+    提取$render_data中的微博列表
+
+    Returns:
+        微博列表，页面中没有可用的$render_data时返回None
+    """
+    data = extract_render_data(html)
+    if not data or not isinstance(data, list) or not isinstance(data[0], dict):
+        return None
+    if "status" not in data[0]:
+        return None
+    return data[0]["status"]
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
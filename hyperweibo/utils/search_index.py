@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地微博全文检索
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from hyperweibo.api.models import to_jsonable
+from hyperweibo.utils.store import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+# 中日韩文字没有空格分词，索引和查询时每个字作为一个词，查询词转换为相邻字的短语
+_CJK_RE = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+')
+_HASHTAG_RE = re.compile(r'#([^#\s][^#]{0,60}?)#')
+# 查询中的词：带引号的短语或不含空白的连续字符
+_QUERY_TERM_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def segment(text: str) -> str:
+    """在每个中日韩文字两侧加空格，使FTS5的unicode61分词器把它们切分为单字"""
+    # 按连续的一段文字替换，比逐字替换少得多的回调
+    return _CJK_RE.sub(lambda match: ' ' + ' '.join(match.group()) + ' ', text or '')
+
+
+def extract_hashtags(text: str) -> List[str]:
+    """提取#话题#中的话题名"""
+    return list(dict.fromkeys(tag.strip() for tag in _HASHTAG_RE.findall(text or '') if tag.strip()))
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    把用户输入转换为FTS5查询：每个词都必须出现，中文词按相邻的字匹配
+
+    Args:
+        query: 空格分隔的关键词，可用双引号包含带空格的短语，以#开头的词只匹配话题
+
+    Returns:
+        FTS5 MATCH表达式，没有关键词时返回None
+    """
+    clauses = []
+    for phrase, word in _QUERY_TERM_RE.findall(query or ''):
+        term = phrase or word
+        column = None
+        if term.startswith('#'):
+            column = 'tags'
+            term = term.strip('#')
+        tokens = segment(term).replace('"', ' ').split()
+        if not tokens:
+            continue
+        clause = '"' + ' '.join(tokens) + '"'
+        clauses.append(f"{column} : {clause}" if column else clause)
+    return ' AND '.join(clauses) or None
+
+
+class SearchIndex:
+    """
+    基于SQLite FTS5的微博全文索引，保存清理后的正文（含转发的原文）、作者、话题和发布时间
+
+    写入通过后台线程批量进行，不阻塞获取时间线；同一条微博只索引一次。
+    """
+
+    DB_NAME = "search.db"
+    # BM25相关度，话题和作者的权重高于正文，值越小越相关
+    RANK = "bm25(statuses_fts, 1.0, 2.0, 3.0)"
+
+    def __init__(self, data_dir: Optional[str] = None, background: bool = True):
+        """
+        打开或创建索引
+
+        Args:
+            data_dir: 数据目录，默认见get_data_dir
+            background: 是否在后台线程写入，为False时submit立即写入
+        """
+        self.data_dir = get_data_dir(data_dir)
+        self.path = os.path.join(self.data_dir, self.DB_NAME)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS statuses (
+                id INTEGER PRIMARY KEY,
+                created_ts INTEGER,
+                author TEXT COLLATE NOCASE,
+                data TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS statuses_created_ts ON statuses(created_ts);
+            CREATE INDEX IF NOT EXISTS statuses_author ON statuses(author, created_ts);
+            CREATE VIRTUAL TABLE IF NOT EXISTS statuses_fts USING fts5(
+                text, author, tags, content='', tokenize='unicode61 remove_diacritics 2'
+            );
+            """
+        )
+        self._queue = None
+        self._worker = None
+        if background:
+            self._queue = queue.Queue(maxsize=256)
+            self._worker = threading.Thread(target=self._run, name="hyperweibo-search-index", daemon=True)
+            self._worker.start()
+
+    def submit(self, statuses: Iterable[Any]):
+        """提交要索引的微博，后台模式下立即返回；队列已满时丢弃，下次出现时再索引"""
+        statuses = list(statuses)
+        if not statuses:
+            return
+        if self._queue is None:
+            self.add(statuses)
+            return
+        try:
+            self._queue.put_nowait(statuses)
+        except queue.Full:
+            logger.warning("全文索引队列已满，本批微博暂不索引")
+
+    def add(self, statuses: Iterable[Any]) -> int:
+        """
+        在一个事务中索引微博，已索引的微博跳过
+
+        Returns:
+            新索引的微博数
+        """
+        from hyperweibo.utils.formatter import WeiboFormatter
+
+        rows = []
+        for status in statuses:
+            try:
+                sid = int(status.get('id') or status.get('mid') or 0)
+            except (TypeError, ValueError):
+                continue
+            if not sid:
+                continue
+            text = status.get('text') or ''
+            retweeted = status.get('retweeted_status')
+            if retweeted:
+                text = f"{text} {retweeted.get('text') or ''}"
+            user = status.get('user') or {}
+            author = user.get('screen_name') if hasattr(user, 'get') else str(user)
+            rows.append((sid, status, text, author or ''))
+
+        if not rows:
+            return 0
+
+        added = 0
+        now = time.time()
+        with self._lock:
+            existing = self._existing_ids([row[0] for row in rows])
+            self._conn.execute("BEGIN")
+            try:
+                for sid, status, text, author in rows:
+                    if sid in existing:
+                        continue
+                    existing.add(sid)
+                    data = json.dumps(status, ensure_ascii=False, default=to_jsonable)
+                    self._conn.execute(
+                        "INSERT INTO statuses (id, created_ts, author, data, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                        (sid, status.get('created_ts'), author, data, now),
+                    )
+                    self._conn.execute(
+                        "INSERT INTO statuses_fts (rowid, text, author, tags) VALUES (?, ?, ?, ?)",
+                        (sid, segment(WeiboFormatter.clean_text(text)), segment(author),
+                         segment(' '.join(extract_hashtags(text)))),
+                    )
+                    added += 1
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def search(self, query: str = "", author: Optional[str] = None, since: Optional[float] = None,
+               until: Optional[float] = None, limit: int = 20, sort: str = "rank") -> List[Dict[str, Any]]:
+        """
+        检索本地索引，不访问网络
+
+        Args:
+            query: 关键词，见build_match_query；为空时只按其他条件筛选
+            author: 作者昵称（不区分大小写）
+            since: 只返回此时间戳之后发布的微博
+            until: 只返回此时间戳之前发布的微博
+            limit: 最多返回的条数
+            sort: "rank"按相关度（BM25，话题和作者的权重高于正文），"time"按发布时间从新到旧
+
+        Returns:
+            微博dict列表，没有关键词时按发布时间排序
+        """
+        match = build_match_query(query)
+        conditions = []
+        params = []
+        if match:
+            conditions.append("statuses_fts MATCH ?")
+            params.append(match)
+        if author:
+            conditions.append("s.author = ?")
+            params.append(author)
+        if since is not None:
+            conditions.append("s.created_ts >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("s.created_ts < ?")
+            params.append(until)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        if match and sort == "rank" and len(conditions) == 1:
+            # 只有关键词时先在FTS表内排序取前limit条，再读取这些微博
+            sql = (f"SELECT s.data FROM (SELECT rowid, {self.RANK} AS score FROM statuses_fts {where} "
+                   f"ORDER BY score LIMIT ?) f JOIN statuses s ON s.id = f.rowid ORDER BY f.score")
+        elif match:
+            # 微博ID随发布时间递增，按rowid倒序可以沿FTS索引读取并在取够limit条后停止
+            order = self.RANK if sort == "rank" else "statuses_fts.rowid DESC"
+            sql = (f"SELECT s.data FROM statuses_fts JOIN statuses s ON s.id = statuses_fts.rowid "
+                   f"{where} ORDER BY {order} LIMIT ?")
+        else:
+            sql = f"SELECT s.data FROM statuses s {where} ORDER BY s.created_ts DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self) -> int:
+        """已索引的微博数"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM statuses").fetchone()[0]
+
+    def flush(self, timeout: Optional[float] = None):
+        """等待后台队列中的微博全部写入"""
+        if self._queue is None:
+            return
+        deadline = None if timeout is None else time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.time() >= deadline:
+                break
+            time.sleep(0.01)
+
+    def close(self):
+        """写完队列中的微博后关闭数据库"""
+        if self._queue is not None:
+            self.flush(timeout=5)
+            self._queue.put(None)
+            self._worker.join(timeout=5)
+        with self._lock:
+            self._conn.close()
+
+    def _existing_ids(self, ids: List[int]) -> set:
+        placeholders = ','.join('?' * len(ids))
+        rows = self._conn.execute(f"SELECT id FROM statuses WHERE id IN ({placeholders})", ids).fetchall()
+        return {row[0] for row in rows}
+
+    def _run(self):
+        while True:
+            statuses = self._queue.get()
+            try:
+                if statuses is None:
+                    return
+                self.add(statuses)
+            except Exception as e:
+                logger.warning(f"写入全文索引失败: {str(e)}")
+            finally:
+                self._queue.task_done()
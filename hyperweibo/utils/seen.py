@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+已读微博索引
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import logging
+import math
+import os
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from hyperweibo.utils.store import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"HWSEEN1\0"
+# 文件头：魔数、位数、哈希函数个数、两代过滤器各自的条目数、最近ID数
+_HEADER = struct.Struct("<8sQIQQQ")
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(x: int) -> int:
+    """splitmix64的混合函数，把微博ID打散为均匀的64位哈希"""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def _to_id(sid) -> Optional[int]:
+    """把微博ID转为整数，接口返回的ID可能是字符串；空值、布尔值和不是64位正整数的ID返回None"""
+    if isinstance(sid, bool):
+        return None
+    try:
+        sid = int(sid)
+    except (TypeError, ValueError):
+        return None
+    return sid if 0 < sid <= _MASK64 else None
+
+
+class BloomFilter:
+    """固定大小的布隆过滤器，使用双重哈希生成k个位置"""
+
+    __slots__ = ('bits', 'k', 'bitarray', 'count')
+
+    def __init__(self, bits: int, k: int, data: Optional[bytes] = None, count: int = 0):
+        self.bits = bits
+        self.k = k
+        self.bitarray = bytearray(data) if data is not None else bytearray((bits + 7) // 8)
+        self.count = count
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        """按容量和误判率计算位数和哈希函数个数"""
+        bits = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        k = max(1, round(bits / capacity * math.log(2)))
+        return cls(bits, k)
+
+    def _positions(self, key: int):
+        h1 = _mix64(key)
+        h2 = _mix64(h1) | 1
+        bits = self.bits
+        return [(h1 + i * h2) % bits for i in range(self.k)]
+
+    def add(self, key: int) -> bool:
+        """写入key，返回写入前是否已（可能）存在"""
+        bitarray = self.bitarray
+        present = True
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not bitarray[position >> 3] & mask:
+                present = False
+                bitarray[position >> 3] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key: int) -> bool:
+        bitarray = self.bitarray
+        return all(bitarray[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SeenIndex:
+    """
+    所有时间线共用的已读微博ID索引
+
+    最近的ID保存在精确的集合中；更早的ID记录在两代布隆过滤器中，当前一代达到容量时
+    丢弃上一代并新建一代，因此内存固定，查询和写入都是O(1)。布隆过滤器可能误判
+    （把没看过的微博当作看过），但不会漏判。索引保存在数据目录的seen_<name>.idx中。
+    微博ID可以是整数或数字字符串，统一按整数记录；无法转换的ID不记录，也视为没看过。
+    """
+
+    def __init__(self, data_dir: Optional[str] = None, name: str = "timeline", capacity: int = 1000000,
+                 error_rate: float = 0.001, recent_size: int = 20000, persist: bool = True):
+        """
+        初始化索引
+
+        Args:
+            data_dir: 数据目录，默认见get_data_dir
+            name: 索引名称，不同用途（如显示和导出）使用不同的索引，文件名为seen_<name>.idx
+            capacity: 每一代布隆过滤器的容量
+            error_rate: 达到容量时的误判率
+            recent_size: 精确集合保存的最近ID数
+            persist: 是否从文件加载并在save时写回
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.recent_size = recent_size
+        self.path = os.path.join(get_data_dir(data_dir), f"seen_{name}.idx") if persist else None
+        self._lock = threading.Lock()
+        self._recent = OrderedDict()
+        self._current = BloomFilter.for_capacity(capacity, error_rate)
+        self._previous = None
+        self._dirty = False
+        if self.path:
+            self._load()
+
+    def __contains__(self, sid) -> bool:
+        sid = _to_id(sid)
+        if sid is None:
+            return False
+        with self._lock:
+            if sid in self._recent:
+                return True
+            return sid in self._current or (self._previous is not None and sid in self._previous)
+
+    def add(self, sid) -> bool:
+        """
+        记录微博ID
+
+        Args:
+            sid: 微博ID，整数或数字字符串
+
+        Returns:
+            该ID之前是否已记录，无法转换为整数的ID返回False且不记录
+        """
+        sid = _to_id(sid)
+        if sid is None:
+            return False
+        with self._lock:
+            if sid in self._recent:
+                self._recent.move_to_end(sid)
+                return True
+            self._recent[sid] = None
+            if len(self._recent) > self.recent_size:
+                self._recent.popitem(last=False)
+            self._dirty = True
+            # 上一代中已有的ID也写入当前一代，以免上一代被丢弃时遗忘仍在出现的微博
+            in_previous = self._previous is not None and sid in self._previous
+            if self._current.count >= self.capacity:
+                self._previous = self._current
+                self._current = BloomFilter(self._previous.bits, self._previous.k)
+            return self._current.add(sid) or in_previous
+
+    def update(self, sids: Iterable):
+        """批量记录微博ID，ID的要求同add"""
+        for sid in sids:
+            self.add(sid)
+
+    def __len__(self):
+        """记录过的ID数（近似，不含已丢弃的一代）"""
+        with self._lock:
+            return self._current.count + (self._previous.count if self._previous is not None else 0)
+
+    def save(self):
+        """有变化时原子地写入文件"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            previous = self._previous or BloomFilter(self._current.bits, self._current.k)
+            recent = array("Q", self._recent)
+            header = _HEADER.pack(_MAGIC, self._current.bits, self._current.k,
+                                  self._current.count, self._previous.count if self._previous else 0, len(recent))
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(header)
+                    f.write(self._current.bitarray)
+                    f.write(previous.bitarray)
+                    f.write(recent.tobytes())
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                logger.warning(f"保存已读索引失败: {str(e)}")
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"读取已读索引失败: {str(e)}")
+            return
+
+        try:
+            magic, bits, k, current_count, previous_count, recent_count = _HEADER.unpack_from(data)
+            if magic != _MAGIC:
+                raise ValueError("文件格式不正确")
+            size = (bits + 7) // 8
+            offset = _HEADER.size
+            current = data[offset:offset + size]
+            previous = data[offset + size:offset + 2 * size]
+            recent = array("Q")
+            recent.frombytes(data[offset + 2 * size:offset + 2 * size + recent_count * 8])
+            if len(current) != size or len(previous) != size or len(recent) != recent_count:
+                raise ValueError("文件不完整")
+        except (struct.error, ValueError) as e:
+            logger.warning(f"已读索引已损坏，将重新建立: {str(e)}")
+            return
+
+        # 容量或误判率改变后旧文件的位数不同，仍按文件中的参数使用
+        self._current = BloomFilter(bits, k, current, current_count)
+        self._previous = BloomFilter(bits, k, previous, previous_count) if previous_count else None
+        self._recent = OrderedDict.fromkeys(recent[-self.recent_size:] if self.recent_size else [])
+        logger.info(f"已加载已读索引: {self.path}，约{len(self)}条")
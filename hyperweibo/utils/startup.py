@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动耗时统计
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import logging
+import os
+import sys
+import time
+from typing import List, Tuple
+
+# 设置该环境变量（值为父进程启动子进程时的时间戳）后，记录各阶段耗时并在第一次等待输入前退出
+STARTUP_REPORT_ENV = "HYPERWEIBO_STARTUP_REPORT"
+PHASE_PREFIX = "hyperweibo-startup:"
+
+_origin = os.environ.get(STARTUP_REPORT_ENV)
+
+
+def report_enabled() -> bool:
+    """当前进程是否处于启动报告模式"""
+    return bool(_origin)
+
+
+def mark(phase: str):
+    """记录一个启动阶段，输出从启动进程到此刻的毫秒数；未启用时不做任何事"""
+    if _origin:
+        elapsed = (time.time() - float(_origin)) * 1000
+        sys.stderr.write(f"{PHASE_PREFIX} {phase} {elapsed:.1f}\n")
+        sys.stderr.flush()
+
+
+def setup_logging():
+    """配置日志，同时输出到logs/weibo_api.log和控制台；由命令行入口调用，导入本模块时不做任何配置"""
+    log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = os.path.join(log_dir, 'weibo_api.log')
+    
+    # 配置文件和控制台双重输出
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
+
+def parse_report(stderr: str) -> Tuple[List[Tuple[str, float]], List[Tuple[int, int, str]]]:
+    """
+    解析启动报告模式下子进程的标准错误输出
+    
+    Args:
+        stderr: 子进程的标准错误输出，可包含-X importtime的输出
+        
+    Returns:
+        (阶段列表[(阶段, 毫秒)], 导入列表[(累计微秒, 自身微秒, 模块名)])
+    """
+    phases = []
+    imports = []
+    for line in stderr.splitlines():
+        if line.startswith(PHASE_PREFIX):
+            parts = line.split()
+            if len(parts) == 3:
+                phases.append((parts[1], float(parts[2])))
+        elif line.startswith("import time:"):
+            fields = line[len("import time:"):].split("|")
+            if len(fields) != 3 or not fields[0].strip().isdigit():
+                continue
+            imports.append((int(fields[1]), int(fields[0]), fields[2].rstrip()))
+    return phases, imports
+
+
+def run_report(script: str, argv: List[str], top: int = 20) -> int:
+    """
+    以-X importtime在子进程中运行命令行入口，直到第一次等待输入，然后输出各阶段耗时和最慢的导入
+    
+    Args:
+        script: 入口脚本路径
+        argv: 传给入口脚本的参数
+        top: 显示的导入数量
+        
+    Returns:
+        子进程的退出码
+    """
+    import subprocess
+    
+    env = dict(os.environ)
+    env[STARTUP_REPORT_ENV] = repr(time.time())
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", script] + list(argv),
+        env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    phases, imports = parse_report(proc.stderr)
+    
+    print("启动阶段（从启动进程开始计时，含-X importtime的额外开销）:")
+    for phase, elapsed in phases:
+        print(f"  {phase:<16} {elapsed:9.1f} ms")
+    if not phases or phases[-1][0] != "first_prompt":
+        print("  未到达第一次等待输入，请检查参数或登录状态")
+    
+    print(f"\n累计耗时最多的{top}个导入:")
+    for cumulative, self_time, name in sorted(imports, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:9.1f} ms  自身 {self_time / 1000:7.1f} ms  {name.strip()}")
+    return proc.returncode
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地持久化存储
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+from hyperweibo.api.models import to_jsonable
+
+logger = logging.getLogger(__name__)
+
+
+def get_data_dir(data_dir: Optional[str] = None) -> str:
+    """
+    获取数据目录，优先使用参数，其次是环境变量HYPERWEIBO_DATA_DIR，最后是~/.hyperweibo
+
+    Args:
+        data_dir: 指定的数据目录
+
+    Returns:
+        已创建的数据目录绝对路径
+    """
+    if not data_dir:
+        data_dir = os.environ.get("HYPERWEIBO_DATA_DIR") or os.path.join(os.path.expanduser("~"), ".hyperweibo")
+    data_dir = os.path.abspath(os.path.expanduser(data_dir))
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+
+class TimelineStore:
+    """基于SQLite（WAL模式）的缓存持久化存储，按账号、缓存类型和键保存数据"""
+
+    DB_NAME = "cache.db"
+
+    def __init__(self, data_dir: Optional[str] = None, retention: float = 0, purge_interval: float = 3600):
+        """
+        初始化持久化存储
+
+        Args:
+            data_dir: 数据目录，默认见get_data_dir
+            retention: 条目过期后仍保留的秒数，供先显示旧数据或请求失败时使用
+            purge_interval: 写入时定期删除超过保留期限的条目的间隔（秒），打开时也会删除一次
+        """
+        self.data_dir = get_data_dir(data_dir)
+        self.path = os.path.join(self.data_dir, self.DB_NAME)
+        self.retention = retention
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+
+        # isolation_level=None 使用自动提交，单条写入无需显式事务
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                account TEXT NOT NULL,
+                cache_type TEXT NOT NULL,
+                cache_key TEXT NOT NULL,
+                data TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (account, cache_type, cache_key)
+            )
+            """
+        )
+        logger.info(f"已打开本地缓存数据库: {self.path}")
+        self._maybe_purge(time.time())
+
+    def get(self, account: str, cache_type: str, key: Optional[str] = None) -> Optional[Tuple[Any, float]]:
+        """
+        读取缓存条目
+
+        Args:
+            account: 账号标识
+            cache_type: 缓存类型，如home_timeline、group_timeline
+            key: 缓存键，没有key的缓存类型传None
+
+        Returns:
+            (数据, 过期时间) 元组，不存在时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, expires_at FROM cache_entries WHERE account=? AND cache_type=? AND cache_key=?",
+                (account, cache_type, key or ""),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0]), row[1]
+        except json.JSONDecodeError:
+            logger.warning(f"本地缓存数据损坏，已忽略: {cache_type}/{key}")
+            return None
+
+    def set(self, account: str, cache_type: str, data: Any, expires_at: float, key: Optional[str] = None,
+            payload: Optional[str] = None):
+        """写入缓存条目，已存在时覆盖；payload为已用encode序列化的data，为None时在此序列化"""
+        if payload is None:
+            payload = self.encode(data)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (account, cache_type, cache_key, data, expires_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (account, cache_type, key or "", payload, expires_at, now),
+            )
+        self._maybe_purge(now)
+
+    @staticmethod
+    def encode(data: Any) -> str:
+        """把缓存数据序列化为保存到数据库的JSON"""
+        return json.dumps(data, ensure_ascii=False, default=to_jsonable)
+
+    def delete(self, account: str, cache_type: Optional[str] = None, key: Optional[str] = None):
+        """删除缓存条目，cache_type为None时删除该账号的全部条目"""
+        with self._lock:
+            if cache_type is None:
+                self._conn.execute("DELETE FROM cache_entries WHERE account=?", (account,))
+            elif key is None:
+                self._conn.execute("DELETE FROM cache_entries WHERE account=? AND cache_type=?", (account, cache_type))
+            else:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE account=? AND cache_type=? AND cache_key=?",
+                    (account, cache_type, key),
+                )
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """删除所有过期超过retention秒的条目，返回删除数量"""
+        now = now or time.time()
+        with self._lock:
+            self._last_purge = now
+            cursor = self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now - self.retention,))
+        if cursor.rowcount:
+            logger.info(f"已删除{cursor.rowcount}条超过保留期限的本地缓存")
+        return cursor.rowcount
+
+    def _maybe_purge(self, now: float):
+        if now - self._last_purge >= self.purge_interval:
+            try:
+                self.purge_expired(now)
+            except sqlite3.Error as e:
+                logger.warning(f"清理本地缓存失败: {str(e)}")
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
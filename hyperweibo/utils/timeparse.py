@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+微博时间解析
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+import calendar
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+_MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12,
+}
+_WEEKDAYS = frozenset(('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'))
+
+
+@lru_cache(maxsize=4096)
+def _parse(created_at: str) -> Optional[Tuple[int, int]]:
+    """解析"%a %b %d %H:%M:%S %z %Y"格式的时间，返回(时间戳, UTC偏移秒数)，格式不符时返回None"""
+    parts = created_at.split()
+    if len(parts) != 6 or parts[0] not in _WEEKDAYS:
+        return None
+    
+    month = _MONTHS.get(parts[1])
+    clock = parts[3].split(':')
+    offset = parts[4]
+    if month is None or len(clock) != 3 or len(offset) != 5 or offset[0] not in '+-':
+        return None
+    
+    try:
+        day = int(parts[2])
+        hour, minute, second = int(clock[0]), int(clock[1]), int(clock[2])
+        offset_seconds = int(offset[1:3]) * 3600 + int(offset[3:5]) * 60
+        year = int(parts[5])
+    except ValueError:
+        return None
+    
+    if not (1 <= day <= calendar.monthrange(year, month)[1] and hour < 24 and minute < 60 and second < 62):
+        return None
+    if offset[0] == '-':
+        offset_seconds = -offset_seconds
+    
+    # 时间字符串是当地时间，减去偏移得到UTC时间戳
+    timestamp = calendar.timegm((year, month, day, hour, minute, second)) - offset_seconds
+    return timestamp, offset_seconds
+
+
+def parse_created_at(created_at: Any) -> Optional[int]:
+    """
+    将微博的created_at解析为Unix时间戳，相同的字符串只解析一次
+    
+    Args:
+        created_at: 形如"Tue Mar 05 12:34:56 +0800 2024"的时间字符串
+        
+    Returns:
+        Unix时间戳（秒），无法解析时返回None
+    """
+    if not isinstance(created_at, str):
+        return None
+    parsed = _parse(created_at)
+    return parsed[0] if parsed else None
+
+
+def format_absolute(created_at: str, fmt: str = "%Y-%m-%d %H:%M:%S") -> str:
+    """按原始时区格式化微博时间，无法解析时返回原字符串"""
+    parsed = _parse(created_at) if isinstance(created_at, str) else None
+    if parsed is None:
+        return created_at
+    timestamp, offset_seconds = parsed
+    return time.strftime(fmt, time.gmtime(timestamp + offset_seconds))
+
+
+def relative_time(timestamp: int, now: Optional[float] = None) -> str:
+    """
+    将时间戳格式化为相对时间，如"3分钟前"
+    
+    Args:
+        timestamp: Unix时间戳（秒）
+        now: 当前时间戳，默认为time.time()
+        
+    Returns:
+        相对时间文本
+    """
+    delta = int(now if now is not None else time.time()) - int(timestamp)
+    if delta <= 0:
+        return "刚刚"
+    
+    days, seconds = divmod(delta, 86400)
+    if days > 365:
+        return f"{days // 365}年前"
+    elif days > 30:
+        return f"{days // 30}个月前"
+    elif days > 0:
+        return f"{days}天前"
+    elif seconds > 3600:
+        return f"{seconds // 3600}小时前"
+    elif seconds > 60:
+        return f"{seconds // 60}分钟前"
+    else:
+        return "刚刚"
+
+
+def normalize_statuses(statuses: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+    """
+    为微博及其转发的原微博添加created_ts字段（Unix时间戳），原created_at保持不变
+    
+    Args:
+        statuses: 微博列表，原地修改
+        
+    Returns:
+        传入的微博列表
+    """
+    for status in statuses:
+        if not isinstance(status, dict):
+            continue
+        if 'created_ts' not in status:
+            status['created_ts'] = parse_created_at(status.get('created_at'))
+        retweeted = status.get('retweeted_status')
+        if isinstance(retweeted, dict) and 'created_ts' not in retweeted:
+            retweeted['created_ts'] = parse_created_at(retweeted.get('created_at'))
+    return statuses
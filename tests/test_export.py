@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+时间线导出测试
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+
+import gzip
+import json
+
+import pytest
+
+from hyperweibo.api.export import TimelineExporter, parse_cutoff
+
+
+class FakeAPI:
+    """每页3条微博，ID从1000开始递减；fail_pages中的页码请求失败"""
+
+    PAGE_SIZE = 3
+
+    def __init__(self, pages=5):
+        self.pages = pages
+        self.fail_pages = set()
+        self.requested = []
+
+    def fetch_timeline_page(self, feed, page, gid=None):
+        self.requested.append(page)
+        if page in self.fail_pages:
+            raise RuntimeError(f"第{page}页请求失败")
+        if page > self.pages:
+            return []
+        first = 1000 - (page - 1) * self.PAGE_SIZE
+        return [{'id': sid, 'created_ts': sid} for sid in range(first, first - self.PAGE_SIZE, -1)]
+
+
+def read_ids(path, compressed=False):
+    opener = gzip.open if compressed else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line)['id'] for line in f]
+
+
+def all_ids(pages):
+    return list(range(1000, 1000 - pages * FakeAPI.PAGE_SIZE, -1))
+
+
+def test_export_writes_all_pages(tmp_path):
+    output = str(tmp_path / "out.ndjson")
+
+    stats = TimelineExporter(FakeAPI(), output, end_page=5, concurrency=2).run()
+
+    assert read_ids(output) == all_ids(5)
+    assert stats['pages'] == 5 and stats['exported'] == 15
+    assert not (tmp_path / "out.ndjson.checkpoint").exists()
+
+
+@pytest.mark.parametrize("name", ["out.ndjson", "out.ndjson.gz"])
+def test_resume_after_failure(tmp_path, name):
+    output = str(tmp_path / name)
+    api = FakeAPI()
+    api.fail_pages = {4}
+
+    with pytest.raises(RuntimeError):
+        TimelineExporter(api, output, end_page=5, concurrency=2).run()
+    assert (tmp_path / f"{name}.checkpoint").exists()
+
+    api.fail_pages = set()
+    api.requested = []
+    stats = TimelineExporter(api, output, end_page=5, concurrency=2).run()
+
+    assert stats['resumed_from'] == 4
+    assert min(api.requested) == 4
+    assert read_ids(output, compressed=name.endswith('.gz')) == all_ids(5)
+
+
+def test_resume_truncates_partial_write(tmp_path):
+    output = tmp_path / "out.ndjson"
+    api = FakeAPI()
+    api.fail_pages = {3}
+    with pytest.raises(RuntimeError):
+        TimelineExporter(api, str(output), end_page=5, concurrency=1).run()
+
+    # 模拟上次中断时写了一半的行
+    with open(output, 'ab') as f:
+        f.write(b'{"id": 99')
+    api.fail_pages = set()
+    TimelineExporter(api, str(output), end_page=5, concurrency=1).run()
+
+    assert read_ids(str(output)) == all_ids(5)
+
+
+def test_restart_when_output_missing(tmp_path):
+    output = tmp_path / "out.ndjson"
+    api = FakeAPI()
+    api.fail_pages = {3}
+    with pytest.raises(RuntimeError):
+        TimelineExporter(api, str(output), end_page=5).run()
+
+    output.unlink()
+    api.fail_pages = set()
+    stats = TimelineExporter(api, str(output), end_page=5).run()
+
+    assert stats['resumed_from'] is None
+    assert read_ids(str(output)) == all_ids(5)
+
+
+def test_restart_when_parameters_change(tmp_path):
+    output = str(tmp_path / "out.ndjson")
+    api = FakeAPI()
+    api.fail_pages = {3}
+    with pytest.raises(RuntimeError):
+        TimelineExporter(api, output, end_page=5).run()
+
+    api.fail_pages = set()
+    stats = TimelineExporter(api, output, end_page=4).run()
+
+    assert stats['resumed_from'] is None
+    assert read_ids(output) == all_ids(4)
+
+
+def test_duplicates_across_pages_are_skipped(tmp_path):
+    class ShiftingAPI(FakeAPI):
+        # 翻页期间来了新微博，第2页的第一条是第1页的最后一条
+        def fetch_timeline_page(self, feed, page, gid=None):
+            statuses = super().fetch_timeline_page(feed, page, gid)
+            if page == 2:
+                statuses.insert(0, {'id': 998, 'created_ts': 998})
+            return statuses
+
+    output = str(tmp_path / "out.ndjson")
+    stats = TimelineExporter(ShiftingAPI(), output, end_page=3).run()
+
+    assert read_ids(output) == all_ids(3)
+    assert stats['duplicates'] == 1
+
+
+def test_older_than_stops_export(tmp_path):
+    output = str(tmp_path / "out.ndjson")
+    api = FakeAPI(pages=100)
+
+    TimelineExporter(api, output, older_than=994, concurrency=2).run()
+
+    assert read_ids(output) == list(range(1000, 993, -1))
+    assert max(api.requested) <= 5
+
+
+def test_parse_cutoff():
+    assert parse_cutoff("7d", now=1000000) == 1000000 - 7 * 86400
+    assert parse_cutoff("1700000000") == 1700000000
+    assert parse_cutoff("2024-01-31T00:00:00+00:00") == 1706659200
+    with pytest.raises(ValueError):
+        parse_cutoff("yesterday")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多分组合并时间线测试
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+
+import pytest
+
+from hyperweibo.api.merged_feed import MergedFeed
+
+
+class FakeAPI:
+    """每个分组的微博按created_ts从新到旧分页返回"""
+
+    def __init__(self, groups, page_size=3):
+        self.groups = groups
+        self.page_size = page_size
+        self.requests = []
+        self.fail = set()
+
+    def get_group_timeline(self, gid, page):
+        self.requests.append((gid, page))
+        if (gid, page) in self.fail:
+            raise RuntimeError("请求失败")
+        statuses = self.groups[gid]
+        return statuses[(page - 1) * self.page_size:page * self.page_size]
+
+
+def status(sid, ts):
+    return {'id': sid, 'created_ts': ts}
+
+
+def group(*pairs):
+    return [status(sid, ts) for sid, ts in pairs]
+
+
+@pytest.fixture
+def api():
+    return FakeAPI({
+        'a': group((10, 100), (8, 80), (6, 60), (4, 40), (2, 20)),
+        'b': group((9, 90), (7, 70), (5, 50), (3, 30), (1, 10)),
+        'c': group((11, 110), (7, 70), (3, 30)),
+    })
+
+
+def ids(statuses):
+    return [item['id'] for item in statuses]
+
+
+def test_merges_newest_first_without_duplicates(api):
+    feed = MergedFeed(api, ['a', 'b', 'c'], page_size=4)
+    try:
+        pages = [ids(feed.page(number)) for number in range(1, 5)]
+    finally:
+        feed.close()
+
+    assert pages == [[11, 10, 9, 8], [7, 6, 5, 4], [3, 2, 1], []]
+    assert feed.stats['duplicates'] == 2
+
+
+def test_equal_timestamps_order_by_id(api):
+    api.groups = {'a': group((5, 100), (3, 100)), 'b': group((6, 100), (4, 100))}
+    feed = MergedFeed(api, ['a', 'b'], page_size=10)
+    try:
+        assert ids(feed.page(1)) == [6, 5, 4, 3]
+    finally:
+        feed.close()
+
+
+def test_group_pages_are_fetched_lazily(api):
+    feed = MergedFeed(api, ['a', 'b', 'c'], page_size=2)
+    try:
+        feed.page(1)
+    finally:
+        feed.close()
+
+    # 第一屏只需要每个分组的第一页
+    assert sorted(api.requests) == [('a', 1), ('b', 1), ('c', 1)]
+
+
+def test_going_back_replays_the_same_screen(api):
+    feed = MergedFeed(api, ['a', 'b', 'c'], page_size=4)
+    try:
+        first = ids(feed.page(1))
+        second = ids(feed.page(2))
+        assert ids(feed.page(1)) == first
+        assert ids(feed.page(2)) == second
+        assert ids(feed.page(3)) == [3, 2, 1]
+    finally:
+        feed.close()
+
+
+def test_jump_ahead_matches_sequential(api):
+    # 直接跳到后面的屏与顺序翻页结果相同
+    feed = MergedFeed(api, ['a', 'b', 'c'], page_size=4)
+    try:
+        assert ids(feed.page(3)) == [3, 2, 1]
+    finally:
+        feed.close()
+
+
+def test_failed_group_page_is_skipped(api):
+    api.fail.add(('b', 1))
+    feed = MergedFeed(api, ['a', 'b'], page_size=10)
+    try:
+        assert ids(feed.page(1)) == [10, 8, 6, 4, 2]
+    finally:
+        feed.close()
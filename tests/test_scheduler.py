@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+请求调度器测试
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+
+import pytest
+import requests
+
+from hyperweibo.api.scheduler import AIMDLimiter, RequestScheduler, ThrottledError, TokenBucket
+
+URL = "https://weibo.example/ajax/feed/friends"
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, text='{"ok": 1}', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """按顺序返回预设的响应，元素是异常时抛出"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def make_scheduler(session, **kwargs):
+    kwargs.setdefault('backoff_base', 0.001)
+    kwargs.setdefault('backoff_max', 0.01)
+    return RequestScheduler(session, rate=1000, burst=100, **kwargs)
+
+
+def test_throttled_then_success_is_retried():
+    session = FakeSession(FakeResponse(429), FakeResponse(418), FakeResponse(200))
+    scheduler = make_scheduler(session)
+
+    response = scheduler.get(URL)
+
+    assert response.status_code == 200
+    assert session.calls == 3
+    counts = scheduler.stats()['endpoints']['/ajax/feed/friends']
+    assert (counts['requests'], counts['retries'], counts['throttled']) == (3, 2, 2)
+
+
+def test_throttled_after_retries_raises():
+    session = FakeSession(FakeResponse(429))
+    scheduler = make_scheduler(session, max_retries=2)
+
+    with pytest.raises(ThrottledError):
+        scheduler.get(URL)
+    assert session.calls == 3
+
+
+def test_html_body_counts_as_throttled_unless_render_data():
+    session = FakeSession(FakeResponse(200, text="<html>验证</html>"))
+    scheduler = make_scheduler(session, max_retries=0)
+    with pytest.raises(ThrottledError):
+        scheduler.get(URL)
+
+    page = FakeResponse(200, text="<html><script>var $render_data = [{}]</script></html>")
+    assert make_scheduler(FakeSession(page)).get(URL, accept_html=True) is page
+
+
+def test_server_error_returns_last_response():
+    session = FakeSession(FakeResponse(503), FakeResponse(502))
+    scheduler = make_scheduler(session, max_retries=1)
+
+    response = scheduler.get(URL)
+
+    assert response.status_code == 502
+    assert session.calls == 2
+
+
+def test_client_error_is_not_retried():
+    session = FakeSession(FakeResponse(404))
+    scheduler = make_scheduler(session)
+
+    assert scheduler.get(URL).status_code == 404
+    assert session.calls == 1
+
+
+def test_connection_error_is_retried_then_raised():
+    session = FakeSession(requests.exceptions.ConnectionError("断开"), FakeResponse(200))
+    assert make_scheduler(session).get(URL).status_code == 200
+
+    session = FakeSession(requests.exceptions.ConnectionError("断开"))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        make_scheduler(session, max_retries=1).get(URL)
+    assert session.calls == 2
+
+
+def test_throttle_halves_concurrency_and_rate():
+    session = FakeSession(FakeResponse(429), FakeResponse(200))
+    scheduler = make_scheduler(session, initial_concurrency=8)
+
+    scheduler.get(URL)
+
+    bucket = scheduler._buckets['/ajax/feed/friends']
+    # 被限流一次减半，随后的成功只恢复一小部分
+    assert int(scheduler.limiter.limit) == 4
+    assert bucket.rate == pytest.approx(500 + 1000 / 20)
+
+
+def test_aimd_limiter_additive_increase_and_floor():
+    limiter = AIMDLimiter(initial=4, minimum=1, maximum=6)
+
+    # 每次成功加1/limit，约一个窗口的成功后并发上限加1
+    for _ in range(4):
+        limiter.on_success()
+    assert int(limiter.limit) == 4
+    limiter.on_success()
+    assert int(limiter.limit) == 5
+
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.limit == 6
+
+    for _ in range(10):
+        limiter.on_throttle()
+    assert limiter.limit == 1
+
+
+def test_token_bucket_recovers_to_max_rate():
+    bucket = TokenBucket(rate=10, burst=5, min_rate=1)
+
+    bucket.on_throttle()
+    assert bucket.rate == 5
+    for _ in range(10):
+        bucket.on_throttle()
+    assert bucket.rate == 1
+
+    for _ in range(100):
+        bucket.on_success()
+    assert bucket.rate == 10
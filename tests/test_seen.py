@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+已读微博索引测试
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+
+from hyperweibo.utils.seen import SeenIndex
+
+
+def test_add_and_contains_accept_int_and_str_ids(tmp_path):
+    index = SeenIndex(str(tmp_path))
+
+    assert index.add(5000000000000001) is False
+    assert index.add("5000000000000001") is True
+    assert "5000000000000001" in index
+    assert 5000000000000001 in index
+    assert 5000000000000002 not in index
+
+
+def test_invalid_ids_are_not_recorded(tmp_path):
+    index = SeenIndex(str(tmp_path))
+
+    for sid in (None, "", "abc", True, -1, 0, 1 << 64):
+        assert index.add(sid) is False
+        assert sid not in index
+    assert len(index) == 0
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = SeenIndex(str(tmp_path), recent_size=10)
+    index.update(range(1, 101))
+    index.add("4900000000000000")
+    index.save()
+
+    loaded = SeenIndex(str(tmp_path), recent_size=10)
+
+    assert all(sid in loaded for sid in range(1, 101))
+    assert "4900000000000000" in loaded
+    assert len(loaded) == len(index)
+    # 精确集合保存的是最近的ID
+    assert list(loaded._recent) == list(range(92, 101)) + [4900000000000000]
+
+
+def test_names_use_separate_files(tmp_path):
+    timeline = SeenIndex(str(tmp_path))
+    timeline.add(1)
+    timeline.save()
+
+    assert 1 not in SeenIndex(str(tmp_path), name="export")
+    assert (tmp_path / "seen_timeline.idx").exists()
+
+
+def test_corrupt_file_starts_empty(tmp_path):
+    (tmp_path / "seen_timeline.idx").write_bytes(b"not an index")
+
+    index = SeenIndex(str(tmp_path))
+
+    assert 1 not in index
+    index.add(1)
+    index.save()
+    assert 1 in SeenIndex(str(tmp_path))
+
+
+def test_generations_rotate_at_capacity(tmp_path):
+    index = SeenIndex(str(tmp_path), capacity=50, recent_size=0)
+    index.update(range(1, 51))
+
+    # 写满后新建一代，上一代仍可查询
+    index.update(range(1001, 1051))
+    assert all(sid in index for sid in range(1, 51))
+
+    # 再写满一代后最早的一代被丢弃，只剩下两代的条目
+    index.update(range(2001, 2051))
+    assert len(index) <= 100
+    assert all(sid in index for sid in range(2001, 2051))
+
+
+def test_persist_false_does_not_write(tmp_path):
+    index = SeenIndex(str(tmp_path), persist=False)
+    index.add(1)
+    index.save()
+
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+相同请求合并测试
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+
+import threading
+import time
+
+import pytest
+
+from hyperweibo.api.singleflight import SingleFlight, request_key
+
+
+def run_concurrently(count, target):
+    """启动count个线程执行target，返回线程列表"""
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def wait_until(predicate, timeout=5.0):
+    """轮询直到predicate为真或超时"""
+    end = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > end:
+            raise AssertionError("等待超时")
+        time.sleep(0.001)
+
+
+def test_request_key_normalizes_query():
+    assert request_key("HTTPS://Weibo.COM/ajax?b=2", {'a': 1, 'c': None}) == \
+        request_key("https://weibo.com/ajax?a=1", {'b': '2'})
+    assert request_key("https://weibo.com/ajax", {'page': 1}) != request_key("https://weibo.com/ajax", {'page': 2})
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def func():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'ok': 1}
+
+    def caller():
+        results.append(flight.do("key", func))
+
+    leader = run_concurrently(1, caller)
+    assert started.wait(5)
+    followers = run_concurrently(4, caller)
+    # 等待跟随者进入等待后再放行
+    wait_until(lambda: flight.stats()['coalesced'] == 4)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+    assert flight.stats() == {'executed': 1, 'coalesced': 4, 'in_flight': 0}
+
+
+def test_error_propagates_to_all_waiters_and_releases_key():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("请求失败")
+
+    def caller():
+        try:
+            flight.do("key", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = run_concurrently(1, caller)
+    assert started.wait(5)
+    followers = run_concurrently(3, caller)
+    wait_until(lambda: flight.stats()['coalesced'] == 3)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert len(errors) == 4
+    assert all(error is errors[0] for error in errors)
+    assert flight.stats()['in_flight'] == 0
+
+    # 失败后键已释放，下一次调用重新执行
+    assert flight.do("key", lambda: 42) == 42
+    assert flight.stats()['executed'] == 2
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    with pytest.raises(KeyError):
+        flight.do("key", lambda: {}['missing'])
+    assert flight.do("key", lambda: 3) == 3
+    assert flight.stats() == {'executed': 3, 'coalesced': 0, 'in_flight': 0}
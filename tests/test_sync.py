@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+时间线增量同步测试
+
+作者: Xue Zhouyang <xuezhouyang@gmail.com>
+许可证: MIT License (Modified with Extended Disclaimers)
+
+法律免责声明与使用限制:
+    1. 本软件仅供作者个人本地测试使用，不得用于任何商业目的或获利行为。
+
+    2. 任何个人或实体使用本软件应自行承担全部风险。作者明确声明不对使用本软件可能导致的
+       任何直接、间接、偶然、特殊、惩罚性或后果性损害承担任何责任，无论此类损害是否可预见，
+       也无论责任理论如何。
+
+    3. 使用者必须遵守所有适用的国家、地区和国际法律法规，包括但不限于计算机安全法、
+       网络安全法、数据保护法和隐私法。作者不对任何违反法律法规的使用行为承担责任。
+
+    4. 地域限制: 严禁在中华人民共和国和美利坚合众国境内使用本软件，或通过本软件请求、
+       访问、处理或存储与这两国有利益关联或受其管辖的任何数据、信息或资产。
+
+    5. 任何基于本项目的二次开发、修改、分发或使用导致的任何直接或间接后果，包括但不限于
+       法律责任、数据泄露、系统损害或任何其他形式的损失，均与原作者无关，原作者不承担
+       任何法律或道德责任。
+"""
+
+
+import pytest
+
+from hyperweibo.api.sync import TimelineSync
+
+
+class FakeAPI:
+    """按since_id和页码返回ID从top递减的微博，每页5条"""
+
+    use_mock = False
+    BASE_URL = "https://weibo.example"
+    PAGE_SIZE = 5
+
+    def __init__(self, top):
+        self.top = top
+        self.fail_page = None
+        self.calls = []
+
+    def _request_statuses(self, url, params):
+        self.calls.append(dict(params))
+        page = params.get('page', 1)
+        if page == self.fail_page:
+            raise RuntimeError("请求失败")
+        since_id = params.get('since_id', 0)
+        max_id = params.get('max_id')
+        ids = [sid for sid in range(self.top, 0, -1)
+               if sid > since_id and (max_id is None or sid < max_id)]
+        return [{'id': sid} for sid in ids[(page - 1) * self.PAGE_SIZE:page * self.PAGE_SIZE]]
+
+
+def test_first_refresh_loads_one_page():
+    api = FakeAPI(100)
+    sync = TimelineSync(api)
+
+    new = sync.refresh()
+
+    assert [status['id'] for status in new] == [100, 99, 98, 97, 96]
+    assert (sync.newest_id, sync.oldest_id) == (100, 96)
+    assert api.calls == [{'page': 1}]
+
+
+def test_refresh_requests_only_newer_statuses():
+    api = FakeAPI(100)
+    sync = TimelineSync(api)
+    sync.refresh()
+
+    api.top = 102
+    new = sync.refresh()
+
+    assert [status['id'] for status in new] == [102, 101]
+    assert api.calls[-1] == {'since_id': 100}
+    assert sync.newest_id == 102
+
+
+def test_gap_is_backfilled():
+    api = FakeAPI(100)
+    sync = TimelineSync(api, backfill_workers=2)
+    sync.refresh()
+
+    api.top = 117
+    new = sync.refresh()
+
+    assert [status['id'] for status in new] == list(range(117, 100, -1))
+    assert [status['id'] for status in sync.statuses] == list(range(117, 95, -1))
+    assert sync.stats['backfill_pages'] >= 3
+
+
+def test_backfill_failure_raises_and_keeps_cursor():
+    api = FakeAPI(100)
+    sync = TimelineSync(api, backfill_workers=2)
+    sync.refresh()
+
+    api.top = 130
+    api.fail_page = 3
+    with pytest.raises(RuntimeError):
+        sync.refresh()
+    assert sync.newest_id == 100
+    assert [status['id'] for status in sync.statuses] == [100, 99, 98, 97, 96]
+
+    # 下次刷新从原来的位置重新请求，不会漏掉失败页中的微博
+    api.fail_page = None
+    new = sync.refresh()
+    assert [status['id'] for status in new] == list(range(130, 100, -1))
+    assert sync.newest_id == 130
+
+
+def test_first_page_failure_raises():
+    api = FakeAPI(100)
+    api.fail_page = 1
+    sync = TimelineSync(api)
+
+    with pytest.raises(RuntimeError):
+        sync.refresh()
+    assert sync.newest_id is None
+
+
+def test_load_older_uses_max_id():
+    api = FakeAPI(100)
+    sync = TimelineSync(api)
+    sync.refresh()
+
+    older = sync.load_older()
+
+    assert [status['id'] for status in older] == [95, 94, 93, 92, 91]
+    assert api.calls[-1] == {'max_id': 96}
+    assert sync.oldest_id == 91
+
+
+def test_max_statuses_drops_oldest():
+    api = FakeAPI(100)
+    sync = TimelineSync(api, max_statuses=7)
+    sync.refresh()
+    sync.load_older()
+
+    assert [status['id'] for status in sync.statuses] == [100, 99, 98, 97, 96, 95, 94]
+    assert sync.oldest_id == 94